@@ -32,6 +32,8 @@ CREATE INDEX IF NOT EXISTS idx_scraped_sites_scraped_at ON scraped_sites(scraped
 CREATE INDEX IF NOT EXISTS idx_scraped_sites_success ON scraped_sites(success);
 CREATE INDEX IF NOT EXISTS idx_scraped_sites_content_hash ON scraped_sites(content_hash);
 CREATE INDEX IF NOT EXISTS idx_scraped_sites_strategy ON scraped_sites(strategy);
+CREATE INDEX IF NOT EXISTS idx_scraped_sites_domain_scraped_at ON scraped_sites(domain, scraped_at DESC);
+CREATE INDEX IF NOT EXISTS idx_scraped_sites_domain_success_scraped_at ON scraped_sites(domain, scraped_at DESC) WHERE success;
 
 -- Domain proxy requirements table
 CREATE TABLE IF NOT EXISTS domain_proxy_requirements (
@@ -88,7 +90,7 @@ CREATE TABLE IF NOT EXISTS downloaded_files (
     stored_filename TEXT NOT NULL,
     file_path TEXT NOT NULL,
     file_size BIGINT,
-    file_hash VARCHAR(64),
+    file_hash BYTEA,  -- raw SHA-256 digest
     content_type VARCHAR(100),
     parent_page_url TEXT,
     download_status VARCHAR(20) DEFAULT 'pending' CHECK (download_status IN ('pending', 'downloaded', 'failed')),
@@ -107,7 +109,9 @@ CREATE INDEX IF NOT EXISTS idx_downloaded_files_file_type ON downloaded_files(fi
 CREATE INDEX IF NOT EXISTS idx_downloaded_files_download_status ON downloaded_files(download_status);
 CREATE INDEX IF NOT EXISTS idx_downloaded_files_ocr_status ON downloaded_files(ocr_status);
 CREATE INDEX IF NOT EXISTS idx_downloaded_files_file_hash ON downloaded_files(file_hash);
+CREATE INDEX IF NOT EXISTS idx_downloaded_files_downloaded_hash ON downloaded_files(file_hash) WHERE download_status = 'downloaded';
 CREATE INDEX IF NOT EXISTS idx_downloaded_files_downloaded_at ON downloaded_files(downloaded_at DESC);
+CREATE INDEX IF NOT EXISTS idx_downloaded_files_domain_downloaded_at ON downloaded_files(domain, downloaded_at DESC) INCLUDE (file_type, download_status, file_size);
 CREATE INDEX IF NOT EXISTS idx_downloaded_files_source_url ON downloaded_files(source_url);
 CREATE INDEX IF NOT EXISTS idx_downloaded_files_parent_page_url ON downloaded_files(parent_page_url);
 
@@ -215,6 +219,7 @@ CREATE INDEX IF NOT EXISTS idx_org_products_org_id ON organization_products(orga
 CREATE INDEX IF NOT EXISTS idx_org_products_name ON organization_products(product_name);
 CREATE INDEX IF NOT EXISTS idx_org_products_active ON organization_products(is_active);
 CREATE INDEX IF NOT EXISTS idx_org_products_last_seen ON organization_products(last_seen_at DESC);
+CREATE INDEX IF NOT EXISTS idx_org_products_active_last_seen_brin ON organization_products USING BRIN (last_seen_at) WITH (pages_per_range = 32) WHERE is_active = true;
 
 -- Organization services (from taxonomy)
 CREATE TABLE IF NOT EXISTS organization_services (
@@ -233,6 +238,7 @@ CREATE TABLE IF NOT EXISTS organization_services (
 CREATE INDEX IF NOT EXISTS idx_org_services_org_id ON organization_services(organization_id);
 CREATE INDEX IF NOT EXISTS idx_org_services_service_id ON organization_services(service_id);
 CREATE INDEX IF NOT EXISTS idx_org_services_active ON organization_services(is_active);
+CREATE INDEX IF NOT EXISTS idx_org_services_active_last_seen_brin ON organization_services USING BRIN (last_seen_at) WITH (pages_per_range = 32) WHERE is_active = true;
 CREATE INDEX IF NOT EXISTS idx_org_services_path ON organization_services USING GIN(service_path);
 
 -- Organization platforms (technology platforms used)
@@ -252,6 +258,7 @@ CREATE INDEX IF NOT EXISTS idx_org_platforms_org_id ON organization_platforms(or
 CREATE INDEX IF NOT EXISTS idx_org_platforms_name ON organization_platforms(platform_name);
 CREATE INDEX IF NOT EXISTS idx_org_platforms_type ON organization_platforms(platform_type);
 CREATE INDEX IF NOT EXISTS idx_org_platforms_active ON organization_platforms(is_active);
+CREATE INDEX IF NOT EXISTS idx_org_platforms_active_last_seen_brin ON organization_platforms USING BRIN (last_seen_at) WITH (pages_per_range = 32) WHERE is_active = true;
 
 -- Organization certifications
 CREATE TABLE IF NOT EXISTS organization_certifications (
@@ -270,6 +277,7 @@ CREATE INDEX IF NOT EXISTS idx_org_certs_org_id ON organization_certifications(o
 CREATE INDEX IF NOT EXISTS idx_org_certs_name ON organization_certifications(certification_name);
 CREATE INDEX IF NOT EXISTS idx_org_certs_type ON organization_certifications(certification_type);
 CREATE INDEX IF NOT EXISTS idx_org_certs_active ON organization_certifications(is_active);
+CREATE INDEX IF NOT EXISTS idx_org_certs_active_last_seen_brin ON organization_certifications USING BRIN (last_seen_at) WITH (pages_per_range = 32) WHERE is_active = true;
 
 -- Organization awards
 CREATE TABLE IF NOT EXISTS organization_awards (
@@ -290,6 +298,7 @@ CREATE INDEX IF NOT EXISTS idx_org_awards_org_id ON organization_awards(organiza
 CREATE INDEX IF NOT EXISTS idx_org_awards_issuer ON organization_awards(award_issuer);
 CREATE INDEX IF NOT EXISTS idx_org_awards_year ON organization_awards(award_year);
 CREATE INDEX IF NOT EXISTS idx_org_awards_active ON organization_awards(is_active);
+CREATE INDEX IF NOT EXISTS idx_org_awards_active_last_seen_brin ON organization_awards USING BRIN (last_seen_at) WITH (pages_per_range = 32) WHERE is_active = true;
 
 -- Organization operating markets
 CREATE TABLE IF NOT EXISTS organization_operating_markets (
@@ -310,6 +319,7 @@ CREATE INDEX IF NOT EXISTS idx_org_markets_org_id ON organization_operating_mark
 CREATE INDEX IF NOT EXISTS idx_org_markets_country_code ON organization_operating_markets(country_code);
 CREATE INDEX IF NOT EXISTS idx_org_markets_region ON organization_operating_markets(region);
 CREATE INDEX IF NOT EXISTS idx_org_markets_active ON organization_operating_markets(is_active);
+CREATE INDEX IF NOT EXISTS idx_org_markets_active_last_seen_brin ON organization_operating_markets USING BRIN (last_seen_at) WITH (pages_per_range = 32) WHERE is_active = true;
 
 -- Organization relationships
 CREATE TABLE IF NOT EXISTS organization_relationships (
@@ -330,6 +340,7 @@ CREATE INDEX IF NOT EXISTS idx_org_rels_org_id ON organization_relationships(org
 CREATE INDEX IF NOT EXISTS idx_org_rels_related_id ON organization_relationships(related_organization_id);
 CREATE INDEX IF NOT EXISTS idx_org_rels_type ON organization_relationships(relationship_type);
 CREATE INDEX IF NOT EXISTS idx_org_rels_active ON organization_relationships(is_active);
+CREATE INDEX IF NOT EXISTS idx_org_rels_active_last_seen_brin ON organization_relationships USING BRIN (last_seen_at) WITH (pages_per_range = 32) WHERE is_active = true;
 
 -- Organization evidence (source URLs for facts)
 CREATE TABLE IF NOT EXISTS organization_evidence (
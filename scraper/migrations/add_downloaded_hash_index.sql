@@ -0,0 +1,8 @@
+-- Migration: Partial index for the downloaded-file hash probe
+-- Keeps the deduplication lookup (file_hash among downloaded files) on a
+-- small index. CONCURRENTLY cannot run inside a transaction block, so run
+-- this file on its own (e.g. psql -f).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_downloaded_files_downloaded_hash
+    ON downloaded_files(file_hash)
+    WHERE download_status = 'downloaded';
@@ -0,0 +1,35 @@
+-- Migration: BRIN indexes on last_seen_at for the fact expiry job
+-- mark_facts_inactive_after_period filters each fact table on
+-- is_active = true AND last_seen_at < cutoff. Rows that stop being seen keep
+-- their old last_seen_at on older heap pages, so per-range min/max summaries
+-- prune most of each table at a fraction of a btree's size and upkeep.
+-- CONCURRENTLY cannot run inside a transaction block, so run this file on
+-- its own (e.g. psql -f).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_products_active_last_seen_brin
+    ON organization_products USING BRIN (last_seen_at) WITH (pages_per_range = 32)
+    WHERE is_active = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_services_active_last_seen_brin
+    ON organization_services USING BRIN (last_seen_at) WITH (pages_per_range = 32)
+    WHERE is_active = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_platforms_active_last_seen_brin
+    ON organization_platforms USING BRIN (last_seen_at) WITH (pages_per_range = 32)
+    WHERE is_active = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_certs_active_last_seen_brin
+    ON organization_certifications USING BRIN (last_seen_at) WITH (pages_per_range = 32)
+    WHERE is_active = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_awards_active_last_seen_brin
+    ON organization_awards USING BRIN (last_seen_at) WITH (pages_per_range = 32)
+    WHERE is_active = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_markets_active_last_seen_brin
+    ON organization_operating_markets USING BRIN (last_seen_at) WITH (pages_per_range = 32)
+    WHERE is_active = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_org_rels_active_last_seen_brin
+    ON organization_relationships USING BRIN (last_seen_at) WITH (pages_per_range = 32)
+    WHERE is_active = true;
@@ -0,0 +1,16 @@
+-- Migration: Composite indexes for the domain completion notifier
+-- The notifier aggregates each completed domain's last hour of pages and
+-- downloads. (domain, time) turns those into one range scan per domain; the
+-- downloaded_files index carries the grouped columns so the file counts are
+-- answered from the index alone. CONCURRENTLY cannot run inside a
+-- transaction block, so run this file on its own (e.g. psql -f).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scraped_sites_domain_scraped_at
+    ON scraped_sites(domain, scraped_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_downloaded_files_domain_downloaded_at
+    ON downloaded_files(domain, downloaded_at DESC)
+    INCLUDE (file_type, download_status, file_size);
+
+ANALYZE scraped_sites;
+ANALYZE downloaded_files;
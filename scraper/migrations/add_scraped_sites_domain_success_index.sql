@@ -0,0 +1,14 @@
+-- Migration: Partial index over successful pages per domain
+-- The overnight flow's quality test reads a domain's latest successful
+-- pages (WHERE domain = $1 AND success ORDER BY scraped_at DESC LIMIT n)
+-- and the full scrape counts them. Indexing only successful rows lets the
+-- top-n read stop after n index entries and the count run as an
+-- index-only scan. Page bodies are not INCLUDEd: markdown_content can
+-- exceed the btree tuple size limit. CONCURRENTLY cannot run inside a
+-- transaction block, so run this file on its own (e.g. psql -f).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scraped_sites_domain_success_scraped_at
+    ON scraped_sites(domain, scraped_at DESC)
+    WHERE success;
+
+ANALYZE scraped_sites;
@@ -0,0 +1,6 @@
+-- Migration: Store downloaded_files.file_hash as a raw 32-byte digest
+-- Converts the 64-character hex column to bytea; the file_hash indexes are
+-- rebuilt by the ALTER. Stored filenames in the CAS keep the hex form.
+
+ALTER TABLE downloaded_files
+    ALTER COLUMN file_hash TYPE BYTEA USING decode(file_hash, 'hex');
@@ -6,6 +6,7 @@ This script starts the Prefect-orchestrated overnight scraping job.
 """
 
 import asyncio
+import signal
 import sys
 import os
 from pathlib import Path
@@ -100,5 +101,8 @@ async def main():
 
 
 if __name__ == '__main__':
+    # Treat SIGTERM (docker stop, kill) like Ctrl+C so the flow's cleanup
+    # writes the checkpoint and run log before exiting
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     asyncio.run(main())
 
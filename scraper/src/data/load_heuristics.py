@@ -241,6 +241,10 @@ async def load_products_from_heuristics(
             reverse_aliases[canonical] = []
         reverse_aliases[canonical].append(alias.lower())
     
+    # Collect products per organization, then upsert each organization's
+    # products in one statement
+    org_products: Dict[int, List[tuple]] = {}
+    
     # Process products
     for product in products:
         product_name = product.get('name')
@@ -258,17 +262,23 @@ async def load_products_from_heuristics(
                     query = "SELECT id FROM organizations WHERE canonical_name = $1 OR canonical_name ILIKE $2"
                     org_id = await conn.fetchval(query, org_name, f"%{org_name}%")
                     if org_id:
-                        await org_db.upsert_product(
-                            org_id, product_name, category, description
+                        org_products.setdefault(org_id, []).append(
+                            (product_name, category, description)
                         )
                         count += 1
                 else:
-                    await org_db.upsert_product(
-                        org['id'], product_name, category, description
+                    org_products.setdefault(org['id'], []).append(
+                        (product_name, category, description)
                     )
                     count += 1
                 break
     
+    for org_id, rows in org_products.items():
+        names, categories, descriptions = zip(*rows)
+        await org_db.upsert_products(
+            org_id, list(names), list(categories), list(descriptions)
+        )
+    
     return count
 
 
@@ -318,15 +328,22 @@ async def load_relationships_from_heuristics(
         if not org_id:
             continue
         
-        # Process partners
+        # Process partners (upserted together once resolved)
         partners = rel_data.get('partners', [])
+        partner_ids = []
         for partner_name in partners:
             partner_id = await get_org_id_by_name(partner_name)
             if partner_id:
-                await org_db.upsert_relationship(
-                    org_id, partner_id, 'Partner'
-                )
+                partner_ids.append(partner_id)
                 count += 1
+        
+        if partner_ids:
+            await org_db.upsert_relationships(
+                org_id,
+                partner_ids,
+                ['Partner'] * len(partner_ids),
+                [None] * len(partner_ids)
+            )
     
     return count
 
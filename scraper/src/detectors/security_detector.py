@@ -2,10 +2,107 @@
 Security Detection - Identify site security measures to determine scraping approach
 """
 
+import hashlib
 import re
-from typing import Dict, Optional, Any, Set
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Set, List, Sequence
 from enum import Enum
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+
+_NOSCRIPT_OPEN_RE = re.compile(r'<noscript', re.IGNORECASE)
+_NOSCRIPT_CLOSE_RE = re.compile(r'</noscript>', re.IGNORECASE)
+_SCRIPT_TAG_RE = re.compile(r'<script[^>]*>', re.IGNORECASE)
+_IFRAME_TAG_RE = re.compile(r'<iframe[^>]*>', re.IGNORECASE)
+_TURNSTILE_RE = re.compile(r'turnstile', re.IGNORECASE)
+_CF_CHALLENGE_RE = re.compile(r'checking your browser|just a moment|please wait', re.IGNORECASE)
+_CF_HEADER_PREFIXES = ('cf-ray', 'cf-request', 'cf-cache', 'cf-visitor')
+_AKAMAI_HEADER_PREFIXES = ('akamai', 'x-akamai')
+
+
+def _noscript_total(content: str) -> int:
+    """
+    Sum the length of all <noscript>...</noscript> blocks.
+
+    Scans with two literal searches instead of a lazy DOTALL regex, which can
+    backtrack badly on malformed HTML and allocates every matched block.
+    """
+    total = 0
+    i = 0
+    while True:
+        open_match = _NOSCRIPT_OPEN_RE.search(content, i)
+        if open_match is None:
+            break
+        close_match = _NOSCRIPT_CLOSE_RE.search(content, open_match.start())
+        if close_match is None:
+            break
+        total += close_match.end() - open_match.start()
+        i = close_match.end()
+    return total
+
+
+class _PatternMatcher:
+    """
+    Match a fixed list of indicator patterns against content.
+
+    Uses a single hyperscan database (one pass over the content) when the
+    optional hyperscan binding is installed, otherwise falls back to
+    precompiled `re` patterns. Matching is case-insensitive either way.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._compiled = [re.compile(p, re.IGNORECASE) for p in self.patterns]
+        self._db = None
+        if HYPERSCAN_AVAILABLE and self.patterns:
+            count = len(self.patterns)
+            try:
+                db = hyperscan.Database()
+                db.compile(
+                    expressions=[p.encode('utf-8') for p in self.patterns],
+                    ids=list(range(count)),
+                    elements=count,
+                    flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * count
+                )
+                self._db = db
+            except hyperscan.error:
+                self._db = None
+
+    def findall(self, content: str) -> List[str]:
+        """Return the patterns that match content, in declaration order"""
+        if not content:
+            return []
+        if self._db is None:
+            return [
+                pattern for pattern, compiled in zip(self.patterns, self._compiled)
+                if compiled.search(content)
+            ]
+        
+        matched: Set[int] = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            matched.add(pattern_id)
+
+        self._db.scan(content.encode('utf-8', 'ignore'), match_event_handler=on_match)
+        return [self.patterns[i] for i in sorted(matched)]
+
+    def search(self, content: str) -> Optional[str]:
+        """Return the first pattern (in declaration order) that matches content"""
+        if self._db is None:
+            if not content:
+                return None
+            for pattern, compiled in zip(self.patterns, self._compiled):
+                if compiled.search(content):
+                    return pattern
+            return None
+        matches = self.findall(content)
+        return matches[0] if matches else None
+
 
 class SecurityType(Enum):
     """Types of security measures detected"""
@@ -86,9 +183,49 @@ class SecurityDetector:
         r'window\._cf_chl_opt'
     ]
     
-    def __init__(self):
-        """Initialize security detector"""
-        pass
+    # JavaScript rendering indicators (first match wins in each group)
+    JS_FRAMEWORK_INDICATORS = [
+        r'react', r'vue', r'angular', r'svelte', r'next\.js', r'nuxt',
+        r'__next', r'__nuxt', r'ng-', r'v-', r'data-react', r'data-vue'
+    ]
+    
+    SHADOW_DOM_INDICATORS = [
+        r'shadowroot', r'shadow-root', r'#shadow-root',
+        r'<template[^>]*shadow', r'custom-element', r'web-component'
+    ]
+    
+    JS_RENDERING_PATTERNS = [
+        r'data-reactroot', r'id="root"', r'id="app"', r'id="__next"',
+        r'ng-app', r'v-app', r'x-data', r'data-component'
+    ]
+    
+    # Challenge pages and framework markers are served near the top of the
+    # document, so marker patterns only scan this many leading characters
+    DEFAULT_SCAN_WINDOW = 32768
+    
+    def __init__(
+        self,
+        scan_window: Optional[int] = DEFAULT_SCAN_WINDOW,
+        cache_size: int = 4096
+    ):
+        """
+        Initialize security detector
+        
+        Args:
+            scan_window: Number of leading content characters scanned for
+                indicator patterns (None scans the whole body)
+            cache_size: Number of detection results kept for repeated
+                responses (0 disables the cache)
+        """
+        self.scan_window = scan_window
+        self.cache_size = cache_size
+        self._result_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+    
+    def _content_head(self, content: str) -> str:
+        """Return the leading part of content that indicator patterns scan"""
+        if self.scan_window is None:
+            return content
+        return content[:self.scan_window]
     
     def detect(
         self,
@@ -119,6 +256,38 @@ class SecurityDetector:
                 'confidence': float  # 0.0 to 1.0
             }
         """
+        # Normalize headers to lowercase keys
+        headers_lower = {k.lower(): v for k, v in headers.items()}
+        content = content or ""
+        
+        if self.cache_size <= 0:
+            return self._detect_impl(status_code, headers_lower, content)
+        
+        # Identical responses (retries, polling) give identical results
+        cache_key = (
+            status_code,
+            frozenset(headers_lower.items()),
+            hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        )
+        cached = self._result_cache.get(cache_key)
+        if cached is None:
+            cached = self._detect_impl(status_code, headers_lower, content)
+            self._result_cache[cache_key] = cached
+            if len(self._result_cache) > self.cache_size:
+                self._result_cache.popitem(last=False)
+        else:
+            self._result_cache.move_to_end(cache_key)
+        
+        # Hand out a copy so callers can't mutate the cached entry
+        return {**cached, 'indicators': list(cached['indicators'])}
+    
+    def _detect_impl(
+        self,
+        status_code: int,
+        headers_lower: Dict[str, str],
+        content: str
+    ) -> Dict[str, Any]:
+        """Run all detectors on a normalized response (see detect())"""
         results = {
             'security_type': SecurityType.NONE,
             'security_level': SecurityLevel.LOW,
@@ -128,9 +297,7 @@ class SecurityDetector:
             'confidence': 0.0
         }
         
-        # Normalize headers to lowercase keys
-        headers_lower = {k.lower(): v for k, v in headers.items()}
-        content_lower = content.lower() if content else ""
+        content_head = self._content_head(content)
         
         # Check status code patterns
         if status_code == 403:
@@ -148,7 +315,7 @@ class SecurityDetector:
             results['confidence'] = 0.8
         
         # Detect Cloudflare
-        cf_detected = self._detect_cloudflare(headers_lower, content_lower)
+        cf_detected = self._detect_cloudflare(headers_lower, content_head)
         if cf_detected['detected']:
             results['security_type'] = SecurityType.CLOUDFLARE
             results['security_level'] = cf_detected['level']
@@ -157,10 +324,11 @@ class SecurityDetector:
             results['indicators'].extend(cf_detected['indicators'])
             results['confidence'] = max(results['confidence'], cf_detected['confidence'])
         
-        # Detect Akamai
-        akamai_detected = self._detect_akamai(headers_lower, content_lower)
-        if akamai_detected['detected']:
-            if results['security_type'] == SecurityType.NONE:
+        # Akamai and JS challenge results only apply while no other security
+        # type has been assigned, so their scans are skipped once one has
+        if results['security_type'] == SecurityType.NONE:
+            akamai_detected = self._detect_akamai(headers_lower, content_head)
+            if akamai_detected['detected']:
                 results['security_type'] = SecurityType.AKAMAI
                 results['security_level'] = akamai_detected['level']
                 results['requires_proxy'] = True
@@ -169,7 +337,7 @@ class SecurityDetector:
                 results['confidence'] = max(results['confidence'], akamai_detected['confidence'])
         
         # Detect CAPTCHA
-        captcha_detected = self._detect_captcha(content_lower)
+        captcha_detected = self._detect_captcha(content_head)
         if captcha_detected['detected']:
             results['security_type'] = SecurityType.CAPTCHA
             results['security_level'] = SecurityLevel.CRITICAL
@@ -179,9 +347,9 @@ class SecurityDetector:
             results['confidence'] = max(results['confidence'], captcha_detected['confidence'])
         
         # Detect JavaScript challenges
-        js_challenge = self._detect_js_challenge(content)
-        if js_challenge['detected']:
-            if results['security_type'] == SecurityType.NONE:
+        if results['security_type'] == SecurityType.NONE:
+            js_challenge = self._detect_js_challenge(content_head)
+            if js_challenge['detected']:
                 results['security_type'] = SecurityType.JAVASCRIPT_CHALLENGE
                 results['security_level'] = SecurityLevel.HIGH
                 results['requires_browser'] = True
@@ -220,7 +388,7 @@ class SecurityDetector:
         
         # Check headers
         for header_name in headers:
-            if any(cf_header in header_name for cf_header in ['cf-ray', 'cf-request', 'cf-cache', 'cf-visitor']):
+            if header_name.startswith(_CF_HEADER_PREFIXES):
                 detected = True
                 indicators.append(f"Cloudflare header: {header_name}")
                 confidence = 0.8
@@ -233,17 +401,17 @@ class SecurityDetector:
             confidence = 0.9
         
         # Check content for Cloudflare indicators
-        for pattern in self.CLOUDFLARE_INDICATORS:
-            if re.search(pattern, content, re.IGNORECASE):
-                detected = True
-                indicators.append(f"Cloudflare content pattern: {pattern}")
-                confidence = max(confidence, 0.7)
-                
-                # Check for challenge pages
-                if any(phrase in content.lower() for phrase in ['checking your browser', 'just a moment', 'please wait']):
-                    requires_browser = True
-                    level = SecurityLevel.HIGH
-                    confidence = 0.95
+        content_patterns = _CLOUDFLARE_MATCHER.findall(content)
+        for pattern in content_patterns:
+            detected = True
+            indicators.append(f"Cloudflare content pattern: {pattern}")
+            confidence = max(confidence, 0.7)
+        
+        # Check for challenge pages (one scan, only if a content pattern hit)
+        if content_patterns and _CF_CHALLENGE_RE.search(content):
+            requires_browser = True
+            level = SecurityLevel.HIGH
+            confidence = 0.95
         
         return {
             'detected': detected,
@@ -267,19 +435,18 @@ class SecurityDetector:
         
         # Check headers
         for header_name in headers:
-            if 'akamai' in header_name.lower():
+            if header_name.startswith(_AKAMAI_HEADER_PREFIXES):
                 detected = True
                 indicators.append(f"Akamai header: {header_name}")
                 confidence = 0.8
         
         # Check content
-        for pattern in self.AKAMAI_INDICATORS:
-            if re.search(pattern, content, re.IGNORECASE):
-                detected = True
-                indicators.append(f"Akamai content pattern: {pattern}")
-                confidence = max(confidence, 0.7)
-                level = SecurityLevel.HIGH
-                requires_browser = True
+        for pattern in _AKAMAI_MATCHER.findall(content):
+            detected = True
+            indicators.append(f"Akamai content pattern: {pattern}")
+            confidence = max(confidence, 0.7)
+            level = SecurityLevel.HIGH
+            requires_browser = True
         
         return {
             'detected': detected,
@@ -295,11 +462,10 @@ class SecurityDetector:
         indicators = []
         confidence = 0.0
         
-        for pattern in self.CAPTCHA_INDICATORS:
-            if re.search(pattern, content, re.IGNORECASE):
-                detected = True
-                indicators.append(f"CAPTCHA pattern: {pattern}")
-                confidence = 0.9
+        for pattern in _CAPTCHA_MATCHER.findall(content):
+            detected = True
+            indicators.append(f"CAPTCHA pattern: {pattern}")
+            confidence = 0.9
         
         return {
             'detected': detected,
@@ -316,16 +482,13 @@ class SecurityDetector:
         indicators = []
         confidence = 0.0
         
-        content_lower = content.lower()
-        
-        for pattern in self.JS_CHALLENGE_INDICATORS:
-            if re.search(pattern, content_lower):
-                detected = True
-                indicators.append(f"JS challenge pattern: {pattern}")
-                confidence = 0.8
+        for pattern in _JS_CHALLENGE_MATCHER.findall(content):
+            detected = True
+            indicators.append(f"JS challenge pattern: {pattern}")
+            confidence = 0.8
         
         # Check for Cloudflare Turnstile
-        if 'turnstile' in content_lower or 'cf-turnstile' in content_lower:
+        if _TURNSTILE_RE.search(content):
             detected = True
             indicators.append("Cloudflare Turnstile detected")
             confidence = 0.9
@@ -352,6 +515,9 @@ class SecurityDetector:
         """
         Detect if JavaScript rendering is needed based on content analysis.
         
+        Marker patterns only scan the first `scan_window` characters; tag
+        counts and the text-density check use the full body.
+        
         Args:
             content: HTML content
             status_code: HTTP status code
@@ -371,53 +537,38 @@ class SecurityDetector:
         indicators = []
         confidence = 0.0
         
-        content_lower = content.lower()
         html_length = len(content)
+        content_head = self._content_head(content)
         
         # Check for JS framework indicators
-        js_frameworks = [
-            r'react', r'vue', r'angular', r'svelte', r'next\.js', r'nuxt',
-            r'__next', r'__nuxt', r'ng-', r'v-', r'data-react', r'data-vue'
-        ]
-        framework_found = False
-        for framework in js_frameworks:
-            if re.search(framework, content_lower):
-                framework_found = True
-                indicators.append(f"JS framework detected: {framework}")
-                confidence = max(confidence, 0.7)
-                break
+        framework = _JS_FRAMEWORK_MATCHER.search(content_head)
+        if framework:
+            indicators.append(f"JS framework detected: {framework}")
+            confidence = max(confidence, 0.7)
         
         # Check for noscript tags with content (indicates JS-rendered content)
-        noscript_pattern = r'<noscript[^>]*>.*?</noscript>'
-        noscript_matches = re.findall(noscript_pattern, content, re.IGNORECASE | re.DOTALL)
-        if noscript_matches:
-            total_noscript_length = sum(len(match) for match in noscript_matches)
-            if total_noscript_length > 500:  # Substantial noscript content
-                detected = True
-                indicators.append(f"Substantial noscript content ({total_noscript_length} chars)")
-                confidence = max(confidence, 0.8)
+        total_noscript_length = _noscript_total(content)
+        if total_noscript_length > 500:  # Substantial noscript content
+            detected = True
+            indicators.append(f"Substantial noscript content ({total_noscript_length} chars)")
+            confidence = max(confidence, 0.8)
         
         # Check for multiple script tags (indicates dynamic loading)
-        script_tags = len(re.findall(r'<script[^>]*>', content_lower))
+        script_tags = len(_SCRIPT_TAG_RE.findall(content))
         if script_tags > 5:
             detected = True
             indicators.append(f"Multiple script tags ({script_tags})")
             confidence = max(confidence, 0.6)
         
         # Check for shadow DOM indicators
-        shadow_dom_indicators = [
-            r'shadowroot', r'shadow-root', r'#shadow-root',
-            r'<template[^>]*shadow', r'custom-element', r'web-component'
-        ]
-        for indicator in shadow_dom_indicators:
-            if re.search(indicator, content_lower):
-                detected = True
-                indicators.append(f"Shadow DOM indicator: {indicator}")
-                confidence = max(confidence, 0.75)
-                break
+        shadow_dom = _SHADOW_DOM_MATCHER.search(content_head)
+        if shadow_dom:
+            detected = True
+            indicators.append(f"Shadow DOM indicator: {shadow_dom}")
+            confidence = max(confidence, 0.75)
         
         # Check for iframes
-        iframe_count = len(re.findall(r'<iframe[^>]*>', content_lower))
+        iframe_count = len(_IFRAME_TAG_RE.findall(content))
         if iframe_count > 0:
             indicators.append(f"Iframes detected ({iframe_count})")
             # Iframes alone don't require browser, but combined with other indicators they do
@@ -444,16 +595,11 @@ class SecurityDetector:
                 confidence = max(confidence, 0.85)
         
         # Check for common JS-rendered site patterns
-        js_rendering_patterns = [
-            r'data-reactroot', r'id="root"', r'id="app"', r'id="__next"',
-            r'ng-app', r'v-app', r'x-data', r'data-component'
-        ]
-        for pattern in js_rendering_patterns:
-            if re.search(pattern, content_lower):
-                detected = True
-                indicators.append(f"JS rendering pattern: {pattern}")
-                confidence = max(confidence, 0.7)
-                break
+        rendering_pattern = _JS_RENDERING_MATCHER.search(content_head)
+        if rendering_pattern:
+            detected = True
+            indicators.append(f"JS rendering pattern: {rendering_pattern}")
+            confidence = max(confidence, 0.7)
         
         return {
             'detected': detected,
@@ -461,3 +607,12 @@ class SecurityDetector:
             'confidence': confidence
         }
 
+
+# Indicator matchers are built once at import time and shared by all detectors
+_CLOUDFLARE_MATCHER = _PatternMatcher(SecurityDetector.CLOUDFLARE_INDICATORS)
+_AKAMAI_MATCHER = _PatternMatcher(SecurityDetector.AKAMAI_INDICATORS)
+_CAPTCHA_MATCHER = _PatternMatcher(SecurityDetector.CAPTCHA_INDICATORS)
+_JS_CHALLENGE_MATCHER = _PatternMatcher(SecurityDetector.JS_CHALLENGE_INDICATORS)
+_JS_FRAMEWORK_MATCHER = _PatternMatcher(SecurityDetector.JS_FRAMEWORK_INDICATORS)
+_SHADOW_DOM_MATCHER = _PatternMatcher(SecurityDetector.SHADOW_DOM_INDICATORS)
+_JS_RENDERING_MATCHER = _PatternMatcher(SecurityDetector.JS_RENDERING_PATTERNS)
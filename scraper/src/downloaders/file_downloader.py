@@ -2,17 +2,24 @@
 File Downloader - Download PDF/DOC files with retry logic and deduplication
 """
 
+import asyncio
 import hashlib
 import os
-import time
+import ssl
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Tuple
 from urllib.parse import urlparse
-from datetime import datetime
+from uuid import uuid4
 
-from curl_cffi import requests
+import httpx
 from loguru import logger
 
+from .hashing import BatchHasher, sha256_file
+
+# Large chunks keep per-chunk Python overhead small relative to the copy
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
 
 class FileDownloader:
     """Download files with retry logic, hash calculation, and deduplication."""
@@ -23,7 +30,9 @@ class FileDownloader:
         max_file_size: int = 52428800,  # 50MB
         retry_attempts: int = 3,
         retry_delays: list = None,
-        timeout: int = 60
+        timeout: int = 60,
+        max_connections: int = 200,
+        max_keepalive_connections: int = 8
     ):
         """
         Initialize file downloader.
@@ -34,37 +43,75 @@ class FileDownloader:
             retry_attempts: Number of retry attempts
             retry_delays: List of delay seconds between retries
             timeout: Request timeout in seconds
+            max_connections: Connection pool size for async downloads
+            max_keepalive_connections: Idle keep-alive connections kept open
+                across all hosts (httpx has no per-host limit)
         """
         self.storage_path = Path(storage_path)
         self.max_file_size = max_file_size
         self.retry_attempts = retry_attempts
         self.retry_delays = retry_delays or [5, 15, 45]
         self.timeout = timeout
+        self._batch_hasher: Optional[BatchHasher] = None
+        
+        # Shared async client (created on first async download) so keep-alive
+        # connections and TLS sessions are reused across files
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._async_client: Optional[httpx.AsyncClient] = None
+        
+        # Content-addressable store: one copy of each file body, keyed by hash
+        # and sharded two levels deep (cas/ab/cd/abcd....pdf). Downloads are
+        # staged under tmp/ until their hash is known.
+        self.cas_root = self.storage_path / 'cas'
+        self.staging_path = self.storage_path / 'tmp'
+        
+        # Directories already created, so each shard is mkdir'ed once
+        self._dir_cache: Set[Path] = set()
+        self._dir_lock = threading.Lock()
+        
+        # file URL -> (ETag, result of the download that produced it)
+        self._etag_index: Dict[str, Tuple[str, Dict[str, Any]]] = {}
         
         # Ensure storage directories exist
         self._ensure_storage_dirs()
+        
+        logger.info(
+            f"File hashing via {ssl.OPENSSL_VERSION} "
+            f"(sha256 available: {'sha256' in hashlib.algorithms_available})"
+        )
     
     def _ensure_storage_dirs(self):
         """Create storage directory structure if it doesn't exist."""
-        for file_type in ['pdf', 'doc', 'docx']:
-            (self.storage_path / file_type).mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(self.cas_root)
+        self._ensure_dir(self.staging_path)
+    
+    def _ensure_dir(self, directory: Path):
+        """Create a directory once; later calls for the same path skip the syscalls."""
+        if directory in self._dir_cache:
+            return
+        with self._dir_lock:
+            if directory not in self._dir_cache:
+                directory.mkdir(parents=True, exist_ok=True)
+                self._dir_cache.add(directory)
     
     def download_file(
         self,
         file_url: str,
         file_type: str,
         domain: str,
-        session: Optional[requests.Session] = None,
         headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
-        Download a file with retry logic.
+        Download a file with retry logic from synchronous code.
+        
+        Runs download_file_async() to completion on a private event loop
+        and client, so it must not be called from inside a running loop.
         
         Args:
             file_url: URL of the file to download
             file_type: Type of file ('pdf', 'doc', or 'docx')
-            domain: Domain name for organizing files
-            session: Optional requests session (for connection pooling)
+            domain: Source domain (files are stored by content hash)
             headers: Optional custom headers
             
         Returns:
@@ -76,138 +123,287 @@ class FileDownloader:
                 'file_size': int,
                 'file_hash': str,
                 'content_type': str,
+                'deduplicated': bool,
                 'error': str
             }
         """
-        if session is None:
-            session = requests.Session()
+        async def run():
+            async with self._new_async_client() as client:
+                return await self._download(client, file_url, file_type, headers)
         
-        default_headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        if headers:
-            default_headers.update(headers)
+        return asyncio.run(run())
+    
+    async def download_file_async(
+        self,
+        file_url: str,
+        file_type: str,
+        domain: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Download a file with retry logic without blocking the event loop.
         
-        # Generate storage path
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        domain_dir = self.storage_path / file_type / domain / date_str
-        domain_dir.mkdir(parents=True, exist_ok=True)
+        Uses a shared httpx.AsyncClient so concurrent downloads reuse
+        kept-alive connections. Returns the same dictionary as download_file().
         
-        # Generate unique filename using UUID
-        from uuid import uuid4
-        original_filename = self._extract_filename(file_url)
-        file_uuid = uuid4()
-        file_ext = self._get_extension(file_type)
-        stored_filename = f"{file_uuid}{file_ext}"
+        Args:
+            file_url: URL of the file to download
+            file_type: Type of file ('pdf', 'doc', or 'docx')
+            domain: Source domain (files are stored by content hash)
+            headers: Optional custom headers
+        """
+        return await self._download(self._get_async_client(), file_url, file_type, headers)
+    
+    async def _download(
+        self,
+        client: httpx.AsyncClient,
+        file_url: str,
+        file_type: str,
+        headers: Optional[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Stream a file to the staging area with retries, then store it."""
+        loop = asyncio.get_running_loop()
+        default_headers = self._build_headers(headers)
         
-        file_path = domain_dir / stored_filename
+        # Skip the body entirely if the server still reports the ETag we
+        # stored for this URL; URLs never downloaded go straight to the GET
+        if file_url in self._etag_index:
+            try:
+                head = await client.head(file_url, headers=default_headers)
+                known = self._lookup_etag(file_url, head.headers.get('ETag'))
+                if known:
+                    return known
+            except httpx.HTTPError:
+                pass
+        
+        file_path = self._prepare_file_path(file_type)
         
-        # Download with retry logic
         last_error = None
         for attempt in range(self.retry_attempts):
             try:
                 logger.info(f"Downloading {file_url} (attempt {attempt + 1}/{self.retry_attempts})")
                 
-                response = session.get(
-                    file_url,
-                    headers=default_headers,
-                    timeout=self.timeout,
-                    allow_redirects=True,
-                    stream=True
-                )
-                response.raise_for_status()
-                
-                # Check content type
-                content_type = response.headers.get('Content-Type', '').lower()
-                if not self._is_valid_file_type(content_type, file_type):
-                    logger.warning(f"Unexpected content type {content_type} for {file_url}")
-                
-                # Check file size
-                content_length = response.headers.get('Content-Length')
-                if content_length:
-                    file_size = int(content_length)
+                async with client.stream('GET', file_url, headers=default_headers) as response:
+                    response.raise_for_status()
+                    
+                    content_type = response.headers.get('Content-Type', '').lower()
+                    if not self._is_valid_file_type(content_type, file_type):
+                        logger.warning(f"Unexpected content type {content_type} for {file_url}")
+                    
+                    content_length = response.headers.get('Content-Length')
+                    if content_length and int(content_length) > self.max_file_size:
+                        error_msg = f"File too large: {content_length} bytes (max: {self.max_file_size})"
+                        logger.error(error_msg)
+                        return self._failure_result(error_msg, content_type)
+                    
+                    # Each chunk is written on a worker thread while the next
+                    # one is received, so disk writes overlap socket reads
+                    file_size = 0
+                    pending_write = None
+                    with open(file_path, 'wb') as f:
+                        try:
+                            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                                file_size += len(chunk)
+                                if file_size > self.max_file_size:
+                                    break
+                                
+                                if pending_write is not None:
+                                    await pending_write
+                                pending_write = loop.run_in_executor(None, f.write, chunk)
+                        finally:
+                            if pending_write is not None:
+                                await pending_write
+                    
                     if file_size > self.max_file_size:
+                        file_path.unlink()  # Delete partial file
                         error_msg = f"File too large: {file_size} bytes (max: {self.max_file_size})"
                         logger.error(error_msg)
-                        return {
-                            'success': False,
-                            'error': error_msg,
-                            'file_path': None,
-                            'stored_filename': None,
-                            'file_size': None,
-                            'file_hash': None,
-                            'content_type': content_type
-                        }
-                
-                # Download file
-                file_size = 0
-                hasher = hashlib.sha256()
-                
-                with open(file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            file_size += len(chunk)
-                            hasher.update(chunk)
-                            
-                            # Check size during download
-                            if file_size > self.max_file_size:
-                                file_path.unlink()  # Delete partial file
-                                error_msg = f"File too large: {file_size} bytes (max: {self.max_file_size})"
-                                logger.error(error_msg)
-                                return {
-                                    'success': False,
-                                    'error': error_msg,
-                                    'file_path': None,
-                                    'stored_filename': None,
-                                    'file_size': None,
-                                    'file_hash': None,
-                                    'content_type': content_type
-                                }
-                
-                file_hash = hasher.hexdigest()
-                
-                # Get relative path from storage root
-                relative_path = str(file_path.relative_to(self.storage_path))
+                        return self._failure_result(error_msg, content_type)
+                    
+                    etag = response.headers.get('ETag')
                 
-                logger.info(f"Successfully downloaded {file_url} ({file_size} bytes, hash: {file_hash[:16]}...)")
-                
-                return {
-                    'success': True,
-                    'file_path': relative_path,
-                    'stored_filename': stored_filename,
-                    'file_size': file_size,
-                    'file_hash': file_hash,
-                    'content_type': content_type,
-                    'error': None
-                }
+                # Hash on the shared pool: a page's concurrent downloads are
+                # hashed in parallel, but never more than one file per worker
+                file_hash = await asyncio.wrap_future(self._get_batch_hasher().submit(file_path))
+                return await asyncio.to_thread(
+                    self._finish_download,
+                    file_url, file_path, file_hash, file_size, content_type, etag
+                )
                 
-            except requests.RequestException as e:
+            except httpx.HTTPError as e:
                 last_error = str(e)
                 logger.warning(f"Download attempt {attempt + 1} failed: {last_error}")
                 
                 if attempt < self.retry_attempts - 1:
                     delay = self.retry_delays[min(attempt, len(self.retry_delays) - 1)]
                     logger.info(f"Retrying in {delay} seconds...")
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                 else:
                     logger.error(f"All download attempts failed for {file_url}")
         
-        # Clean up partial file if it exists
+        self._remove_partial_file(file_path)
+        return self._failure_result(last_error or "Unknown error")
+    
+    def _finish_download(
+        self,
+        file_url: str,
+        file_path: Path,
+        file_hash: str,
+        file_size: int,
+        content_type: str,
+        etag: Optional[str]
+    ) -> Dict[str, Any]:
+        """Move a hashed staged download into the CAS and build its result."""
+        stored_filename = f"{file_hash}{file_path.suffix}"
+        cas_path, deduplicated = self._store_in_cas(file_path, file_hash, file_path.suffix)
+        if not deduplicated:
+            self._drop_page_cache(cas_path)
+        
+        # Get relative path from storage root
+        relative_path = str(cas_path.relative_to(self.storage_path))
+        
+        logger.info(f"Successfully downloaded {file_url} ({file_size} bytes, hash: {file_hash[:16]}...)")
+        
+        result = {
+            'success': True,
+            'file_path': relative_path,
+            'stored_filename': stored_filename,
+            'file_size': file_size,
+            'file_hash': file_hash,
+            'content_type': content_type,
+            'deduplicated': deduplicated,
+            'error': None
+        }
+        if etag:
+            self._etag_index[file_url] = (etag, result)
+        return result
+    
+    def _store_in_cas(self, file_path: Path, file_hash: str, file_ext: str) -> Tuple[Path, bool]:
+        """
+        Move a staged download to its content-addressed path.
+        
+        If the hash is already stored, the staged copy is simply discarded.
+        
+        Returns:
+            Tuple of (CAS path, True if the body was already stored)
+        """
+        cas_dir = self.cas_root / file_hash[:2] / file_hash[2:4]
+        cas_path = cas_dir / f"{file_hash}{file_ext}"
+        
+        if cas_path.exists():
+            file_path.unlink()
+            return cas_path, True
+        
+        self._ensure_dir(cas_dir)
+        os.replace(file_path, cas_path)
+        return cas_path, False
+    
+    def _drop_page_cache(self, file_path: Path):
+        """
+        Tell the kernel a stored file won't be read again soon.
+        
+        Downloads are written and hashed once, then left on disk; without the
+        hint their pages would push more useful data out of the page cache.
+        DONTNEED only evicts clean pages, so the data is flushed first; this
+        runs on a worker thread, off the event loop.
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            fd = os.open(file_path, os.O_WRONLY)
+        except OSError:
+            return
+        try:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def _lookup_etag(self, file_url: str, etag: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the earlier result for a URL whose ETag is unchanged, marked as deduplicated."""
+        if not etag:
+            return None
+        stored_etag, known = self._etag_index.get(file_url, (None, None))
+        if stored_etag != etag:
+            return None
+        logger.info(f"Skipping download of {file_url}: ETag {etag} already stored")
+        return {**known, 'deduplicated': True}
+    
+    def _get_batch_hasher(self) -> BatchHasher:
+        """Get the shared hashing pool, creating it on first use."""
+        if self._batch_hasher is None:
+            self._batch_hasher = BatchHasher()
+        return self._batch_hasher
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the shared async client, creating it on first use."""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = self._new_async_client()
+        return self._async_client
+    
+    def _new_async_client(self) -> httpx.AsyncClient:
+        """Create an async client with the downloader's timeout and pool limits."""
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=60
+            )
+        )
+    
+    async def aclose(self):
+        """Close the shared async client and the hashing threads."""
+        if self._batch_hasher is not None:
+            self._batch_hasher.close()
+            self._batch_hasher = None
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    def _build_headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """Merge custom headers over the default download headers."""
+        default_headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        if headers:
+            default_headers.update(headers)
+        return default_headers
+    
+    def _prepare_file_path(self, file_type: str) -> Path:
+        """
+        Pick a staging path for a download whose hash is not known yet.
+        
+        Returns:
+            Absolute path of the staging file
+        """
+        # Generate unique filename using UUID
+        file_ext = self._get_extension(file_type)
+        
+        return self.staging_path / f"{uuid4().hex}{file_ext}"
+    
+    def _remove_partial_file(self, file_path: Path):
+        """Clean up partial file if it exists."""
         if file_path.exists():
             try:
                 file_path.unlink()
             except Exception:
                 pass
-        
+    
+    def _failure_result(self, error: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Build the result dictionary for a failed download."""
         return {
             'success': False,
-            'error': last_error or "Unknown error",
+            'error': error,
             'file_path': None,
             'stored_filename': None,
             'file_size': None,
             'file_hash': None,
-            'content_type': None
+            'content_type': content_type,
+            'deduplicated': False
         }
     
     def _extract_filename(self, url: str) -> str:
@@ -253,9 +449,4 @@ class FileDownloader:
         Returns:
             SHA-256 hash as hex string
         """
-        hasher = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                hasher.update(chunk)
-        return hasher.hexdigest()
-
+        return sha256_file(file_path)
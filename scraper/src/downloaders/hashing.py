@@ -0,0 +1,107 @@
+"""
+File Hashing - SHA-256 fingerprints for downloaded files
+"""
+
+import hashlib
+import mmap
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+# Read size for the pre-3.11 fallback loop
+READ_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Largest file hashed through mmap; bigger files (beyond the address space
+# of a 32-bit build) are streamed instead
+MMAP_MAX_SIZE = sys.maxsize
+
+
+def new_sha256():
+    """
+    Create a SHA-256 hasher for file fingerprints.
+
+    The hash is only used for deduplication, so it is marked as not used for
+    security; OpenSSL >= 1.1.1 picks SHA-NI / ARMv8 crypto paths when the CPU
+    supports them.
+    """
+    return hashlib.new('sha256', usedforsecurity=False)
+
+
+def sha256_file(file_path: Union[str, Path]) -> str:
+    """
+    Calculate SHA-256 hash of a file.
+
+    Args:
+        file_path: Path to file
+
+    Returns:
+        SHA-256 hash as hex string
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if 0 < size <= MMAP_MAX_SIZE:
+            # Hash the mapped file in a single update() call: OpenSSL walks
+            # the whole buffer in C with the GIL released, and no bytes are
+            # copied through Python read buffers
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                hasher = new_sha256()
+                hasher.update(mapped)
+                return hasher.hexdigest()
+
+        if hasattr(os, 'posix_fadvise'):
+            # Files are read once front to back; ask for larger readahead
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        if sys.version_info >= (3, 11):
+            # Hashes in C over an internal buffer, releasing the GIL
+            return hashlib.file_digest(f, new_sha256).hexdigest()
+
+        hasher = new_sha256()
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class BatchHasher:
+    """
+    Hash downloaded files several at a time.
+
+    hashlib releases the GIL while it hashes, so a small thread pool keeps
+    one file per core in flight instead of hashing the backlog serially.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize batch hasher.
+
+        Args:
+            max_workers: Number of files hashed concurrently
+                (defaults to the CPU count, capped at 8)
+        """
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, file_path: Union[str, Path]) -> Future:
+        """Queue a file for hashing; the future resolves to the hex digest."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='batch-hasher'
+            )
+        return self._executor.submit(sha256_file, file_path)
+
+    def close(self):
+        """Shut down the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -7,10 +7,100 @@ from typing import Dict, List, Optional, Set, Any
 from bs4 import BeautifulSoup
 from loguru import logger
 
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+
+# Country name -> ISO code for the names extract_countries() can return
+_COUNTRY_CODES: Dict[str, str] = {
+    'United States': 'US', 'USA': 'US', 'U.S.': 'US', 'U.S.A.': 'US',
+    'United Kingdom': 'GB', 'UK': 'GB', 'U.K.': 'GB',
+    'India': 'IN', 'Philippines': 'PH', 'Mexico': 'MX',
+    'Brazil': 'BR', 'Canada': 'CA', 'Australia': 'AU'
+}
+
+# Certifications classified as 'Security' (everything else is 'Quality')
+_SECURITY_RE = re.compile(r'ISO|SOC|HIPAA|PCI', re.IGNORECASE)
+
 
 class EntityExtractor:
     """Extract organization facts from HTML content."""
     
+    certification_patterns = [
+        r'\b(ISO\s*\d{4,5})\b',
+        r'\b(SOC\s*[12])\b',
+        r'\b(HIPAA)\b',
+        r'\b(PCI\s*DSS)\b',
+        r'\b(GDPR)\b',
+        r'\b(COPC)\b',
+        r'\b(CMMI)\b',
+        r'\b(PCI\s*SSC)\b'
+    ]
+    
+    award_issuers = [
+        'Gartner', 'Forrester', 'Stevie', 'Webby', 'Effie',
+        'J.D. Power', 'G2', 'Capterra', 'TrustRadius'
+    ]
+    
+    b2b_indicators = [
+        r'\benterprise\b', r'\bb2b\b', r'\bbusiness[-\s]to[-\s]business\b',
+        r'\bcorporate\b', r'\bclients?\b', r'\bpartners?\b'
+    ]
+    
+    b2c_indicators = [
+        r'\bconsumer\b', r'\bb2c\b', r'\bbusiness[-\s]to[-\s]consumer\b',
+        r'\bcustomers?\b', r'\bend[-\s]users?\b'
+    ]
+    
+    # Each pattern group is unioned into one regex so the text is scanned
+    # once per group instead of once per pattern
+    _cert_union = '|'.join(f'(?P<c{i}>{p})' for i, p in enumerate(certification_patterns))
+    _country_union = (
+        r'\b(?P<country>United States|USA|U\.S\.|U\.S\.A\.'
+        r'|United Kingdom|UK|U\.K\.'
+        r'|India|Philippines|Mexico|Brazil|Canada|Australia)\b'
+    )
+    _b2b_union = '|'.join(b2b_indicators)
+    _b2c_union = '|'.join(b2c_indicators)
+    
+    _cert_re = re.compile(_cert_union, re.IGNORECASE)
+    _country_re = re.compile(_country_union, re.IGNORECASE)
+    _b2b_re = re.compile(_b2b_union, re.IGNORECASE)
+    _b2c_re = re.compile(_b2c_union, re.IGNORECASE)
+    
+    # All of the above in one regex, so extract_facts_from_html() walks the
+    # text once for certifications, countries and segment keywords. Every
+    # alternative starts on a word boundary followed by a letter, so matches
+    # of different groups never overlap, and the leading guard lets the
+    # engine reject most positions before trying any alternative.
+    _facts_re = re.compile(
+        r'\b(?=[a-z])(?:'
+        f'{_cert_union}|{_country_union}|(?P<b2b>{_b2b_union})|(?P<b2c>{_b2c_union})'
+        ')',
+        re.IGNORECASE
+    )
+    
+    # Prefilter run on the raw HTML before any parsing. It looks for the
+    # rare words a fact needs: certification names, award issuers, country
+    # names and explicit segment terms (b2b, business-to-consumer, ...).
+    # Generic segment words (client, customer, user, ...) are on nearly every
+    # page, so a page whose only signal is one of them is skipped and does
+    # not set the customer segment. Short stems that are also word prefixes
+    # (ISO, SOC, ...) must not run into another letter.
+    _keyword_re = re.compile(
+        r'\b(?:'
+        r'(?:ISO|SOC|UK|USA)(?![a-z])|PCI|HIPAA|GDPR|COPC|CMMI'
+        r'|Gartner|Forrester|Stevie|Webby|Effie|J\.D\. Power|G2|Capterra|TrustRadius'
+        r'|United\s+(?:States|Kingdom)|U\.S\.|U\.K\.'
+        r'|India|Philippines|Mexico|Brazil|Canada|Australia'
+        r'|b2[bc]|business[-\s]to[-\s]'
+        r')',
+        re.IGNORECASE
+    )
+    
     def __init__(self, conn=None):
         """
         Initialize entity extractor.
@@ -19,48 +109,27 @@ class EntityExtractor:
             conn: Optional database connection for reference lookups
         """
         self.conn = conn
-        self.certification_patterns = [
-            r'\b(ISO\s*\d{4,5})\b',
-            r'\b(SOC\s*[12])\b',
-            r'\b(HIPAA)\b',
-            r'\b(PCI\s*DSS)\b',
-            r'\b(GDPR)\b',
-            r'\b(COPC)\b',
-            r'\b(CMMI)\b',
-            r'\b(PCI\s*SSC)\b'
-        ]
-        
-        self.award_issuers = [
-            'Gartner', 'Forrester', 'Stevie', 'Webby', 'Effie',
-            'J.D. Power', 'G2', 'Capterra', 'TrustRadius'
-        ]
-        
-        self.b2b_indicators = [
-            r'\benterprise\b', r'\bb2b\b', r'\bbusiness[-\s]to[-\s]business\b',
-            r'\bcorporate\b', r'\bclients?\b', r'\bpartners?\b'
-        ]
-        
-        self.b2c_indicators = [
-            r'\bconsumer\b', r'\bb2c\b', r'\bbusiness[-\s]to[-\s]consumer\b',
-            r'\bcustomers?\b', r'\bend[-\s]users?\b'
-        ]
     
     def extract_certifications(self, text: str) -> List[str]:
         """Extract certification mentions from text."""
         certifications = set()
-        text_upper = text.upper()
         
-        for pattern in self.certification_patterns:
-            matches = re.findall(pattern, text_upper, re.IGNORECASE)
-            for match in matches:
-                certifications.add(match.strip())
+        for match in self._cert_re.finditer(text):
+            certifications.add(match.group(match.lastgroup).strip().upper())
         
         return list(certifications)
     
-    def extract_awards(self, text: str) -> List[Dict[str, str]]:
-        """Extract award mentions from text."""
+    def extract_awards(self, text: str, text_lower: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Extract award mentions from text.
+        
+        Args:
+            text: Page text
+            text_lower: Lowercased text, if the caller already computed it
+        """
         awards = []
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         
         for issuer in self.award_issuers:
             # Look for patterns like "Gartner Magic Quadrant", "Stevie Award", etc.
@@ -83,20 +152,7 @@ class EntityExtractor:
     def extract_countries(self, text: str) -> List[str]:
         """Extract country mentions (basic implementation)."""
         # This is a simplified version - could be enhanced with NER
-        countries = set()
-        
-        # Common country patterns
-        country_patterns = [
-            r'\b(United States|USA|U\.S\.|U\.S\.A\.)\b',
-            r'\b(United Kingdom|UK|U\.K\.)\b',
-            r'\b(India|Philippines|Mexico|Brazil|Canada|Australia)\b',
-        ]
-        
-        for pattern in country_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                countries.add(match)
-        
+        countries = set(self._country_re.findall(text))
         return list(countries)
     
     def determine_customer_segment(self, text: str) -> Optional[str]:
@@ -106,20 +162,68 @@ class EntityExtractor:
         Returns:
             'B2B', 'B2C', 'Both', or None
         """
-        text_lower = text.lower()
-        
-        b2b_count = sum(1 for pattern in self.b2b_indicators if re.search(pattern, text_lower))
-        b2c_count = sum(1 for pattern in self.b2c_indicators if re.search(pattern, text_lower))
-        
-        if b2b_count > 0 and b2c_count > 0:
+        is_b2b = self._b2b_re.search(text) is not None
+        is_b2c = self._b2c_re.search(text) is not None
+        return self._segment(is_b2b, is_b2c)
+    
+    def _segment(self, is_b2b: bool, is_b2c: bool) -> Optional[str]:
+        """Map B2B/B2C indicator hits to a customer segment."""
+        if is_b2b and is_b2c:
             return 'Both'
-        elif b2b_count > 0:
+        elif is_b2b:
             return 'B2B'
-        elif b2c_count > 0:
+        elif is_b2c:
             return 'B2C'
         
         return None
     
+    def scan_facts(self, text: str) -> Dict[str, Any]:
+        """
+        Extract certifications, countries and customer segment in one pass.
+        
+        Returns:
+            Dictionary with 'certifications', 'countries' and 'customer_segment',
+            matching extract_certifications(), extract_countries() and
+            determine_customer_segment()
+        """
+        certifications = set()
+        countries = set()
+        is_b2b = is_b2c = False
+        
+        for match in self._facts_re.finditer(text):
+            group = match.lastgroup
+            if group == 'country':
+                countries.add(match.group(group))
+            elif group == 'b2b':
+                is_b2b = True
+            elif group == 'b2c':
+                is_b2c = True
+            else:
+                certifications.add(match.group(group).strip().upper())
+        
+        return {
+            'certifications': list(certifications),
+            'countries': list(countries),
+            'customer_segment': self._segment(is_b2b, is_b2c)
+        }
+    
+    def extract_text(self, html_content: str) -> str:
+        """
+        Get the visible text of an HTML document.
+        
+        Uses selectolax's C parser when installed, otherwise BeautifulSoup.
+        Script and style contents are dropped in both cases.
+        """
+        if SELECTOLAX_AVAILABLE:
+            tree = HTMLParser(html_content)
+            tree.strip_tags(['script', 'style'])
+            if tree.root is None:
+                return ''
+            return tree.root.text(separator=' ', strip=True)
+        
+        soup = BeautifulSoup(html_content, 'html.parser')
+        return soup.get_text(separator=' ', strip=True)
+    
     def extract_facts_from_html(
         self,
         html_content: str,
@@ -131,16 +235,28 @@ class EntityExtractor:
         Returns:
             Dictionary with extracted facts
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if not self._keyword_re.search(html_content):
+            return {
+                'certifications': [],
+                'awards': [],
+                'countries': [],
+                'customer_segment': None,
+                'products': [],
+                'services': [],
+                'platforms': []
+            }
         
-        # Get text content
-        text = soup.get_text(separator=' ', strip=True)
+        text = self.extract_text(html_content)
+        # Lowercased once and shared by the extractors that need it
+        text_lower = text.lower()
+        
+        scanned = self.scan_facts(text)
         
         facts = {
-            'certifications': self.extract_certifications(text),
-            'awards': self.extract_awards(text),
-            'countries': self.extract_countries(text),
-            'customer_segment': self.determine_customer_segment(text),
+            'certifications': scanned['certifications'],
+            'awards': self.extract_awards(text, text_lower),
+            'countries': scanned['countries'],
+            'customer_segment': scanned['customer_segment'],
             'products': [],  # Would need NER or heuristics matching
             'services': [],  # Would need taxonomy matching
             'platforms': []  # Would need tech term matching
@@ -154,21 +270,28 @@ async def extract_and_store_organization_facts(
     domain: str,
     url: str,
     html_content: str,
-    scraped_site_id: Optional[int] = None
+    scraped_site_id: Optional[int] = None,
+    org_db=None
 ):
     """
     Extract organization facts from scraped content and store in database.
     
+    Evidence rows for the page's facts are buffered and written with one
+    COPY once all facts are stored, instead of one INSERT per fact group.
+    
     Args:
         conn: Database connection
         domain: Organization domain
         url: Source URL
         html_content: HTML content
         scraped_site_id: ID of scraped_sites record
+        org_db: Optional OrganizationDB with buffered evidence, reused across
+            pages so rows from a failed COPY are retried with the next page
     """
     try:
-        from ..models.organization import OrganizationDB
-        org_db = OrganizationDB(conn)
+        if org_db is None:
+            from ..models.organization import OrganizationDB
+            org_db = OrganizationDB(conn, buffer_evidence=True)
         
         # Ensure organization exists
         org = await org_db.get_organization_by_domain(domain)
@@ -183,38 +306,33 @@ async def extract_and_store_organization_facts(
         facts = extractor.extract_facts_from_html(html_content, url)
         
         # Store certifications
-        for cert_name in facts['certifications']:
-            cert_type = 'Security' if any(x in cert_name.upper() for x in ['ISO', 'SOC', 'HIPAA', 'PCI']) else 'Quality'
-            await org_db.upsert_certification(
-                org_id, cert_name, cert_type, url, scraped_site_id
-            )
+        cert_names = facts['certifications']
+        cert_types = [
+            'Security' if _SECURITY_RE.search(cert_name) else 'Quality'
+            for cert_name in cert_names
+        ]
+        await org_db.upsert_certifications(
+            org_id, cert_names, cert_types, url, scraped_site_id
+        )
         
         # Store awards
-        for award in facts['awards']:
-            await org_db.upsert_award(
-                org_id,
-                award['award_name'],
-                award.get('award_issuer'),
-                None,  # year
-                None,  # category
-                url,
-                scraped_site_id
-            )
+        await org_db.upsert_awards(
+            org_id,
+            [award['award_name'] for award in facts['awards']],
+            [award.get('award_issuer') for award in facts['awards']],
+            url,
+            scraped_site_id
+        )
         
         # Store operating markets
-        for country in facts['countries']:
-            # Map country name to code (simplified)
-            country_code_map = {
-                'United States': 'US', 'USA': 'US', 'U.S.': 'US', 'U.S.A.': 'US',
-                'United Kingdom': 'GB', 'UK': 'GB', 'U.K.': 'GB',
-                'India': 'IN', 'Philippines': 'PH', 'Mexico': 'MX',
-                'Brazil': 'BR', 'Canada': 'CA', 'Australia': 'AU'
-            }
-            country_code = country_code_map.get(country, country[:2].upper())
-            
-            await org_db.upsert_operating_market(
-                org_id, country_code, country, None, None, url, scraped_site_id
-            )
+        countries = facts['countries']
+        await org_db.upsert_operating_markets(
+            org_id,
+            [_COUNTRY_CODES.get(country, country[:2].upper()) for country in countries],
+            countries,
+            url,
+            scraped_site_id
+        )
         
         # Update customer segment if determined
         if facts['customer_segment']:
@@ -223,6 +341,8 @@ async def extract_and_store_organization_facts(
                 customer_segment=facts['customer_segment']
             )
         
+        await org_db.flush_evidence()
+        
         logger.debug(f"Extracted and stored facts for {domain} from {url}")
     
     except Exception as e:
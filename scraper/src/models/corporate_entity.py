@@ -2,13 +2,13 @@
 Database models for corporate entities and relationships.
 """
 
-import json
+from dataclasses import dataclass
 from datetime import datetime, date
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
 
 
-class CorporateEntity(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class CorporateEntity:
     """Model for corporate entity."""
     
     id: Optional[int] = None
@@ -29,14 +29,10 @@ class CorporateEntity(BaseModel):
     notes: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
-class EntityRelationship(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class EntityRelationship:
     """Model for entity relationship."""
     
     id: Optional[int] = None
@@ -53,7 +49,8 @@ class EntityRelationship(BaseModel):
     evidence_count: int = 1
 
 
-class OrganizationEntityMapping(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class OrganizationEntityMapping:
     """Model for organization to entity mapping."""
     
     id: Optional[int] = None
@@ -74,9 +71,12 @@ class CorporateEntityDB:
         Initialize database operations.
         
         Args:
-            connection: Database connection (asyncpg connection)
+            connection: Database connection (asyncpg connection or pool)
         """
         self.conn = connection
+        
+        # entity name -> id, so repeated names skip the lookup round trip
+        self._entity_id_cache: Dict[str, int] = {}
     
     async def create_or_get_entity(
         self,
@@ -93,6 +93,10 @@ class CorporateEntityDB:
         Returns:
             Entity ID
         """
+        cached_id = self._entity_id_cache.get(entity_name)
+        if cached_id:
+            return cached_id
+        
         # Check if exists by name or legal name
         query = """
             SELECT id FROM corporate_entities
@@ -101,6 +105,7 @@ class CorporateEntityDB:
         entity_id = await self.conn.fetchval(query, entity_name)
         
         if entity_id:
+            self._entity_id_cache[entity_name] = entity_id
             return entity_id
         
         # Create new
@@ -133,6 +138,8 @@ class CorporateEntityDB:
             kwargs.get('notes')
         )
         
+        if entity_id:
+            self._entity_id_cache[entity_name] = entity_id
         return entity_id
     
     async def get_entity_by_id(self, entity_id: int) -> Optional[Dict]:
@@ -209,34 +216,68 @@ class CorporateEntityDB:
         
         return mapping_id
     
-    async def get_entity_hierarchy(self, entity_id: int) -> Dict[str, Any]:
+    async def get_entity_hierarchy(self, entity_id: int, max_depth: int = 3) -> Dict[str, Any]:
         """
         Get entity hierarchy (parents and children).
         
+        Ancestors and descendants are walked in a single recursive query.
+        
+        Args:
+            entity_id: Entity ID
+            max_depth: Number of levels to walk in each direction
+                (1 returns only direct parents and children)
+        
         Returns:
-            Dict with 'parents' and 'children' lists
-        """
-        # Get parents
-        parents_query = """
-            SELECT er.*, ce.entity_name as parent_name
-            FROM entity_relationships er
-            JOIN corporate_entities ce ON er.parent_entity_id = ce.id
-            WHERE er.child_entity_id = $1 AND er.is_active = true
+            Dict with 'parents' and 'children' lists; each row carries its
+            'depth' (1 = direct relationship)
         """
-        parents = await self.conn.fetch(parents_query, entity_id)
-        
-        # Get children
-        children_query = """
-            SELECT er.*, ce.entity_name as child_name
-            FROM entity_relationships er
-            JOIN corporate_entities ce ON er.child_entity_id = ce.id
-            WHERE er.parent_entity_id = $1 AND er.is_active = true
+        query = """
+            WITH RECURSIVE ancestors AS (
+                SELECT er.*, 1 AS depth
+                FROM entity_relationships er
+                WHERE er.child_entity_id = $1 AND er.is_active = true
+                UNION ALL
+                SELECT er.*, a.depth + 1
+                FROM entity_relationships er
+                JOIN ancestors a ON er.child_entity_id = a.parent_entity_id
+                WHERE er.is_active = true AND a.depth < $2
+            ), descendants AS (
+                SELECT er.*, 1 AS depth
+                FROM entity_relationships er
+                WHERE er.parent_entity_id = $1 AND er.is_active = true
+                UNION ALL
+                SELECT er.*, d.depth + 1
+                FROM entity_relationships er
+                JOIN descendants d ON er.parent_entity_id = d.child_entity_id
+                WHERE er.is_active = true AND d.depth < $2
+            )
+            SELECT 'parent' AS direction, a.*, ce.entity_name AS related_name
+            FROM ancestors a
+            JOIN corporate_entities ce ON a.parent_entity_id = ce.id
+            UNION ALL
+            SELECT 'child' AS direction, d.*, ce.entity_name AS related_name
+            FROM descendants d
+            JOIN corporate_entities ce ON d.child_entity_id = ce.id
+            ORDER BY direction, depth
         """
-        children = await self.conn.fetch(children_query, entity_id)
+        rows = await self.conn.fetch(query, entity_id, max_depth)
+        
+        parents = []
+        children = []
+        for row in rows:
+            record = dict(row)
+            direction = record.pop('direction')
+            related_name = record.pop('related_name')
+            if direction == 'parent':
+                record['parent_name'] = related_name
+                parents.append(record)
+            else:
+                record['child_name'] = related_name
+                children.append(record)
         
         return {
-            'parents': [dict(row) for row in parents],
-            'children': [dict(row) for row in children]
+            'parents': parents,
+            'children': children
         }
     
     async def get_organization_entities(self, organization_id: int) -> List[Dict]:
@@ -2,14 +2,59 @@
 Database model for downloaded files.
 """
 
-import json
+import re
+import sys
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from uuid import UUID
-from pydantic import BaseModel, Field, validator
 
+from ..utils.jsonb import dumps_jsonb
 
-class DownloadedFile(BaseModel):
+
+_FILE_TYPE_RE = re.compile(r'^(pdf|doc|docx)$')
+_DOWNLOAD_STATUS_RE = re.compile(r'^(pending|downloaded|failed)$')
+_OCR_STATUS_RE = re.compile(r'^(pending|processing|completed|failed)$')
+
+# Column list and typed placeholders shared by the file record INSERTs
+_INSERT_COLUMNS = """
+    uuid, source_url, file_url, domain, file_type,
+    original_filename, stored_filename, file_path,
+    file_size, file_hash, content_type, parent_page_url,
+    download_status, download_error, ocr_status, metadata,
+    downloaded_at
+"""
+_INSERT_VALUES = """
+    COALESCE($1::uuid, uuid_generate_v4()), $2::text, $3::text, $4::varchar, $5::varchar,
+    $6::text, $7::text, $8::text, $9::bigint, $10::bytea, $11::varchar, $12::text,
+    $13::varchar, $14::text, $15::varchar, $16::jsonb, $17::timestamp
+"""
+
+_INSERT_SQL = f"""
+    INSERT INTO downloaded_files ({_INSERT_COLUMNS})
+    VALUES ({_INSERT_VALUES})
+    RETURNING id
+"""
+
+# Inserts only when no downloaded file has the same hash ($10)
+_INSERT_IF_NEW_SQL = f"""
+    WITH duplicate AS (
+        SELECT id FROM downloaded_files
+        WHERE file_hash = $10::bytea AND download_status = 'downloaded'
+        LIMIT 1
+    ), inserted AS (
+        INSERT INTO downloaded_files ({_INSERT_COLUMNS})
+        SELECT {_INSERT_VALUES}
+        WHERE NOT EXISTS (SELECT 1 FROM duplicate)
+        RETURNING id
+    )
+    SELECT (SELECT id FROM inserted) AS file_id,
+           (SELECT id FROM duplicate) AS duplicate_id
+"""
+
+
+@dataclass(slots=True, kw_only=True)
+class DownloadedFile:
     """Model for downloaded file metadata."""
     
     id: Optional[int] = None
@@ -17,28 +62,62 @@ class DownloadedFile(BaseModel):
     source_url: str
     file_url: str
     domain: str
-    file_type: str = Field(..., pattern='^(pdf|doc|docx)$')
+    file_type: str
     original_filename: Optional[str] = None
     stored_filename: str
     file_path: str
     file_size: Optional[int] = None
-    file_hash: Optional[str] = None
+    file_hash: Optional[bytes] = None  # raw SHA-256 digest
     content_type: Optional[str] = None
     parent_page_url: Optional[str] = None
-    download_status: str = Field(default='pending', pattern='^(pending|downloaded|failed)$')
+    download_status: str = 'pending'
     download_error: Optional[str] = None
-    ocr_status: str = Field(default='pending', pattern='^(pending|processing|completed|failed)$')
+    ocr_status: str = 'pending'
     ocr_error: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
     downloaded_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            UUID: lambda v: str(v)
-        }
+    def __post_init__(self):
+        # Every file from a site carries the same domain; share one str
+        self.domain = sys.intern(self.domain)
+        if not _FILE_TYPE_RE.match(self.file_type):
+            raise ValueError(f"Invalid file_type: {self.file_type!r}")
+        if not _DOWNLOAD_STATUS_RE.match(self.download_status):
+            raise ValueError(f"Invalid download_status: {self.download_status!r}")
+        if not _OCR_STATUS_RE.match(self.ocr_status):
+            raise ValueError(f"Invalid ocr_status: {self.ocr_status!r}")
+    
+    def to_db_tuple(self) -> tuple:
+        """
+        Build the INSERT parameters for this record.
+        
+        Returns:
+            Values for _INSERT_VALUES, in column order
+        """
+        # Convert metadata dict to JSON string for JSONB column
+        metadata_json = dumps_jsonb(self.metadata) if self.metadata else None
+        
+        return (
+            self.uuid,
+            self.source_url,
+            self.file_url,
+            self.domain,
+            self.file_type,
+            self.original_filename,
+            self.stored_filename,
+            self.file_path,
+            self.file_size,
+            self.file_hash,
+            self.content_type,
+            self.parent_page_url,
+            self.download_status,
+            self.download_error,
+            self.ocr_status,
+            metadata_json,
+            self.downloaded_at
+        )
 
 
 class DownloadedFileDB:
@@ -49,7 +128,9 @@ class DownloadedFileDB:
         Initialize database operations.
         
         Args:
-            connection: Database connection (asyncpg connection)
+            connection: asyncpg connection or pool; with a pool each query
+                runs on its own pooled connection, so concurrent callers
+                don't serialize on one socket
         """
         self.conn = connection
     
@@ -58,49 +139,34 @@ class DownloadedFileDB:
         Create a new file record in the database.
         
         Args:
-            file_data: DownloadedFile model instance
+            file_data: DownloadedFile instance
             
         Returns:
             ID of created record
         """
-        query = """
-            INSERT INTO downloaded_files (
-                uuid, source_url, file_url, domain, file_type,
-                original_filename, stored_filename, file_path,
-                file_size, file_hash, content_type, parent_page_url,
-                download_status, download_error, ocr_status, metadata,
-                downloaded_at
-            ) VALUES (
-                COALESCE($1, uuid_generate_v4()), $2, $3, $4, $5,
-                $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17
-            )
-            RETURNING id
-        """
+        result = await self.conn.fetchval(_INSERT_SQL, *file_data.to_db_tuple())
         
-        # Convert metadata dict to JSON string for JSONB column
-        metadata_json = json.dumps(file_data.metadata) if file_data.metadata else None
+        return result
+    
+    async def create_file_record_if_new(
+        self,
+        file_data: DownloadedFile
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Create a file record unless a downloaded file with the same hash exists.
         
-        result = await self.conn.fetchval(
-            query,
-            file_data.uuid,
-            file_data.source_url,
-            file_data.file_url,
-            file_data.domain,
-            file_data.file_type,
-            file_data.original_filename,
-            file_data.stored_filename,
-            file_data.file_path,
-            file_data.file_size,
-            file_data.file_hash,
-            file_data.content_type,
-            file_data.parent_page_url,
-            file_data.download_status,
-            file_data.download_error,
-            file_data.ocr_status,
-            metadata_json
-        )
+        The hash probe and the insert run as one statement, so the common
+        (new file) path costs a single round trip.
         
-        return result
+        Args:
+            file_data: DownloadedFile instance with file_hash set
+            
+        Returns:
+            Tuple of (ID of created record, ID of existing duplicate); exactly
+            one of the two is set
+        """
+        row = await self.conn.fetchrow(_INSERT_IF_NEW_SQL, *file_data.to_db_tuple())
+        return row['file_id'], row['duplicate_id']
     
     async def update_file_record(
         self,
@@ -108,7 +174,7 @@ class DownloadedFileDB:
         download_status: Optional[str] = None,
         download_error: Optional[str] = None,
         file_size: Optional[int] = None,
-        file_hash: Optional[str] = None,
+        file_hash: Optional[bytes] = None,
         content_type: Optional[str] = None,
         downloaded_at: Optional[datetime] = None
     ) -> bool:
@@ -120,58 +186,42 @@ class DownloadedFileDB:
             download_status: New download status
             download_error: Error message if failed
             file_size: File size in bytes
-            file_hash: SHA-256 hash
+            file_hash: SHA-256 digest (raw bytes)
             content_type: Content type
             downloaded_at: Download timestamp
             
         Returns:
             True if updated successfully
         """
-        updates = []
-        params = []
-        param_idx = 1
-        
-        if download_status is not None:
-            updates.append(f"download_status = ${param_idx}")
-            params.append(download_status)
-            param_idx += 1
-        
-        if download_error is not None:
-            updates.append(f"download_error = ${param_idx}")
-            params.append(download_error)
-            param_idx += 1
-        
-        if file_size is not None:
-            updates.append(f"file_size = ${param_idx}")
-            params.append(file_size)
-            param_idx += 1
-        
-        if file_hash is not None:
-            updates.append(f"file_hash = ${param_idx}")
-            params.append(file_hash)
-            param_idx += 1
-        
-        if content_type is not None:
-            updates.append(f"content_type = ${param_idx}")
-            params.append(content_type)
-            param_idx += 1
-        
-        if downloaded_at is not None:
-            updates.append(f"downloaded_at = ${param_idx}")
-            params.append(downloaded_at)
-            param_idx += 1
-        
-        if not updates:
+        if all(value is None for value in (
+            download_status, download_error, file_size,
+            file_hash, content_type, downloaded_at
+        )):
             return False
         
-        params.append(file_id)
-        query = f"""
-            UPDATE downloaded_files
-            SET {', '.join(updates)}
-            WHERE id = ${param_idx}
+        # Fixed statement text (None leaves a column unchanged) so the
+        # prepared plan is reused across calls
+        query = """
+            UPDATE downloaded_files SET
+                download_status = COALESCE($1, download_status),
+                download_error = COALESCE($2, download_error),
+                file_size = COALESCE($3, file_size),
+                file_hash = COALESCE($4, file_hash),
+                content_type = COALESCE($5, content_type),
+                downloaded_at = COALESCE($6, downloaded_at)
+            WHERE id = $7
         """
         
-        result = await self.conn.execute(query, *params)
+        result = await self.conn.execute(
+            query,
+            download_status,
+            download_error,
+            file_size,
+            file_hash,
+            content_type,
+            downloaded_at,
+            file_id
+        )
         return result == "UPDATE 1"
     
     async def check_file_exists(self, file_url: str) -> Optional[int]:
@@ -188,12 +238,12 @@ class DownloadedFileDB:
         result = await self.conn.fetchval(query, file_url)
         return result
     
-    async def check_hash_exists(self, file_hash: str) -> Optional[int]:
+    async def check_hash_exists(self, file_hash: bytes) -> Optional[int]:
         """
         Check if file hash already exists (for deduplication).
         
         Args:
-            file_hash: SHA-256 hash to check
+            file_hash: SHA-256 digest (raw bytes) to check
             
         Returns:
             File ID if hash exists, None otherwise
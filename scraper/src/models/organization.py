@@ -2,22 +2,34 @@
 Database models for organization profiles and related entities.
 """
 
-import json
+import asyncio
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, validator
+from typing import Optional, Dict, Any, List, Tuple
+import asyncpg
+from pydantic import BaseModel
 
+from ..utils.jsonb import dumps_jsonb
 
-class Organization(BaseModel):
+
+_CUSTOMER_SEGMENT_RE = re.compile(r'^(B2B|B2C|Both)$')
+
+
+@dataclass(slots=True, kw_only=True)
+class Organization:
     """Model for organization master record."""
     
     id: Optional[int] = None
     canonical_name: Optional[str] = None
     domain: str
-    aliases: Optional[List[str]] = Field(default_factory=list)
+    aliases: Optional[List[str]] = field(default_factory=list)
     organizational_type: Optional[str] = None
     organizational_classification: Optional[str] = None
-    customer_segment: Optional[str] = Field(None, pattern='^(B2B|B2C|Both)$')
+    customer_segment: Optional[str] = None
     founded_year: Optional[int] = None
     headquarters_country: Optional[str] = None
     employee_count_range: Optional[str] = None
@@ -25,10 +37,11 @@ class Organization(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    def __post_init__(self):
+        # One shared str per domain across records and cache keys
+        self.domain = sys.intern(self.domain)
+        if self.customer_segment is not None and not _CUSTOMER_SEGMENT_RE.match(self.customer_segment):
+            raise ValueError(f"Invalid customer_segment: {self.customer_segment!r}")
 
 
 class OrganizationProduct(BaseModel):
@@ -141,17 +154,102 @@ class OrganizationEvidence(BaseModel):
     extracted_at: Optional[datetime] = None
 
 
+# Organization columns update_organization() can set
+_ORGANIZATION_UPDATE_FIELDS = (
+    'canonical_name', 'aliases', 'organizational_type',
+    'organizational_classification', 'customer_segment', 'founded_year',
+    'headquarters_country', 'employee_count_range', 'auto_created'
+)
+
+# How long get_organization_by_domain serves a cached row
+_ORGANIZATION_ROW_TTL = 60.0
+
+# Columns written for each evidence row
+_EVIDENCE_COLUMNS = ['organization_id', 'fact_type', 'fact_id', 'source_url', 'scraped_site_id']
+
+
+_FACT_TABLES = (
+    'organization_products',
+    'organization_services',
+    'organization_platforms',
+    'organization_certifications',
+    'organization_awards',
+    'organization_operating_markets',
+    'organization_relationships'
+)
+
+_MARK_INACTIVE_QUERIES = [
+    f"""
+        WITH updated AS (
+            UPDATE {table}
+            SET is_active = false
+            WHERE is_active = true
+            -- Start of the month, `months` months back
+            AND last_seen_at < date_trunc('month', LOCALTIMESTAMP) - make_interval(months => $1)
+            RETURNING 1
+        )
+        SELECT count(*) FROM updated
+    """
+    for table in _FACT_TABLES
+]
+
+
+@lru_cache(maxsize=None)
+def _evidence_query(upsert_query: str, param_count: int) -> str:
+    """
+    Wrap an upsert so its returned ids feed an organization_evidence INSERT.
+    
+    Evidence parameters (fact_type, source_url, scraped_site_id) follow the
+    upsert's own `param_count` parameters. Upsert texts are fixed literals,
+    so each wrapped statement is built once.
+    """
+    evidence_idx = param_count + 1
+    return f"""
+        WITH upserted AS ({upsert_query}),
+        evidence AS (
+            INSERT INTO organization_evidence (
+                organization_id, fact_type, fact_id, source_url, scraped_site_id
+            )
+            SELECT $1, ${evidence_idx}::text, id, ${evidence_idx + 1}::text, ${evidence_idx + 2}::int
+            FROM upserted
+            WHERE ${evidence_idx + 1}::text IS NOT NULL
+        )
+        SELECT id FROM upserted
+    """
+
+
+def _dedupe_rows(rows, key) -> List[tuple]:
+    """Drop rows whose key was already seen, keeping the first occurrence."""
+    seen = set()
+    unique_rows = []
+    for row in rows:
+        row_key = key(row)
+        if row_key not in seen:
+            seen.add(row_key)
+            unique_rows.append(row)
+    return unique_rows
+
+
 class OrganizationDB:
     """Database operations for organizations."""
     
-    def __init__(self, connection):
+    def __init__(self, connection, buffer_evidence: bool = False):
         """
         Initialize database operations.
         
         Args:
-            connection: Database connection (asyncpg connection)
+            connection: Database connection (asyncpg connection or pool)
+            buffer_evidence: Queue evidence rows in memory instead of inserting
+                them with each upsert; the caller must call flush_evidence()
         """
         self.conn = connection
+        self.buffer_evidence = buffer_evidence
+        self._evidence_buffer: List[tuple] = []
+        
+        # domain -> id (ids never change), and domain -> (fetched at, row)
+        # for get_organization_by_domain, bounded by _ORGANIZATION_ROW_TTL
+        self._domain_to_id: Dict[str, int] = {}
+        self._org_row_cache: Dict[str, Tuple[float, Dict]] = {}
     
     async def create_or_get_organization(self, domain: str, **kwargs) -> int:
         """
@@ -164,11 +262,16 @@ class OrganizationDB:
         Returns:
             Organization ID
         """
+        cached_id = self._domain_to_id.get(domain)
+        if cached_id:
+            return cached_id
+        
         # Check if exists
         query = "SELECT id FROM organizations WHERE domain = $1"
         org_id = await self.conn.fetchval(query, domain)
         
         if org_id:
+            self._domain_to_id[sys.intern(domain)] = org_id
             return org_id
         
         # Create new
@@ -181,7 +284,7 @@ class OrganizationDB:
             RETURNING id
         """
         
-        aliases_json = json.dumps(kwargs.get('aliases', []))
+        aliases_json = dumps_jsonb(kwargs.get('aliases', []))
         
         org_id = await self.conn.fetchval(
             insert_query,
@@ -197,40 +300,82 @@ class OrganizationDB:
             kwargs.get('auto_created', False)
         )
         
+        if org_id:
+            self._domain_to_id[sys.intern(domain)] = org_id
         return org_id
     
     async def get_organization_by_domain(self, domain: str) -> Optional[Dict]:
         """Get organization by domain."""
+        cached = self._org_row_cache.get(domain)
+        if cached and time.monotonic() - cached[0] < _ORGANIZATION_ROW_TTL:
+            return dict(cached[1])
+        
         query = "SELECT * FROM organizations WHERE domain = $1"
         row = await self.conn.fetchrow(query, domain)
-        return dict(row) if row else None
+        if not row:
+            return None
+        
+        org = dict(row)
+        domain = sys.intern(domain)
+        self._org_row_cache[domain] = (time.monotonic(), org)
+        self._domain_to_id[domain] = org['id']
+        return dict(org)
     
     async def update_organization(self, org_id: int, **kwargs) -> bool:
-        """Update organization fields."""
-        updates = []
-        params = []
-        param_idx = 1
-        
-        for key, value in kwargs.items():
-            if key == 'aliases' and value is not None:
-                updates.append(f"aliases = ${param_idx}")
-                params.append(json.dumps(value))
-            elif value is not None:
-                updates.append(f"{key} = ${param_idx}")
-                params.append(value)
-            param_idx += 1
-        
-        if not updates:
+        """
+        Update organization fields.
+        
+        Fields passed as None are left unchanged. The statement text is the
+        same for every call, so its prepared plan is reused.
+        
+        Args:
+            org_id: Organization ID
+            **kwargs: Fields to update (see _ORGANIZATION_UPDATE_FIELDS)
+        
+        Returns:
+            True if updated successfully
+        """
+        unknown = set(kwargs) - set(_ORGANIZATION_UPDATE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown organization fields: {', '.join(sorted(unknown))}")
+        
+        if all(value is None for value in kwargs.values()):
             return False
         
-        params.append(org_id)
-        query = f"""
-            UPDATE organizations
-            SET {', '.join(updates)}
-            WHERE id = ${param_idx}
+        aliases = kwargs.get('aliases')
+        query = """
+            UPDATE organizations SET
+                canonical_name = COALESCE($1, canonical_name),
+                aliases = COALESCE($2::jsonb, aliases),
+                organizational_type = COALESCE($3, organizational_type),
+                organizational_classification = COALESCE($4, organizational_classification),
+                customer_segment = COALESCE($5, customer_segment),
+                founded_year = COALESCE($6, founded_year),
+                headquarters_country = COALESCE($7, headquarters_country),
+                employee_count_range = COALESCE($8, employee_count_range),
+                auto_created = COALESCE($9, auto_created)
+            WHERE id = $10
         """
         
-        result = await self.conn.execute(query, *params)
+        result = await self.conn.execute(
+            query,
+            kwargs.get('canonical_name'),
+            dumps_jsonb(aliases) if aliases is not None else None,
+            kwargs.get('organizational_type'),
+            kwargs.get('organizational_classification'),
+            kwargs.get('customer_segment'),
+            kwargs.get('founded_year'),
+            kwargs.get('headquarters_country'),
+            kwargs.get('employee_count_range'),
+            kwargs.get('auto_created'),
+            org_id
+        )
+        
+        # Drop cached rows for this organization so readers see the update
+        for domain, (_, org) in list(self._org_row_cache.items()):
+            if org['id'] == org_id:
+                del self._org_row_cache[domain]
+        
         return result == "UPDATE 1"
     
     async def upsert_product(
@@ -249,7 +394,7 @@ class OrganizationDB:
                 first_seen_at, last_seen_at, evidence_count, is_active
             ) VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true)
             ON CONFLICT (organization_id, product_name) DO UPDATE SET
-                category = EXCLUDED.category,
+                category = COALESCE(EXCLUDED.category, organization_products.category),
                 description = COALESCE(EXCLUDED.description, organization_products.description),
                 last_seen_at = CURRENT_TIMESTAMP,
                 evidence_count = organization_products.evidence_count + 1,
@@ -257,17 +402,62 @@ class OrganizationDB:
             RETURNING id
         """
         
-        product_id = await self.conn.fetchval(
-            query, organization_id, product_name, category, description
+        product_id = (await self._upsert_with_evidence(
+            query,
+            (organization_id, product_name, category, description),
+            'product', source_url, scraped_site_id
+        ))[0]
+        
+        return product_id
+    
+    async def upsert_products(
+        self,
+        organization_id: int,
+        product_names: List[str],
+        categories: List[Optional[str]],
+        descriptions: List[Optional[str]],
+        source_url: Optional[str] = None,
+        scraped_site_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Upsert several products in one statement.
+        
+        Product names are deduplicated (first occurrence wins).
+        
+        Returns:
+            Product IDs
+        """
+        rows = _dedupe_rows(
+            zip(product_names, categories, descriptions), key=lambda row: row[0]
         )
+        if not rows:
+            return []
         
-        # Add evidence if provided
-        if source_url:
-            await self.add_evidence(
-                organization_id, 'product', product_id, source_url, scraped_site_id
+        query = """
+            INSERT INTO organization_products (
+                organization_id, product_name, category, description,
+                first_seen_at, last_seen_at, evidence_count, is_active
             )
+            SELECT $1, t.product_name, t.category, t.description,
+                   CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true
+            FROM unnest($2::text[], $3::text[], $4::text[]) AS t(product_name, category, description)
+            ON CONFLICT (organization_id, product_name) DO UPDATE SET
+                category = COALESCE(EXCLUDED.category, organization_products.category),
+                description = COALESCE(EXCLUDED.description, organization_products.description),
+                last_seen_at = CURRENT_TIMESTAMP,
+                evidence_count = organization_products.evidence_count + 1,
+                is_active = true
+            RETURNING id
+        """
         
-        return product_id
+        names, row_categories, row_descriptions = zip(*rows)
+        product_ids = await self._upsert_with_evidence(
+            query,
+            (organization_id, list(names), list(row_categories), list(row_descriptions)),
+            'product', source_url, scraped_site_id
+        )
+        
+        return product_ids
     
     async def upsert_service(
         self,
@@ -279,7 +469,7 @@ class OrganizationDB:
         scraped_site_id: Optional[int] = None
     ) -> int:
         """Upsert organization service."""
-        path_json = json.dumps(service_path) if service_path else None
+        path_json = dumps_jsonb(service_path) if service_path else None
         
         query = """
             INSERT INTO organization_services (
@@ -287,7 +477,7 @@ class OrganizationDB:
                 first_seen_at, last_seen_at, evidence_count, is_active
             ) VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true)
             ON CONFLICT (organization_id, service_id) DO UPDATE SET
-                service_name = EXCLUDED.service_name,
+                service_name = COALESCE(EXCLUDED.service_name, organization_services.service_name),
                 service_path = COALESCE(EXCLUDED.service_path, organization_services.service_path),
                 last_seen_at = CURRENT_TIMESTAMP,
                 evidence_count = organization_services.evidence_count + 1,
@@ -295,16 +485,63 @@ class OrganizationDB:
             RETURNING id
         """
         
-        service_record_id = await self.conn.fetchval(
-            query, organization_id, service_id, service_name, path_json
+        service_record_id = (await self._upsert_with_evidence(
+            query,
+            (organization_id, service_id, service_name, path_json),
+            'service', source_url, scraped_site_id
+        ))[0]
+        
+        return service_record_id
+    
+    async def upsert_services(
+        self,
+        organization_id: int,
+        service_ids: List[str],
+        service_names: List[str],
+        service_paths: List[Optional[List[str]]],
+        source_url: Optional[str] = None,
+        scraped_site_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Upsert several services in one statement.
+        
+        Service IDs are deduplicated (first occurrence wins).
+        
+        Returns:
+            Service record IDs
+        """
+        rows = _dedupe_rows(
+            zip(service_ids, service_names, service_paths), key=lambda row: row[0]
         )
+        if not rows:
+            return []
         
-        if source_url:
-            await self.add_evidence(
-                organization_id, 'service', service_record_id, source_url, scraped_site_id
+        query = """
+            INSERT INTO organization_services (
+                organization_id, service_id, service_name, service_path,
+                first_seen_at, last_seen_at, evidence_count, is_active
             )
+            SELECT $1, t.service_id, t.service_name, t.service_path::jsonb,
+                   CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true
+            FROM unnest($2::text[], $3::text[], $4::text[]) AS t(service_id, service_name, service_path)
+            ON CONFLICT (organization_id, service_id) DO UPDATE SET
+                service_name = COALESCE(EXCLUDED.service_name, organization_services.service_name),
+                service_path = COALESCE(EXCLUDED.service_path, organization_services.service_path),
+                last_seen_at = CURRENT_TIMESTAMP,
+                evidence_count = organization_services.evidence_count + 1,
+                is_active = true
+            RETURNING id
+        """
         
-        return service_record_id
+        ids, names, paths = zip(*rows)
+        path_json = [dumps_jsonb(path) if path else None for path in paths]
+        service_record_ids = await self._upsert_with_evidence(
+            query,
+            (organization_id, list(ids), list(names), path_json),
+            'service', source_url, scraped_site_id
+        )
+        
+        return service_record_ids
     
     async def upsert_platform(
         self,
@@ -328,16 +565,58 @@ class OrganizationDB:
             RETURNING id
         """
         
-        platform_id = await self.conn.fetchval(
-            query, organization_id, platform_name, platform_type
-        )
+        platform_id = (await self._upsert_with_evidence(
+            query,
+            (organization_id, platform_name, platform_type),
+            'platform', source_url, scraped_site_id
+        ))[0]
+        
+        return platform_id
+    
+    async def upsert_platforms(
+        self,
+        organization_id: int,
+        platform_names: List[str],
+        platform_types: List[Optional[str]],
+        source_url: Optional[str] = None,
+        scraped_site_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Upsert several platforms in one statement.
+        
+        Platform names are deduplicated (first occurrence wins).
         
-        if source_url:
-            await self.add_evidence(
-                organization_id, 'platform', platform_id, source_url, scraped_site_id
+        Returns:
+            Platform IDs
+        """
+        rows = _dedupe_rows(zip(platform_names, platform_types), key=lambda row: row[0])
+        if not rows:
+            return []
+        
+        query = """
+            INSERT INTO organization_platforms (
+                organization_id, platform_name, platform_type,
+                first_seen_at, last_seen_at, evidence_count, is_active
             )
+            SELECT $1, t.platform_name, t.platform_type,
+                   CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true
+            FROM unnest($2::text[], $3::text[]) AS t(platform_name, platform_type)
+            ON CONFLICT (organization_id, platform_name) DO UPDATE SET
+                platform_type = COALESCE(EXCLUDED.platform_type, organization_platforms.platform_type),
+                last_seen_at = CURRENT_TIMESTAMP,
+                evidence_count = organization_platforms.evidence_count + 1,
+                is_active = true
+            RETURNING id
+        """
         
-        return platform_id
+        names, types = zip(*rows)
+        platform_ids = await self._upsert_with_evidence(
+            query,
+            (organization_id, list(names), list(types)),
+            'platform', source_url, scraped_site_id
+        )
+        
+        return platform_ids
     
     async def upsert_certification(
         self,
@@ -361,16 +640,61 @@ class OrganizationDB:
             RETURNING id
         """
         
-        cert_id = await self.conn.fetchval(
-            query, organization_id, certification_name, certification_type
+        cert_id = (await self._upsert_with_evidence(
+            query,
+            (organization_id, certification_name, certification_type),
+            'certification', source_url, scraped_site_id
+        ))[0]
+        
+        return cert_id
+    
+    async def upsert_certifications(
+        self,
+        organization_id: int,
+        certification_names: List[str],
+        certification_types: List[Optional[str]],
+        source_url: Optional[str] = None,
+        scraped_site_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Upsert several certifications in one statement.
+        
+        Names are deduplicated (first occurrence wins) since one INSERT
+        can't update the same conflicting row twice.
+        
+        Returns:
+            Certification IDs
+        """
+        rows = _dedupe_rows(
+            zip(certification_names, certification_types), key=lambda row: row[0]
         )
+        if not rows:
+            return []
         
-        if source_url:
-            await self.add_evidence(
-                organization_id, 'certification', cert_id, source_url, scraped_site_id
+        query = """
+            INSERT INTO organization_certifications (
+                organization_id, certification_name, certification_type,
+                first_seen_at, last_seen_at, evidence_count, is_active
             )
+            SELECT $1, t.certification_name, t.certification_type,
+                   CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true
+            FROM unnest($2::text[], $3::text[]) AS t(certification_name, certification_type)
+            ON CONFLICT (organization_id, certification_name) DO UPDATE SET
+                certification_type = COALESCE(EXCLUDED.certification_type, organization_certifications.certification_type),
+                last_seen_at = CURRENT_TIMESTAMP,
+                evidence_count = organization_certifications.evidence_count + 1,
+                is_active = true
+            RETURNING id
+        """
         
-        return cert_id
+        names, types = zip(*rows)
+        cert_ids = await self._upsert_with_evidence(
+            query,
+            (organization_id, list(names), list(types)),
+            'certification', source_url, scraped_site_id
+        )
+        
+        return cert_ids
     
     async def upsert_award(
         self,
@@ -397,16 +721,59 @@ class OrganizationDB:
             RETURNING id
         """
         
-        award_id = await self.conn.fetchval(
-            query, organization_id, award_name, award_issuer, award_year, category
-        )
+        award_id = (await self._upsert_with_evidence(
+            query,
+            (organization_id, award_name, award_issuer, award_year, category),
+            'award', source_url, scraped_site_id
+        ))[0]
+        
+        return award_id
+    
+    async def upsert_awards(
+        self,
+        organization_id: int,
+        award_names: List[str],
+        award_issuers: List[Optional[str]],
+        source_url: Optional[str] = None,
+        scraped_site_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Upsert several awards (without year/category) in one statement.
+        
+        Award names are deduplicated (first occurrence wins).
         
-        if source_url:
-            await self.add_evidence(
-                organization_id, 'award', award_id, source_url, scraped_site_id
+        Returns:
+            Award IDs
+        """
+        rows = _dedupe_rows(zip(award_names, award_issuers), key=lambda row: row[0])
+        if not rows:
+            return []
+        
+        query = """
+            INSERT INTO organization_awards (
+                organization_id, award_name, award_issuer, award_year, category,
+                first_seen_at, last_seen_at, evidence_count, is_active
             )
+            SELECT $1, t.award_name, t.award_issuer, NULL, NULL,
+                   CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true
+            FROM unnest($2::text[], $3::text[]) AS t(award_name, award_issuer)
+            ON CONFLICT (organization_id, award_name, award_year) DO UPDATE SET
+                award_issuer = COALESCE(EXCLUDED.award_issuer, organization_awards.award_issuer),
+                category = COALESCE(EXCLUDED.category, organization_awards.category),
+                last_seen_at = CURRENT_TIMESTAMP,
+                evidence_count = organization_awards.evidence_count + 1,
+                is_active = true
+            RETURNING id
+        """
         
-        return award_id
+        names, issuers = zip(*rows)
+        award_ids = await self._upsert_with_evidence(
+            query,
+            (organization_id, list(names), list(issuers)),
+            'award', source_url, scraped_site_id
+        )
+        
+        return award_ids
     
     async def upsert_operating_market(
         self,
@@ -425,7 +792,7 @@ class OrganizationDB:
                 first_seen_at, last_seen_at, evidence_count, is_active
             ) VALUES ($1, $2, $3, $4, $5, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true)
             ON CONFLICT (organization_id, country_code, operation_type) DO UPDATE SET
-                country_name = EXCLUDED.country_name,
+                country_name = COALESCE(EXCLUDED.country_name, organization_operating_markets.country_name),
                 region = COALESCE(EXCLUDED.region, organization_operating_markets.region),
                 last_seen_at = CURRENT_TIMESTAMP,
                 evidence_count = organization_operating_markets.evidence_count + 1,
@@ -433,16 +800,60 @@ class OrganizationDB:
             RETURNING id
         """
         
-        market_id = await self.conn.fetchval(
-            query, organization_id, country_code, country_name, region, operation_type
-        )
+        market_id = (await self._upsert_with_evidence(
+            query,
+            (organization_id, country_code, country_name, region, operation_type),
+            'operating_market', source_url, scraped_site_id
+        ))[0]
+        
+        return market_id
+    
+    async def upsert_operating_markets(
+        self,
+        organization_id: int,
+        country_codes: List[str],
+        country_names: List[str],
+        source_url: Optional[str] = None,
+        scraped_site_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Upsert several operating markets (without region/operation type)
+        in one statement.
+        
+        Country codes are deduplicated (first occurrence wins).
+        
+        Returns:
+            Operating market IDs
+        """
+        rows = _dedupe_rows(zip(country_codes, country_names), key=lambda row: row[0])
+        if not rows:
+            return []
         
-        if source_url:
-            await self.add_evidence(
-                organization_id, 'operating_market', market_id, source_url, scraped_site_id
+        query = """
+            INSERT INTO organization_operating_markets (
+                organization_id, country_code, country_name, region, operation_type,
+                first_seen_at, last_seen_at, evidence_count, is_active
             )
+            SELECT $1, t.country_code, t.country_name, NULL, NULL,
+                   CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true
+            FROM unnest($2::text[], $3::text[]) AS t(country_code, country_name)
+            ON CONFLICT (organization_id, country_code, operation_type) DO UPDATE SET
+                country_name = COALESCE(EXCLUDED.country_name, organization_operating_markets.country_name),
+                region = COALESCE(EXCLUDED.region, organization_operating_markets.region),
+                last_seen_at = CURRENT_TIMESTAMP,
+                evidence_count = organization_operating_markets.evidence_count + 1,
+                is_active = true
+            RETURNING id
+        """
         
-        return market_id
+        codes, names = zip(*rows)
+        market_ids = await self._upsert_with_evidence(
+            query,
+            (organization_id, list(codes), list(names)),
+            'operating_market', source_url, scraped_site_id
+        )
+        
+        return market_ids
     
     async def upsert_relationship(
         self,
@@ -468,16 +879,95 @@ class OrganizationDB:
             RETURNING id
         """
         
-        rel_id = await self.conn.fetchval(
-            query, organization_id, related_organization_id, relationship_type, relationship_description
+        rel_id = (await self._upsert_with_evidence(
+            query,
+            (organization_id, related_organization_id, relationship_type, relationship_description),
+            'relationship', source_url, scraped_site_id
+        ))[0]
+        
+        return rel_id
+    
+    async def upsert_relationships(
+        self,
+        organization_id: int,
+        related_organization_ids: List[int],
+        relationship_types: List[str],
+        relationship_descriptions: List[Optional[str]],
+        source_url: Optional[str] = None,
+        scraped_site_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Upsert several relationships in one statement.
+        
+        (related organization, type) pairs are deduplicated (first occurrence wins).
+        
+        Returns:
+            Relationship IDs
+        """
+        rows = _dedupe_rows(
+            zip(related_organization_ids, relationship_types, relationship_descriptions),
+            key=lambda row: (row[0], row[1])
+        )
+        if not rows:
+            return []
+        
+        query = """
+            INSERT INTO organization_relationships (
+                organization_id, related_organization_id, relationship_type,
+                relationship_description, first_seen_at, last_seen_at,
+                evidence_count, is_active
+            )
+            SELECT $1, t.related_organization_id, t.relationship_type,
+                   t.relationship_description, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1, true
+            FROM unnest($2::int[], $3::text[], $4::text[])
+                AS t(related_organization_id, relationship_type, relationship_description)
+            ON CONFLICT (organization_id, related_organization_id, relationship_type) DO UPDATE SET
+                relationship_description = COALESCE(EXCLUDED.relationship_description, organization_relationships.relationship_description),
+                last_seen_at = CURRENT_TIMESTAMP,
+                evidence_count = organization_relationships.evidence_count + 1,
+                is_active = true
+            RETURNING id
+        """
+        
+        related_ids, types, descriptions = zip(*rows)
+        rel_ids = await self._upsert_with_evidence(
+            query,
+            (organization_id, list(related_ids), list(types), list(descriptions)),
+            'relationship', source_url, scraped_site_id
         )
         
-        if source_url:
-            await self.add_evidence(
-                organization_id, 'relationship', rel_id, source_url, scraped_site_id
+        return rel_ids
+    
+    async def _upsert_with_evidence(
+        self,
+        upsert_query: str,
+        params: tuple,
+        fact_type: str,
+        source_url: Optional[str],
+        scraped_site_id: Optional[int]
+    ) -> List[int]:
+        """
+        Run a fact upsert and record its evidence in the same round trip.
+        
+        The upsert (which must take organization_id as $1 and return id) is
+        wrapped in a CTE whose rows feed the evidence INSERT. When evidence is
+        buffered, or there is no source URL, only the upsert is applied.
+        
+        Returns:
+            IDs returned by the upsert
+        """
+        query = _evidence_query(upsert_query, len(params))
+        
+        evidence_url = None if self.buffer_evidence else (source_url or None)
+        records = await self.conn.fetch(query, *params, fact_type, evidence_url, scraped_site_id)
+        fact_ids = [record['id'] for record in records]
+        
+        if self.buffer_evidence and source_url:
+            await self.add_evidence_many(
+                params[0], fact_type, fact_ids, source_url, scraped_site_id
             )
         
-        return rel_id
+        return fact_ids
     
     async def add_evidence(
         self,
@@ -486,8 +976,19 @@ class OrganizationDB:
         fact_id: int,
         source_url: str,
         scraped_site_id: Optional[int] = None
-    ) -> int:
-        """Add evidence record for a fact."""
+    ) -> Optional[int]:
+        """
+        Add evidence record for a fact.
+        
+        Returns:
+            Evidence ID, or None when evidence is buffered
+        """
+        if self.buffer_evidence:
+            self._evidence_buffer.append(
+                (organization_id, fact_type, fact_id, source_url, scraped_site_id)
+            )
+            return None
+        
         query = """
             INSERT INTO organization_evidence (
                 organization_id, fact_type, fact_id, source_url, scraped_site_id
@@ -501,6 +1002,84 @@ class OrganizationDB:
         
         return evidence_id
     
+    async def add_evidence_many(
+        self,
+        organization_id: int,
+        fact_type: str,
+        fact_ids: List[int],
+        source_url: str,
+        scraped_site_id: Optional[int] = None
+    ) -> None:
+        """Add evidence records for several facts of one type in one statement."""
+        if not fact_ids:
+            return
+        
+        if self.buffer_evidence:
+            self._evidence_buffer.extend(
+                (organization_id, fact_type, fact_id, source_url, scraped_site_id)
+                for fact_id in fact_ids
+            )
+            return
+        
+        query = """
+            INSERT INTO organization_evidence (
+                organization_id, fact_type, fact_id, source_url, scraped_site_id
+            )
+            SELECT $1, $2, fact_id, $4, $5
+            FROM unnest($3::int[]) AS t(fact_id)
+        """
+        
+        await self.conn.execute(
+            query, organization_id, fact_type, fact_ids, source_url, scraped_site_id
+        )
+    
+    async def flush_evidence(self) -> int:
+        """
+        Write buffered evidence rows with a single COPY.
+        
+        Evidence is audit data, so the COPY commits without waiting for the
+        WAL flush (synchronous_commit off for this transaction only); a crash
+        can lose the last batch but never leaves it half-written. When the
+        connection is already inside a transaction the COPY runs in a
+        savepoint and keeps the caller's synchronous_commit setting.
+        
+        If the COPY fails the rows go back to the front of the buffer, so a
+        later flush_evidence() retries them.
+        
+        Returns:
+            Number of evidence rows written
+        """
+        if not self._evidence_buffer:
+            return 0
+        
+        records = self._evidence_buffer
+        self._evidence_buffer = []
+        try:
+            if isinstance(self.conn, asyncpg.Pool):
+                async with self.conn.acquire() as conn:
+                    await self._copy_evidence(conn, records)
+            else:
+                await self._copy_evidence(self.conn, records)
+        except BaseException:
+            # Also on cancellation; keep rows buffered during the COPY after them
+            records.extend(self._evidence_buffer)
+            self._evidence_buffer = records
+            raise
+        return len(records)
+    
+    @staticmethod
+    async def _copy_evidence(conn, records: List[tuple]) -> None:
+        """COPY evidence rows in an asynchronously committed transaction."""
+        # SET LOCAL lasts until the outermost transaction ends, so inside a
+        # caller's transaction it would also relax the caller's commit
+        outer_transaction = conn.is_in_transaction()
+        async with conn.transaction():
+            if not outer_transaction:
+                await conn.execute("SET LOCAL synchronous_commit = off")
+            await conn.copy_records_to_table(
+                'organization_evidence', records=records, columns=_EVIDENCE_COLUMNS
+            )
+    
     async def mark_facts_inactive_after_period(self, months: int = 3) -> int:
         """
         Mark facts as inactive if last_seen_at is older than specified months.
@@ -511,35 +1090,15 @@ class OrganizationDB:
         Returns:
             Number of facts marked inactive
         """
-        cutoff_date = datetime.now().replace(day=1)  # Start of current month
-        for _ in range(months):
-            if cutoff_date.month == 1:
-                cutoff_date = cutoff_date.replace(year=cutoff_date.year - 1, month=12)
-            else:
-                cutoff_date = cutoff_date.replace(month=cutoff_date.month - 1)
-        
-        tables = [
-            'organization_products',
-            'organization_services',
-            'organization_platforms',
-            'organization_certifications',
-            'organization_awards',
-            'organization_operating_markets',
-            'organization_relationships'
-        ]
-        
-        total_updated = 0
-        for table in tables:
-            query = f"""
-                UPDATE {table}
-                SET is_active = false
-                WHERE is_active = true
-                AND last_seen_at < $1
-            """
-            result = await self.conn.execute(query, cutoff_date)
-            # Extract number from result like "UPDATE 5"
-            if result.startswith("UPDATE "):
-                total_updated += int(result.split()[1])
-        
-        return total_updated
+        queries = _MARK_INACTIVE_QUERIES
+        
+        if isinstance(self.conn, asyncpg.Pool):
+            # Tables are independent: run the updates on separate pooled connections
+            counts = await asyncio.gather(
+                *(self.conn.fetchval(query, months) for query in queries)
+            )
+        else:
+            counts = [await self.conn.fetchval(query, months) for query in queries]
+        
+        return sum(counts)
 
@@ -2,36 +2,122 @@
 Domain Notifier - Sends notifications when domain scraping completes
 """
 
+import asyncio
 import json
-from typing import Dict, Any, Optional
-from datetime import datetime
+import re
+from typing import Dict, Any, List, Optional, Union
+from datetime import datetime, timezone
 from urllib.parse import urlparse
 
 import asyncpg
 import httpx
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_UTC = timezone.utc
+
+
+# Per-domain page aggregates, low-content count and duplicate count over the
+# last hour's pages, for every domain in $1, in one round trip. Domains with
+# no recent pages return no row. Fixed query texts hit asyncpg's
+# per-connection prepared statement cache after the first call.
+_QUALITY_QUERY = """
+    WITH recent AS (
+        SELECT domain, success, response_time, content_hash, proxy_used,
+               (metadata->>'main_content_length')::int AS content_length
+        FROM scraped_sites
+        WHERE domain = ANY($1::text[])
+        AND scraped_at > NOW() - INTERVAL '1 hour'
+    ),
+    duplicate_groups AS (
+        SELECT domain, COUNT(*) AS count
+        FROM recent
+        WHERE success AND content_hash IS NOT NULL
+        GROUP BY domain, content_hash
+        HAVING COUNT(*) > 1
+    ),
+    duplicates AS (
+        -- Extra copies across every duplicate group of the domain
+        SELECT domain, SUM(count - 1)::bigint AS duplicate_count
+        FROM duplicate_groups
+        GROUP BY domain
+    )
+    SELECT 
+        recent.domain,
+        COUNT(*) as total_pages,
+        COUNT(*) FILTER (WHERE success) as successful_pages,
+        AVG(response_time) FILTER (WHERE success) as avg_response_time,
+        AVG(content_length) FILTER (WHERE success) as avg_content_length,
+        COUNT(DISTINCT content_hash) as unique_content_count,
+        COUNT(*) FILTER (WHERE proxy_used) as proxy_used_count,
+        COUNT(*) FILTER (WHERE success AND content_length < 100) as low_content_count,
+        COALESCE(MAX(duplicates.duplicate_count), 0) as duplicate_count
+    FROM recent
+    LEFT JOIN duplicates USING (domain)
+    GROUP BY recent.domain
+"""
+
+# Webhook types by URL marker, in detection priority order
+# ('ifttt.com' also covers maker.ifttt.com)
+_WEBHOOK_TYPE_PATTERNS = (
+    ('ifttt', re.compile(r'ifttt\.com', re.IGNORECASE)),
+    ('discord', re.compile(r'discord(?:app)?\.com', re.IGNORECASE)),
+    ('webhooky', re.compile(r'webhook(?:receiver|y)', re.IGNORECASE)),
+)
+
+# File counts and sizes by type and status over the last hour, for every
+# domain in $1
+_FILE_COUNTS_QUERY = """
+    SELECT 
+        domain,
+        file_type,
+        download_status,
+        COUNT(*) as count,
+        SUM(file_size)::bigint as total_size
+    FROM downloaded_files
+    WHERE domain = ANY($1::text[])
+    AND downloaded_at > NOW() - INTERVAL '1 hour'
+    GROUP BY domain, file_type, download_status
+"""
+
 
 class DomainNotifier:
     """Handle notifications when domain scraping completes."""
     
     def __init__(
         self,
-        db_connection: asyncpg.Connection,
+        db_connection: Union[asyncpg.Connection, asyncpg.Pool],
         webhook_url: Optional[str] = None,
-        webhook_enabled: bool = True
+        webhook_enabled: bool = True,
+        verbose_webhook: bool = False
     ):
         """
         Initialize domain notifier.
         
         Args:
-            db_connection: Database connection
+            db_connection: Database connection or pool; with a pool the
+                quality checks and file counts run concurrently
             webhook_url: Webhook URL for notifications (e.g., IFTTT, Zapier, Discord, etc.)
             webhook_enabled: Whether to enable webhook notifications
+            verbose_webhook: Send the full notification data to generic
+                webhooks instead of a headline summary
         """
         self.db = db_connection
         self.webhook_url = webhook_url
         self.webhook_enabled = webhook_enabled and bool(webhook_url)
+        self.verbose_webhook = verbose_webhook
+        
+        # Shared webhook client, so repeat notifications reuse the
+        # keep-alive connection and TLS session
+        self._http_client: Optional[httpx.AsyncClient] = None
+        
+        # Bounds concurrent webhook POSTs when many domains complete at once
+        self._webhook_semaphore = asyncio.Semaphore(8)
     
     async def notify_domain_completion(
         self,
@@ -50,23 +136,84 @@ class DomainNotifier:
         """
         logger.info(f"Processing completion notification for domain: {domain}")
         
-        # Run quality checks
-        quality_metrics = await self._run_quality_checks(domain)
+        # Run quality checks and calculate file counts
+        if isinstance(self.db, asyncpg.Pool):
+            # Independent queries: overlap them on separate pooled connections
+            quality_metrics, file_stats = await asyncio.gather(
+                self._run_quality_checks(domain),
+                self._calculate_file_counts(domain)
+            )
+        else:
+            quality_metrics = await self._run_quality_checks(domain)
+            file_stats = await self._calculate_file_counts(domain)
+        
+        return await self._complete(domain, crawl_results, quality_metrics, file_stats)
+    
+    async def notify_domain_completions(
+        self,
+        crawl_results_by_domain: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Process completion of several domains at once.
+        
+        Quality checks and file counts for all domains come from one query
+        each (instead of one pair per domain); webhooks are then sent
+        concurrently.
         
-        # Calculate file counts
-        file_stats = await self._calculate_file_counts(domain)
+        Args:
+            crawl_results_by_domain: Crawl results keyed by domain
+            
+        Returns:
+            Notification results keyed by domain
+        """
+        domains = list(crawl_results_by_domain)
+        if not domains:
+            return {}
         
-        # Prepare notification payload
+        logger.info(f"Processing completion notifications for {len(domains)} domains")
+        
+        if isinstance(self.db, asyncpg.Pool):
+            quality_by_domain, files_by_domain = await asyncio.gather(
+                self._run_quality_checks_for(domains),
+                self._calculate_file_counts_for(domains)
+            )
+        else:
+            quality_by_domain = await self._run_quality_checks_for(domains)
+            files_by_domain = await self._calculate_file_counts_for(domains)
+        
+        results = await asyncio.gather(*(
+            self._complete(
+                domain,
+                crawl_results_by_domain[domain],
+                quality_by_domain[domain],
+                files_by_domain[domain]
+            )
+            for domain in domains
+        ))
+        return dict(zip(domains, results))
+    
+    async def _complete(
+        self,
+        domain: str,
+        crawl_results: Dict[str, Any],
+        quality_metrics: Dict[str, Any],
+        file_stats: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the notification for a domain, send the webhook and report."""
+        start_time = crawl_results.get('start_time')
+        end_time = crawl_results.get('end_time')
+        
+        # Prepare notification payload (UTC, whole seconds)
         notification_data = {
             'domain': domain,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.now(_UTC).isoformat(timespec='seconds'),
             'crawl_summary': {
                 'pages_crawled': crawl_results.get('pages_crawled', 0),
                 'pages_failed': crawl_results.get('pages_failed', 0),
                 'files_found': crawl_results.get('files_found', 0),
                 'duration_seconds': crawl_results.get('duration_seconds', 0),
-                'start_time': crawl_results.get('start_time').isoformat() if crawl_results.get('start_time') else None,
-                'end_time': crawl_results.get('end_time').isoformat() if crawl_results.get('end_time') else None
+                'start_time': start_time.isoformat(timespec='seconds') if start_time else None,
+                'end_time': end_time.isoformat(timespec='seconds') if end_time else None
             },
             'quality_metrics': quality_metrics,
             'file_statistics': file_stats
@@ -95,91 +242,73 @@ class DomainNotifier:
         Returns:
             Dictionary with quality metrics
         """
-        try:
-            # Get all successfully scraped pages for this domain
-            query = """
-                SELECT 
-                    COUNT(*) as total_pages,
-                    SUM(CASE WHEN success THEN 1 ELSE 0 END) as successful_pages,
-                    AVG(CASE WHEN success THEN response_time ELSE NULL END) as avg_response_time,
-                    AVG(CASE WHEN success THEN (metadata->>'main_content_length')::int ELSE NULL END) as avg_content_length,
-                    COUNT(DISTINCT content_hash) as unique_content_count,
-                    SUM(CASE WHEN proxy_used THEN 1 ELSE 0 END) as proxy_used_count
-                FROM scraped_sites
-                WHERE domain = $1
-                AND scraped_at > NOW() - INTERVAL '1 hour'
-            """
-            
-            row = await self.db.fetchrow(query, domain)
-            
-            total_pages = row['total_pages'] or 0
-            successful_pages = row['successful_pages'] or 0
-            success_rate = (successful_pages / total_pages * 100) if total_pages > 0 else 0
-            
-            # Check for pages with very low content (possible errors)
-            low_content_query = """
-                SELECT COUNT(*) as low_content_count
-                FROM scraped_sites
-                WHERE domain = $1
-                AND success = true
-                AND scraped_at > NOW() - INTERVAL '1 hour'
-                AND (metadata->>'main_content_length')::int < 100
-            """
-            low_content_row = await self.db.fetchrow(low_content_query, domain)
-            low_content_count = low_content_row['low_content_count'] or 0
-            
-            # Check for duplicate content
-            duplicate_query = """
-                SELECT content_hash, COUNT(*) as count
-                FROM scraped_sites
-                WHERE domain = $1
-                AND success = true
-                AND scraped_at > NOW() - INTERVAL '1 hour'
-                AND content_hash IS NOT NULL
-                GROUP BY content_hash
-                HAVING COUNT(*) > 1
-                LIMIT 10
-            """
-            duplicate_rows = await self.db.fetch(duplicate_query, domain)
-            duplicate_count = sum(row['count'] - 1 for row in duplicate_rows)
-            
-            # Calculate quality score (0-100)
-            quality_score = 100.0
-            if total_pages > 0:
-                # Deduct for low success rate
-                quality_score -= (100 - success_rate) * 0.5
-                # Deduct for low content pages
-                if successful_pages > 0:
-                    low_content_ratio = (low_content_count / successful_pages) * 100
-                    quality_score -= min(low_content_ratio * 0.3, 20)
-                # Deduct for duplicates
-                if successful_pages > 0:
-                    duplicate_ratio = (duplicate_count / successful_pages) * 100
-                    quality_score -= min(duplicate_ratio * 0.2, 15)
-            
-            quality_score = max(0, min(100, quality_score))
-            
-            return {
-                'total_pages': total_pages,
-                'successful_pages': successful_pages,
-                'success_rate': round(success_rate, 2),
-                'avg_response_time_ms': round(row['avg_response_time'] or 0, 2),
-                'avg_content_length': int(row['avg_content_length'] or 0),
-                'unique_content_count': row['unique_content_count'] or 0,
-                'low_content_pages': low_content_count,
-                'duplicate_content_count': duplicate_count,
-                'proxy_used_count': row['proxy_used_count'] or 0,
-                'quality_score': round(quality_score, 2),
-                'quality_status': self._get_quality_status(quality_score)
-            }
+        return (await self._run_quality_checks_for([domain]))[domain]
+    
+    async def _run_quality_checks_for(self, domains: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run quality checks for several domains with a single query.
+        
+        Args:
+            domains: Domains to check
             
+        Returns:
+            Quality metrics keyed by domain
+        """
+        try:
+            rows = await self.db.fetch(_QUALITY_QUERY, domains)
         except Exception as e:
-            logger.error(f"Error running quality checks for {domain}: {e}")
+            logger.error(f"Error running quality checks for {', '.join(domains)}: {e}")
             return {
-                'error': str(e),
-                'quality_score': 0,
-                'quality_status': 'error'
+                domain: {
+                    'error': str(e),
+                    'quality_score': 0,
+                    'quality_status': 'error'
+                }
+                for domain in domains
             }
+        
+        rows_by_domain = {row['domain']: row for row in rows}
+        return {domain: self._quality_metrics(rows_by_domain.get(domain)) for domain in domains}
+    
+    def _quality_metrics(self, row: Optional[asyncpg.Record]) -> Dict[str, Any]:
+        """Quality metrics from a domain's aggregate row (None: no recent pages)."""
+        row = row or {}
+        
+        total_pages = row.get('total_pages') or 0
+        successful_pages = row.get('successful_pages') or 0
+        success_rate = (successful_pages / total_pages * 100) if total_pages > 0 else 0
+        low_content_count = row.get('low_content_count') or 0
+        duplicate_count = row.get('duplicate_count') or 0
+        
+        # Calculate quality score (0-100)
+        quality_score = 100.0
+        if total_pages > 0:
+            # Deduct for low success rate
+            quality_score -= (100 - success_rate) * 0.5
+            # Deduct for low content pages
+            if successful_pages > 0:
+                low_content_ratio = (low_content_count / successful_pages) * 100
+                quality_score -= min(low_content_ratio * 0.3, 20)
+            # Deduct for duplicates
+            if successful_pages > 0:
+                duplicate_ratio = (duplicate_count / successful_pages) * 100
+                quality_score -= min(duplicate_ratio * 0.2, 15)
+        
+        quality_score = max(0, min(100, quality_score))
+        
+        return {
+            'total_pages': total_pages,
+            'successful_pages': successful_pages,
+            'success_rate': round(success_rate, 2),
+            'avg_response_time_ms': round(row.get('avg_response_time') or 0, 2),
+            'avg_content_length': int(row.get('avg_content_length') or 0),
+            'unique_content_count': row.get('unique_content_count') or 0,
+            'low_content_pages': low_content_count,
+            'duplicate_content_count': duplicate_count,
+            'proxy_used_count': row.get('proxy_used_count') or 0,
+            'quality_score': round(quality_score, 2),
+            'quality_status': self._get_quality_status(quality_score)
+        }
     
     def _get_quality_status(self, score: float) -> str:
         """Get quality status based on score."""
@@ -202,74 +331,82 @@ class DomainNotifier:
         Returns:
             Dictionary with file statistics
         """
+        return (await self._calculate_file_counts_for([domain]))[domain]
+    
+    async def _calculate_file_counts_for(self, domains: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate file statistics for several domains with a single query.
+        
+        Args:
+            domains: Domains to check
+            
+        Returns:
+            File statistics keyed by domain
+        """
         try:
-            # Get file counts by type and status
-            query = """
-                SELECT 
-                    file_type,
-                    download_status,
-                    COUNT(*) as count,
-                    SUM(file_size) as total_size
-                FROM downloaded_files
-                WHERE domain = $1
-                AND downloaded_at > NOW() - INTERVAL '1 hour'
-                GROUP BY file_type, download_status
-            """
+            rows = await self.db.fetch(_FILE_COUNTS_QUERY, domains)
+        except Exception as e:
+            logger.error(f"Error calculating file counts for {', '.join(domains)}: {e}")
+            return {
+                domain: {
+                    'error': str(e),
+                    'total_files': 0
+                }
+                for domain in domains
+            }
+        
+        rows_by_domain: Dict[str, List[asyncpg.Record]] = {}
+        for row in rows:
+            rows_by_domain.setdefault(row['domain'], []).append(row)
+        return {domain: self._file_stats(rows_by_domain.get(domain, [])) for domain in domains}
+    
+    def _file_stats(self, rows: List[asyncpg.Record]) -> Dict[str, Any]:
+        """File statistics from a domain's (file_type, download_status) rows."""
+        # Organize by file type
+        file_stats = {
+            'total_files': 0,
+            'by_type': {},
+            'by_status': {
+                'downloaded': 0,
+                'failed': 0,
+                'pending': 0
+            },
+            'total_size_bytes': 0,
+            'total_size_mb': 0
+        }
+        
+        for row in rows:
+            file_type = row['file_type']
+            status = row['download_status']
+            count = row['count'] or 0
+            size = row['total_size'] or 0
             
-            rows = await self.db.fetch(query, domain)
+            file_stats['total_files'] += count
+            file_stats['by_status'][status] = file_stats['by_status'].get(status, 0) + count
+            file_stats['total_size_bytes'] += size
             
-            # Organize by file type
-            file_stats = {
-                'total_files': 0,
-                'by_type': {},
-                'by_status': {
+            if file_type not in file_stats['by_type']:
+                file_stats['by_type'][file_type] = {
+                    'total': 0,
                     'downloaded': 0,
                     'failed': 0,
-                    'pending': 0
-                },
-                'total_size_bytes': 0,
-                'total_size_mb': 0
-            }
-            
-            for row in rows:
-                file_type = row['file_type']
-                status = row['download_status']
-                count = row['count'] or 0
-                size = row['total_size'] or 0
-                
-                file_stats['total_files'] += count
-                file_stats['by_status'][status] = file_stats['by_status'].get(status, 0) + count
-                file_stats['total_size_bytes'] += size
-                
-                if file_type not in file_stats['by_type']:
-                    file_stats['by_type'][file_type] = {
-                        'total': 0,
-                        'downloaded': 0,
-                        'failed': 0,
-                        'pending': 0,
-                        'size_bytes': 0
-                    }
-                
-                file_stats['by_type'][file_type]['total'] += count
-                file_stats['by_type'][file_type][status] += count
-                file_stats['by_type'][file_type]['size_bytes'] += size
-            
-            file_stats['total_size_mb'] = round(file_stats['total_size_bytes'] / (1024 * 1024), 2)
-            
-            # Round size_bytes for each type
-            for file_type in file_stats['by_type']:
-                file_stats['by_type'][file_type]['size_mb'] = round(
-                    file_stats['by_type'][file_type]['size_bytes'] / (1024 * 1024), 2
-                )
-            
-            return file_stats
+                    'pending': 0,
+                    'size_bytes': 0
+                }
             
-        except Exception as e:
-            logger.error(f"Error calculating file counts for {domain}: {e}")
-            return {
-                'error': str(e),
-                'total_files': 0
-            }
+            file_stats['by_type'][file_type]['total'] += count
+            file_stats['by_type'][file_type][status] += count
+            file_stats['by_type'][file_type]['size_bytes'] += size
+        
+        file_stats['total_size_mb'] = round(file_stats['total_size_bytes'] / (1024 * 1024), 2)
+        
+        # Round size_bytes for each type
+        for file_type in file_stats['by_type']:
+            file_stats['by_type'][file_type]['size_mb'] = round(
+                file_stats['by_type'][file_type]['size_bytes'] / (1024 * 1024), 2
+            )
+        
+        return file_stats
     
     async def _send_webhook(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -324,25 +461,31 @@ class DomainNotifier:
                 # Generic JSON webhook
                 payload = {
                     'event': 'domain_scraping_complete',
-                    'message': message,
-                    'data': data
+                    'message': message
                 }
+                if self.verbose_webhook:
+                    payload['data'] = data
+                else:
+                    payload['summary'] = self._lean_payload(data)
+            
+            # Serialize once to bytes (orjson when installed)
+            content = orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload).encode('utf-8')
             
             # Send webhook
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
+            async with self._webhook_semaphore:
+                response = await self._get_http_client().post(
                     self.webhook_url,
-                    json=payload,
+                    content=content,
                     headers={'Content-Type': 'application/json'}
                 )
-                response.raise_for_status()
-                
-                logger.info(f"Webhook notification sent successfully for {data['domain']}")
-                return {
-                    'success': True,
-                    'status_code': response.status_code,
-                    'response': response.text[:200]  # Truncate long responses
-                }
+            response.raise_for_status()
+            
+            logger.info(f"Webhook notification sent successfully for {data['domain']}")
+            return {
+                'success': True,
+                'status_code': response.status_code,
+                'response': response.text[:200]  # Truncate long responses
+            }
                 
         except Exception as e:
             logger.error(f"Error sending webhook notification: {e}")
@@ -351,6 +494,34 @@ class DomainNotifier:
                 'error': str(e)
             }
     
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get the shared webhook client, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+            )
+        return self._http_client
+    
+    async def aclose(self):
+        """Close the shared webhook client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    def _lean_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Headline fields of a notification, for generic webhooks."""
+        quality = data['quality_metrics']
+        crawl = data['crawl_summary']
+        return {
+            'domain': data['domain'],
+            'quality_score': quality.get('quality_score', 0),
+            'quality_status': quality.get('quality_status', 'unknown'),
+            'pages_crawled': crawl.get('pages_crawled', 0),
+            'files_total': data['file_statistics'].get('total_files', 0),
+            'duration_seconds': crawl.get('duration_seconds', 0)
+        }
+    
     def _format_notification_message(self, data: Dict[str, Any]) -> str:
         """Format notification message for mobile display."""
         domain = data['domain']
@@ -379,13 +550,8 @@ class DomainNotifier:
     
     def _detect_webhook_type(self, url: str) -> str:
         """Detect webhook type from URL."""
-        url_lower = url.lower()
-        if 'ifttt.com' in url_lower or 'maker.ifttt.com' in url_lower:
-            return 'ifttt'
-        elif 'discord.com' in url_lower or 'discordapp.com' in url_lower:
-            return 'discord'
-        elif 'webhookreceiver' in url_lower or 'webhooky' in url_lower:
-            return 'webhooky'
-        else:
-            return 'generic'
+        for webhook_type, pattern in _WEBHOOK_TYPE_PATTERNS:
+            if pattern.search(url):
+                return webhook_type
+        return 'generic'
 
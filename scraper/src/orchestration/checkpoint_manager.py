@@ -2,27 +2,64 @@
 Checkpoint Manager - Save/load/resume scraping state
 """
 
+import atexit
 import json
 import os
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Set
+from urllib.parse import urlparse
+from datetime import datetime, timedelta, timezone
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_UTC = timezone.utc
+
 
 class CheckpointManager:
     """Manage checkpoint state for resumable scraping runs"""
     
-    def __init__(self, checkpoint_dir: str = "checkpoints"):
+    def __init__(
+        self,
+        checkpoint_dir: str = "checkpoints",
+        flush_interval: float = 30.0,
+        max_pending: Optional[int] = None
+    ):
         """
         Initialize checkpoint manager.
         
         Args:
             checkpoint_dir: Directory for checkpoint files
+            flush_interval: Minimum seconds between checkpoint writes from the
+                mark_*/set_in_progress methods; call flush() to write sooner
+            max_pending: Write as soon as this many changes are unsaved, even
+                within flush_interval (None: time-based only)
         """
         self.checkpoint_dir = Path(checkpoint_dir)
         self.checkpoint_dir.mkdir(exist_ok=True)
         self.checkpoint_file = self.checkpoint_dir / "scrape_checkpoint.json"
+        # Indented copy for people, written by close()
+        self.pretty_checkpoint_file = self.checkpoint_dir / "scrape_checkpoint.pretty.json"
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        
+        # Current checkpoint, kept in memory and written behind
+        self._state: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._pending = 0
+        self._last_flush = 0.0
+        
+        # Domain names in _completed_state['completed_domains'], for O(1)
+        # duplicate checks; rebuilt when the checkpoint object changes
+        self._completed_set: Set[str] = set()
+        self._completed_state: Optional[Dict[str, Any]] = None
+        
+        atexit.register(self.close)
     
     def create_new_checkpoint(self, run_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -39,7 +76,8 @@ class CheckpointManager:
         
         checkpoint = {
             "run_id": run_id,
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": datetime.now(_UTC).isoformat(timespec='seconds'),
+            "last_updated_ts": time.time(),
             "current_pass": 1,
             "completed_domains": [],
             "marked_for_review": [],
@@ -61,25 +99,36 @@ class CheckpointManager:
         """
         Load existing checkpoint if available and recent (< 24 hours).
         
+        Returns the in-memory checkpoint (including unflushed changes) once
+        one has been loaded or created by this manager.
+        
         Returns:
             Checkpoint dictionary or None if not available/expired
         """
+        if self._state is not None:
+            return self._state
+        
         if not self.checkpoint_file.exists():
             return None
         
         try:
-            with open(self.checkpoint_file, 'r') as f:
-                checkpoint = json.load(f)
+            with open(self.checkpoint_file, 'rb') as f:
+                raw = f.read()
+            checkpoint = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
             
-            # Check if checkpoint is less than 24 hours old
-            last_updated = datetime.fromisoformat(checkpoint['last_updated'])
-            age = datetime.now() - last_updated
+            # Check if checkpoint is less than 24 hours old (epoch timestamp;
+            # checkpoints written before it existed only have the ISO string)
+            if 'last_updated_ts' in checkpoint:
+                age = timedelta(seconds=time.time() - checkpoint['last_updated_ts'])
+            else:
+                age = datetime.now() - datetime.fromisoformat(checkpoint['last_updated'])
             
             if age > timedelta(hours=24):
                 logger.warning(f"Checkpoint expired (age: {age})")
                 return None
             
             logger.info(f"Loaded checkpoint: {checkpoint['run_id']} (age: {age})")
+            self._state = checkpoint
             return checkpoint
             
         except Exception as e:
@@ -90,16 +139,78 @@ class CheckpointManager:
         """
         Save checkpoint to disk.
         
+        The file is compact JSON, written to a temporary path and renamed over
+        the old one, so a crash mid-write never leaves a truncated checkpoint.
+        
         Args:
             checkpoint: Checkpoint dictionary
         """
+        self._state = checkpoint
         try:
-            checkpoint['last_updated'] = datetime.now().isoformat()
-            with open(self.checkpoint_file, 'w') as f:
-                json.dump(checkpoint, f, indent=2)
+            checkpoint['last_updated'] = datetime.now(_UTC).isoformat(timespec='seconds')
+            checkpoint['last_updated_ts'] = time.time()
+            self._write_json(self.checkpoint_file, checkpoint, pretty=False)
+            self._dirty = False
+            self._pending = 0
+            self._last_flush = time.monotonic()
         except Exception as e:
             logger.error(f"Error saving checkpoint: {e}")
     
+    def flush(self) -> None:
+        """Write the in-memory checkpoint to disk if it has unsaved changes."""
+        if self._dirty and self._state is not None:
+            self.save_checkpoint(self._state)
+    
+    def close(self) -> None:
+        """Flush the checkpoint and write its indented copy for people."""
+        self.flush()
+        if self._state is None:
+            return
+        try:
+            self._write_json(self.pretty_checkpoint_file, self._state, pretty=True)
+        except Exception as e:
+            logger.error(f"Error saving readable checkpoint: {e}")
+    
+    @staticmethod
+    def _write_json(path: Path, checkpoint: Dict[str, Any], pretty: bool) -> None:
+        """Atomically write a checkpoint as JSON (orjson when installed)."""
+        if ORJSON_AVAILABLE:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            data = orjson.dumps(checkpoint, option=option)
+        elif pretty:
+            data = json.dumps(checkpoint, indent=2).encode('utf-8')
+        else:
+            data = json.dumps(checkpoint, separators=(',', ':')).encode('utf-8')
+        
+        tmp_file = path.with_suffix('.json.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+    
+    def _current(self) -> Dict[str, Any]:
+        """In-memory checkpoint, loading or creating one on first use."""
+        return self.load_checkpoint() or self.create_new_checkpoint()
+    
+    @staticmethod
+    def _domain_name(domain: Any) -> str:
+        """Extract the domain name from a URL (or return it unchanged)."""
+        domain = str(domain)
+        if '://' in domain:
+            return urlparse(domain).netloc.lower().replace('www.', '')
+        return domain
+    
+    def _changed(self) -> None:
+        """Record an in-memory change; write after flush_interval or max_pending changes."""
+        self._dirty = True
+        self._pending += 1
+        if (
+            time.monotonic() - self._last_flush >= self.flush_interval
+            or (self.max_pending is not None and self._pending >= self.max_pending)
+        ):
+            self.flush()
+    
     def mark_domain_completed(
         self, 
         domain: str, 
@@ -107,25 +218,20 @@ class CheckpointManager:
         status: str = "success"
     ) -> None:
         """Mark a domain as completed."""
-        checkpoint = self.load_checkpoint()
-        if not checkpoint:
-            checkpoint = self.create_new_checkpoint()
-        
-        # Extract domain name from URL if needed
-        from urllib.parse import urlparse
-        if '://' in domain:
-            parsed = urlparse(domain)
-            domain_name = parsed.netloc.lower().replace('www.', '')
-        else:
-            domain_name = domain
+        checkpoint = self._current()
+        domain_name = self._domain_name(domain)
         
         # Check if already completed
-        completed = checkpoint.get('completed_domains', [])
-        completed_domains_set = {urlparse(d).netloc.lower().replace('www.', '') if '://' in str(d) else str(d) for d in completed}
+        if self._completed_state is not checkpoint:
+            self._completed_set = {
+                self._domain_name(d) for d in checkpoint.get('completed_domains', [])
+            }
+            self._completed_state = checkpoint
         
-        if domain_name in completed_domains_set:
+        if domain_name in self._completed_set:
             return
         
+        self._completed_set.add(domain_name)
         checkpoint['completed_domains'].append(domain_name)
         
         # Remove from in_progress if present
@@ -138,49 +244,53 @@ class CheckpointManager:
         checkpoint['stats']['successful'] += 1
         checkpoint['stats']['total_records'] += records_extracted
         
-        self.save_checkpoint(checkpoint)
+        self._changed()
     
     def mark_domain_for_review(self, domain: str, reason: str) -> None:
         """Mark a domain for review."""
-        checkpoint = self.load_checkpoint() or self.create_new_checkpoint()
+        checkpoint = self._current()
         
         if domain not in checkpoint['marked_for_review']:
             checkpoint['marked_for_review'].append({
                 "domain": domain,
                 "reason": reason,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now(_UTC).isoformat(timespec='seconds')
             })
             checkpoint['stats']['processed'] += 1
-            self.save_checkpoint(checkpoint)
+            self._changed()
     
     def mark_domain_manual_review(self, domain: str, reason: str, details: Dict[str, Any]) -> None:
         """Mark a domain for manual review."""
-        checkpoint = self.load_checkpoint() or self.create_new_checkpoint()
+        checkpoint = self._current()
         
         if domain not in checkpoint['manual_review']:
             checkpoint['manual_review'].append({
                 "domain": domain,
                 "reason": reason,
                 "details": details,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now(_UTC).isoformat(timespec='seconds')
             })
             checkpoint['stats']['processed'] += 1
-            self.save_checkpoint(checkpoint)
+            self._changed()
     
     def set_in_progress(self, domain: str, records_extracted: int = 0) -> None:
         """Set a domain as in progress."""
-        checkpoint = self.load_checkpoint() or self.create_new_checkpoint()
+        checkpoint = self._current()
         
         checkpoint['in_progress'] = {
             "domain": domain,
             "records_extracted": records_extracted,
-            "started_at": datetime.now().isoformat()
+            "started_at": datetime.now(_UTC).isoformat(timespec='seconds')
         }
         
-        self.save_checkpoint(checkpoint)
+        self._changed()
     
     def clear_checkpoint(self) -> None:
         """Clear the checkpoint file."""
+        self._state = None
+        self._dirty = False
+        self._pending = 0
+        self.pretty_checkpoint_file.unlink(missing_ok=True)
         if self.checkpoint_file.exists():
             self.checkpoint_file.unlink()
             logger.info("Checkpoint cleared")
@@ -3,10 +3,26 @@ Domain Boundary Checker - Validate URLs stay within domain boundaries
 """
 
 from urllib.parse import urlparse
-from typing import Set, Optional, List
+from typing import Dict, Set, Optional, List
 import re
 
 
+_WWW_RE = re.compile(r'^www\.')
+# Host part of a seed domain: optional scheme and www. prefix, then up to
+# the first path, query or fragment delimiter
+_DOMAIN_EXTRACT_RE = re.compile(r'^(?:https?://)?(?:www\.)?([^/?#]*)', re.I)
+
+_FILE_EXTENSIONS = (
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.txt', '.csv', '.json', '.xml'
+)
+# Longest entry in _FILE_EXTENSIONS; only that many trailing chars are checked
+_FILE_EXTENSION_MAX_LEN = max(map(len, _FILE_EXTENSIONS))
+
+# Hosts whose boundary verdict is remembered per checker before the cache resets
+_HOST_VERDICT_CACHE_SIZE = 65536
+
+
 class DomainBoundaryChecker:
     """Check if URLs are within allowed domain boundaries"""
     
@@ -39,18 +55,24 @@ class DomainBoundaryChecker:
         else:
             self.root_domain = self.base_domain
             self.company_name = self.base_domain
+        
+        # Derivative domain patterns, e.g. worldline-solutions.com, worldline.com.de
+        company = re.escape(self.company_name)
+        self._derivative_res = [
+            re.compile(rf'^{company}[-.].*\.'),
+            re.compile(rf'.*[-.]{company}[-.]'),
+            re.compile(rf'{company}\..*\.'),
+        ]
+        
+        # Hosts that are always in bounds (most crawled URLs), and remembered
+        # verdicts for the other hosts seen
+        self._exact_domains = frozenset({self.base_domain, f'www.{self.base_domain}'})
+        self._host_verdicts: Dict[str, bool] = {}
     
     def _normalize_domain(self, domain: str) -> str:
         """Normalize domain name."""
-        # Remove protocol if present
-        domain = re.sub(r'^https?://', '', domain)
-        # Remove trailing slash
-        domain = domain.rstrip('/')
-        # Remove www. prefix for matching
-        domain = re.sub(r'^www\.', '', domain)
-        # Extract just the domain part
-        parsed = urlparse(f'http://{domain}')
-        return parsed.netloc.lower()
+        # Strip protocol and www. prefix and cut the path in one scan
+        return _DOMAIN_EXTRACT_RE.match(domain).group(1).lower()
     
     def is_within_boundary(self, url: str) -> bool:
         """
@@ -63,49 +85,68 @@ class DomainBoundaryChecker:
             True if within boundary, False otherwise
         """
         try:
-            parsed = urlparse(url)
-            url_domain = parsed.netloc.lower()
+            netloc = urlparse(url).netloc
+        except Exception:
+            return False
+        return self.is_within_boundary_parsed(netloc, url)
+    
+    def is_within_boundary_parsed(self, netloc: str, url: str) -> bool:
+        """
+        Check a URL whose network location has already been parsed.
+        
+        Lets callers that already ran urlparse (e.g. for link resolution)
+        skip parsing the URL a second time.
+        
+        Args:
+            netloc: Network location, as in urlparse(url).netloc
+            url: Full URL (the file download check looks at its suffix)
             
-            # Allow direct file downloads
-            if self.allow_file_downloads and self._is_file_url(url):
-                return True
+        Returns:
+            True if within boundary, False otherwise
+        """
+        try:
+            url_domain = netloc.lower()
             
             # Check exact match
-            if url_domain == self.base_domain or url_domain == f'www.{self.base_domain}':
+            if url_domain in self._exact_domains:
                 return True
             
-            # Check subdomain
-            if self.allow_subdomains:
-                if url_domain.endswith(f'.{self.base_domain}') or \
-                   url_domain.endswith(f'.www.{self.base_domain}'):
-                    return True
-            
-            # Check derivative domains
-            if self.allow_derivatives:
-                # Match patterns like worldline-solutions.com, worldline-solutions.eu, etc.
-                if self.company_name in url_domain:
-                    # Check if it's a legitimate derivative (not a completely different site)
-                    # e.g., worldline-solutions.com, worldline.com.de
-                    derivative_patterns = [
-                        rf'^{re.escape(self.company_name)}[-.].*\.',
-                        rf'.*[-.]{re.escape(self.company_name)}[-.]',
-                        rf'{re.escape(self.company_name)}\..*\.',
-                    ]
-                    for pattern in derivative_patterns:
-                        if re.search(pattern, url_domain):
-                            return True
+            # Allow direct file downloads
+            if self.allow_file_downloads and self._is_file_url(url):
+                return True
             
-            return False
+            verdict = self._host_verdicts.get(url_domain)
+            if verdict is None:
+                verdict = self._is_allowed_host(url_domain)
+                if len(self._host_verdicts) >= _HOST_VERDICT_CACHE_SIZE:
+                    self._host_verdicts.clear()
+                self._host_verdicts[url_domain] = verdict
+            return verdict
             
         except Exception:
             return False
     
+    def _is_allowed_host(self, url_domain: str) -> bool:
+        """Check a (lowercased) host against the subdomain and derivative rules."""
+        # Check subdomain
+        if self.allow_subdomains:
+            if url_domain.endswith(f'.{self.base_domain}') or \
+               url_domain.endswith(f'.www.{self.base_domain}'):
+                return True
+        
+        # Check derivative domains
+        if self.allow_derivatives:
+            # Match patterns like worldline-solutions.com, worldline-solutions.eu, etc.
+            if self.company_name in url_domain:
+                # Check if it's a legitimate derivative (not a completely different site)
+                if any(pattern.search(url_domain) for pattern in self._derivative_res):
+                    return True
+        
+        return False
+    
     def _is_file_url(self, url: str) -> bool:
         """Check if URL points to a file download."""
-        file_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', 
-                          '.zip', '.txt', '.csv', '.json', '.xml']
-        url_lower = url.lower()
-        return any(url_lower.endswith(ext) for ext in file_extensions)
+        return url[-_FILE_EXTENSION_MAX_LEN:].lower().endswith(_FILE_EXTENSIONS)
     
     def extract_base_domain_from_url(self, url: str) -> str:
         """Extract base domain from URL."""
@@ -113,7 +154,7 @@ class DomainBoundaryChecker:
             parsed = urlparse(url)
             domain = parsed.netloc.lower()
             # Remove www. prefix
-            domain = re.sub(r'^www\.', '', domain)
+            domain = _WWW_RE.sub('', domain)
             return domain
         except Exception:
             return ""
@@ -129,18 +170,16 @@ def load_domain_list(file_path: str) -> List[str]:
     Returns:
         List of domain URLs
     """
-    domains = []
     try:
+        # One read; text mode has already folded \r\n and \r into \n
         with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # Skip comments and blank lines
-                if line and not line.startswith('#'):
-                    # Ensure it has protocol
-                    if not line.startswith('http://') and not line.startswith('https://'):
-                        line = f'https://{line}'
-                    domains.append(line)
-        return domains
+            lines = (line.strip() for line in f.read().split('\n'))
+            # Skip comments and blank lines; ensure each entry has a protocol
+            return [
+                line if line.startswith(('http://', 'https://')) else f'https://{line}'
+                for line in lines
+                if line and not line.startswith('#')
+            ]
     except Exception as e:
         raise Exception(f"Error loading domain list: {e}")
 
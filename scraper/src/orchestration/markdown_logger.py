@@ -2,23 +2,69 @@
 Markdown Logger - Structured logging for scraping runs
 """
 
+import asyncio
+import atexit
+import json
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Buffered log text (in characters) that triggers a write to the file
+_FLUSH_THRESHOLD = 1 << 16
+
+# 'full' logs every domain, 'summary' only the run configuration, passes
+# and summary, 'off' nothing beyond the header
+_VERBOSITY_LEVELS = ('full', 'summary', 'off')
+
+# Longest list shown per fingerprint entry
+_FINGERPRINT_MAX_ITEMS = 10
+
+
+def _format_fingerprint(fingerprint: Dict[str, Any]) -> str:
+    """Render a protection fingerprint as indented JSON with sorted keys."""
+    # Limit top-level lists (indicators etc.) to the first entries
+    fingerprint = {
+        key: value[:_FINGERPRINT_MAX_ITEMS] if isinstance(value, list) else value
+        for key, value in fingerprint.items()
+    }
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(fingerprint, default=str, option=option).decode('utf-8')
+    return json.dumps(fingerprint, default=str, indent=2, sort_keys=True, ensure_ascii=False)
+
 
 class MarkdownLogger:
     """Create structured markdown logs for scraping runs"""
     
-    def __init__(self, log_file: str, checkpoint_run_id: Optional[str] = None):
+    def __init__(
+        self,
+        log_file: str,
+        checkpoint_run_id: Optional[str] = None,
+        verbosity: str = 'full'
+    ):
         """
         Initialize markdown logger.
         
         Args:
             log_file: Path to log file
             checkpoint_run_id: Optional run ID from checkpoint
+            verbosity: 'full', 'summary' (no per-domain entries) or 'off'
         """
+        if verbosity not in _VERBOSITY_LEVELS:
+            raise ValueError(f"Invalid verbosity: {verbosity!r}")
+        self.verbosity = verbosity
+        # Checked before any entry is formatted
+        self._log_domains = verbosity == 'full'
+        self._log_run = verbosity != 'off'
+        
         self.log_path = Path(log_file)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -26,6 +72,13 @@ class MarkdownLogger:
         self.sections: List[str] = []
         self.domain_logs: Dict[str, List[str]] = {}
         
+        # Entries collect here and reach the file in large writes
+        self._buffer: List[str] = []
+        self._buffer_len = 0
+        self._flushing = False  # aflush() is writing from a worker thread
+        self._file = open(self.log_path, 'w', encoding='utf-8', buffering=_FLUSH_THRESHOLD)
+        atexit.register(self.close)
+        
         # Initialize log file
         self._write_header()
     
@@ -44,11 +97,13 @@ class MarkdownLogger:
 ## Execution Log
 
 """
-        with open(self.log_path, 'w', encoding='utf-8') as f:
-            f.write(header)
+        self._append(header)
+        self.flush()
     
     def log_config(self, total_domains: int, parallel_workers: int, max_records: int = 2000) -> None:
         """Log configuration details."""
+        if not self._log_run:
+            return
         config = f"""
 ## Configuration
 
@@ -62,6 +117,8 @@ class MarkdownLogger:
     
     def start_pass(self, pass_number: int) -> None:
         """Start a new pass."""
+        if not self._log_run:
+            return
         self._append(f"\n### Pass {pass_number}: Initial Processing\n\n")
     
     def log_domain_success(
@@ -73,17 +130,20 @@ class MarkdownLogger:
         quality_ratio: Optional[float] = None
     ) -> None:
         """Log successful domain processing."""
-        lines = [f"#### {domain} - ✅ SUCCESS\n"]
-        lines.append(f"- **Records Extracted**: {records_extracted:,}")
-        lines.append(f"- **Duration**: {duration_seconds:.1f}s ({duration_seconds/60:.1f}m)")
+        if not self._log_domains:
+            return
+        lines = [
+            f"#### {domain} - ✅ SUCCESS\n\n",
+            f"- **Records Extracted**: {records_extracted:,}\n",
+            f"- **Duration**: {duration_seconds:.1f}s ({duration_seconds/60:.1f}m)\n"
+        ]
         
         if security:
-            lines.append(f"- **Security**: {security}")
+            lines.append(f"- **Security**: {security}\n")
         if quality_ratio is not None:
-            lines.append(f"- **Quality Test**: {quality_ratio*100:.1f}% text ratio (PASS)")
+            lines.append(f"- **Quality Test**: {quality_ratio*100:.1f}% text ratio (PASS)\n")
         
-        lines.append("")
-        self._append("\n".join(lines))
+        self._append_lines(lines)
     
     def log_domain_marked_for_review(
         self,
@@ -95,21 +155,23 @@ class MarkdownLogger:
         sample_urls: Optional[List[str]] = None
     ) -> None:
         """Log domain marked for review."""
-        lines = [f"#### {domain} - ⚠️ MARKED_FOR_REVIEW\n"]
-        lines.append(f"- **Reason**: {reason}")
-        lines.append(f"- **Duration**: {duration_seconds:.1f}s")
+        if not self._log_domains:
+            return
+        lines = [
+            f"#### {domain} - ⚠️ MARKED_FOR_REVIEW\n\n",
+            f"- **Reason**: {reason}\n",
+            f"- **Duration**: {duration_seconds:.1f}s\n"
+        ]
         
         if security:
-            lines.append(f"- **Security**: {security}")
+            lines.append(f"- **Security**: {security}\n")
         if quality_ratio is not None:
-            lines.append(f"- **Quality Test**: {quality_ratio*100:.1f}% text ratio (FAIL)")
+            lines.append(f"- **Quality Test**: {quality_ratio*100:.1f}% text ratio (FAIL)\n")
         if sample_urls:
-            lines.append(f"- **Sample URLs**: {len(sample_urls)} tested")
-            for url in sample_urls[:5]:
-                lines.append(f"  - `{url}`")
+            lines.append(f"- **Sample URLs**: {len(sample_urls)} tested\n")
+            lines.extend(f"  - `{url}`\n" for url in sample_urls[:5])
         
-        lines.append("")
-        self._append("\n".join(lines))
+        self._append_lines(lines)
     
     def log_domain_manual_review(
         self,
@@ -120,32 +182,19 @@ class MarkdownLogger:
         duration_seconds: float
     ) -> None:
         """Log domain requiring manual review."""
-        lines = [f"#### {domain} - 🔴 MANUAL_REVIEW\n"]
-        lines.append(f"- **Reason**: {reason}")
-        lines.append(f"- **Security**: {protection_type} (NO STRATEGY AVAILABLE)")
-        lines.append(f"- **Duration**: {duration_seconds:.1f}s")
-        lines.append("")
-        lines.append("**Protection Fingerprint**:")
-        lines.append("")
-        
-        # Format fingerprint
-        for key, value in fingerprint.items():
-            if isinstance(value, list):
-                lines.append(f"- {key}:")
-                for item in value[:10]:  # Limit to 10 items
-                    lines.append(f"  - `{item}`")
-            elif isinstance(value, dict):
-                lines.append(f"- {key}:")
-                for k, v in value.items():
-                    lines.append(f"  - `{k}`: `{v}`")
-            else:
-                lines.append(f"- {key}: `{value}`")
+        if not self._log_domains:
+            return
+        lines = [
+            f"#### {domain} - 🔴 MANUAL_REVIEW\n\n",
+            f"- **Reason**: {reason}\n",
+            f"- **Security**: {protection_type} (NO STRATEGY AVAILABLE)\n",
+            f"- **Duration**: {duration_seconds:.1f}s\n",
+            "\n**Protection Fingerprint**:\n\n",
+            f"```json\n{_format_fingerprint(fingerprint)}\n```\n",
+            "\n**Action Required**: Develop custom bypass strategy\n"
+        ]
         
-        lines.append("")
-        lines.append(f"**Action Required**: Develop custom bypass strategy")
-        lines.append("")
-        
-        self._append("\n".join(lines))
+        self._append_lines(lines)
     
     def log_summary(
         self,
@@ -157,6 +206,8 @@ class MarkdownLogger:
         total_duration_seconds: float
     ) -> None:
         """Log summary statistics."""
+        if not self._log_run:
+            return
         hours = int(total_duration_seconds // 3600)
         minutes = int((total_duration_seconds % 3600) // 60)
         seconds = int(total_duration_seconds % 60)
@@ -189,14 +240,69 @@ class MarkdownLogger:
 *Log generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
 """
         self._append(summary)
+        # The summary closes the run; make the whole log readable now
+        self.flush()
     
     def _append(self, content: str) -> None:
-        """Append content to log file."""
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(content)
+        """Buffer content for the log file, writing once the buffer is large."""
+        self._buffer.append(content)
+        self._buffer_len += len(content)
+        if self._buffer_len >= _FLUSH_THRESHOLD and not self._flushing:
+            self._write_buffer()
+    
+    def _append_lines(self, lines: List[str]) -> None:
+        """Buffer newline-terminated lines without joining them first."""
+        self._buffer.extend(lines)
+        self._buffer_len += sum(map(len, lines))
+        if self._buffer_len >= _FLUSH_THRESHOLD and not self._flushing:
+            self._write_buffer()
+    
+    def _take_buffer(self) -> str:
+        """Return the buffered content as one string and empty the buffer."""
+        content = ''.join(self._buffer)
+        self._buffer.clear()
+        self._buffer_len = 0
+        return content
+    
+    def _write_buffer(self) -> None:
+        """Write buffered content to the file handle in one call."""
+        content = self._take_buffer()
+        if content and not self._file.closed:
+            self._file.write(content)
+    
+    def _write_and_flush(self, content: str) -> None:
+        """Write content and flush the file handle (runs in a worker thread)."""
+        if content and not self._file.closed:
+            self._file.write(content)
+            self._file.flush()
     
     def flush(self) -> None:
         """Ensure log is written to disk."""
-        # File operations are immediately flushed, but this can be extended
-        pass
+        self._write_buffer()
+        if not self._file.closed:
+            self._file.flush()
+    
+    async def aflush(self) -> None:
+        """
+        Write buffered entries to disk without blocking the event loop.
+        
+        The buffer is taken on the loop thread and written from a worker
+        thread; entries logged meanwhile stay buffered until the next flush.
+        """
+        if self._flushing or self._file.closed:
+            return
+        content = self._take_buffer()
+        self._flushing = True
+        try:
+            await asyncio.to_thread(self._write_and_flush, content)
+        finally:
+            self._flushing = False
+    
+    def close(self) -> None:
+        """Flush buffered entries and close the log file."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        atexit.unregister(self.close)
 
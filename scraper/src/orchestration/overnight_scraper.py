@@ -11,12 +11,12 @@ Comprehensive scraping system with:
 
 import asyncio
 import os
+import re
 import sys
-import yaml
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from datetime import datetime
-from urllib.parse import urlparse
 
 # Set Prefect API URL to connect to Docker server
 os.environ.setdefault('PREFECT_API_URL', 'http://localhost:4200/api')
@@ -54,26 +54,121 @@ from .markdown_logger import MarkdownLogger
 from .domain_boundary import DomainBoundaryChecker, load_domain_list
 from ..scrapers.domain_crawler import DomainCrawler
 from ..detectors.security_detector import SecurityDetector
-from ..parsers.boilerplate_detector import BoilerplateDetector
+from ..notifications.domain_notifier import DomainNotifier
 
 
 # Global configuration
 CONFIG_PATH = Path(__file__).parent.parent.parent / 'config' / 'scraper_config.yaml'
 DOMAIN_LIST_PATH = Path(__file__).parent.parent.parent / 'config' / 'bpo_sites.txt'
 MAX_RECORDS_PER_DOMAIN = 2000
+MAX_CRAWL_DEPTH = 5  # Shared by the quality test and full scrape crawls
 PARALLEL_WORKERS = 20
 QUALITY_TEST_SIZE = 10
-CHECKPOINT_INTERVAL = 100  # Checkpoint every N records
+CHECKPOINT_INTERVAL = 100  # Write the checkpoint after at most N unsaved domain updates
+
+# Task queries. Fixed texts are prepared once per pooled connection by
+# asyncpg's statement cache (see get_db_pool)
+
+# Page count, summed lengths and URLs of a domain's latest successful pages
+_QUALITY_SAMPLE_SQL = """
+    SELECT 
+        COUNT(*) AS record_count,
+        COALESCE(SUM((metadata->>'html_length')::int), 0) AS html_length,
+        COALESCE(SUM(char_length(markdown_content)), 0) AS content_length,
+        array_agg(url ORDER BY scraped_at DESC) AS sample_urls
+    FROM (
+        SELECT url, metadata, markdown_content, scraped_at
+        FROM scraped_sites
+        WHERE domain = $1
+          AND success = true
+        ORDER BY scraped_at DESC
+        LIMIT $2
+    ) latest
+"""
+
+# Successful pages stored for a domain
+_SUCCESS_COUNT_SQL = """
+    SELECT COUNT(*)
+    FROM scraped_sites
+    WHERE domain = $1
+      AND success = true
+"""
+
+# Host of a domain-list URL without scheme, www. prefix or port
+_DOMAIN_RE = re.compile(r'^(?:https?://)?(?:www\.)?([^/:?#]+)', re.IGNORECASE)
+
+# One detector for the whole run: its patterns and result cache are shared
+# by every domain's security assessment
+_SECURITY_DETECTOR = SecurityDetector()
+
+
+def _quality_test_crawler(config: Dict[str, Any], db_conn: asyncpg.Pool) -> DomainCrawler:
+    """
+    Create a crawler limited to the quality test sample.
+    
+    Only the page and time limits are capped: the crawler is handed on to
+    full_domain_scrape_task, and links are extracted only from pages below
+    max_depth, so a shallower sample would cut subtrees off the full scrape.
+    """
+    return DomainCrawler(
+        config=config,
+        db_connection=db_conn,
+        max_depth=MAX_CRAWL_DEPTH,
+        max_pages=QUALITY_TEST_SIZE,
+        max_duration_seconds=300
+    )
+
+
+def _completion_notifier(config: Dict[str, Any], db_conn: asyncpg.Pool) -> Optional[DomainNotifier]:
+    """Create the run's domain completion notifier, if notifications are enabled."""
+    notification_config = config.get('notifications', {})
+    if not notification_config.get('enabled', False):
+        return None
+    webhook_url = notification_config.get('webhook_url', '')
+    return DomainNotifier(
+        db_connection=db_conn,
+        webhook_url=webhook_url if webhook_url else None,
+        webhook_enabled=bool(webhook_url),
+        verbose_webhook=notification_config.get('verbose_webhook', False)
+    )
+
+
+async def _notify_completions(
+    notifier: Optional[DomainNotifier],
+    crawl_results_by_domain: Dict[str, Dict[str, Any]]
+):
+    """Send the completion notifications of several domains as one batch."""
+    if notifier is None or not crawl_results_by_domain:
+        return
+    try:
+        await notifier.notify_domain_completions(crawl_results_by_domain)
+    except Exception as e:
+        logger.error(f"Error sending completion notifications for {len(crawl_results_by_domain)} domains: {e}")
+    crawl_results_by_domain.clear()
 
 
 def load_config() -> Dict[str, Any]:
-    """Load configuration from YAML file."""
+    """Load configuration from YAML file (parsed again only after it changes)."""
+    return _parse_config(CONFIG_PATH.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=1)
+def _parse_config(mtime_ns: int) -> Dict[str, Any]:
+    """Parse the configuration file as of the given modification time."""
+    import yaml
     with open(CONFIG_PATH, 'r') as f:
         return yaml.safe_load(f)
 
 
-async def get_db_connection(config: Dict[str, Any]) -> asyncpg.Connection:
-    """Get database connection."""
+@lru_cache(maxsize=4096)
+def _extract_domain(domain_url: str) -> str:
+    """Domain key for a URL, as stored in checkpoints."""
+    match = _DOMAIN_RE.match(domain_url)
+    return match.group(1).lower() if match else domain_url.lower()
+
+
+def _db_connect_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve database connection settings from the environment and config."""
     db_host = os.getenv('POSTGRES_HOST', config['storage'].get('db_host', 'localhost'))
     db_name = os.getenv('POSTGRES_DB', config['storage'].get('db_name', 'bpo_intelligence'))
     db_user = os.getenv('POSTGRES_USER', config['storage'].get('db_user', 'bpo_user'))
@@ -85,11 +180,41 @@ async def get_db_connection(config: Dict[str, Any]) -> asyncpg.Connection:
     else:
         db_password = os.getenv('POSTGRES_PASSWORD', 'bpo_secure_password_2025')
     
-    return await asyncpg.connect(
-        host=db_host,
-        database=db_name,
-        user=db_user,
-        password=db_password
+    return {
+        'host': db_host,
+        'database': db_name,
+        'user': db_user,
+        'password': db_password
+    }
+
+
+async def get_db_connection(config: Dict[str, Any]) -> asyncpg.Connection:
+    """Get database connection."""
+    return await asyncpg.connect(**_db_connect_kwargs(config))
+
+
+async def get_db_pool(
+    config: Dict[str, Any],
+    max_workers: int = PARALLEL_WORKERS
+) -> asyncpg.Pool:
+    """
+    Get a database connection pool.
+    
+    Pooled connections let concurrent domain tasks query in parallel instead
+    of queueing on one connection; asyncpg keeps a prepared-statement cache
+    per connection, so repeated queries skip parsing.
+    
+    Args:
+        config: Scraper configuration
+        max_workers: Domains processed concurrently; the pool keeps one
+            connection per worker open and allows a second under load
+    """
+    return await asyncpg.create_pool(
+        **_db_connect_kwargs(config),
+        min_size=max_workers,
+        max_size=max_workers * 2,
+        max_inactive_connection_lifetime=300,
+        statement_cache_size=1024
     )
 
 
@@ -106,15 +231,16 @@ async def security_assessment_task(domain_url: str, config: Dict[str, Any]) -> D
         Dictionary with security_type, security_level, strategy, and fingerprint
     """
     try:
-        detector = SecurityDetector()
-        
-        # Fetch page for analysis
-        from curl_cffi import requests
-        response = requests.get(
-            domain_url,
-            timeout=30,
-            impersonate="chrome110"
-        )
+        detector = _SECURITY_DETECTOR
+        
+        # Fetch page for analysis without blocking the other domains' tasks
+        from curl_cffi.requests import AsyncSession
+        async with AsyncSession() as session:
+            response = await session.get(
+                domain_url,
+                timeout=30,
+                impersonate="chrome110"
+            )
         
         # Analyze security using detect() method
         detection_result = detector.detect(
@@ -178,47 +304,48 @@ async def security_assessment_task(domain_url: str, config: Dict[str, Any]) -> D
 async def quality_test_task(
     domain_url: str,
     config: Dict[str, Any],
-    db_conn: asyncpg.Connection,
-    strategy: Dict[str, Any]
+    db_conn: asyncpg.Pool,
+    strategy: Dict[str, Any],
+    crawler: Optional[DomainCrawler] = None
 ) -> Dict[str, Any]:
     """
     Extract 10 sample records and assess quality.
     
+    The sample query filters on domain and success and orders by scraped_at
+    DESC, the shape idx_scraped_sites_domain_success_scraped_at serves.
+    
+    Args:
+        crawler: Crawler to run the sample crawl with (see
+            _quality_test_crawler); pass the same one to
+            full_domain_scrape_task to continue its crawl. A passed
+            crawler is left open for the caller to aclose()
+    
     Returns:
         Dictionary with quality_ratio, sample_urls, and pass status
     """
     try:
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Extract base domain
-        parsed = urlparse(domain_url)
-        domain = parsed.netloc.lower().replace('www.', '')
+        domain = _extract_domain(domain_url)
         
         # Create small test crawler
-        crawler = DomainCrawler(
-            config=config,
-            db_connection=db_conn,
-            max_depth=3,
-            max_pages=QUALITY_TEST_SIZE,
-            max_duration_seconds=300
-        )
+        owns_crawler = crawler is None
+        if owns_crawler:
+            crawler = _quality_test_crawler(config, db_conn)
         
         # Run test crawl
-        results = await crawler.crawl(domain_url)
-        
-        # Query database for quality metrics
-        records = await db_conn.fetch("""
-            SELECT 
-                metadata,
-                markdown_content
-            FROM scraped_sites
-            WHERE domain = $1
-              AND success = true
-            ORDER BY scraped_at DESC
-            LIMIT $2
-        """, domain, QUALITY_TEST_SIZE)
-        
-        if not records:
+        try:
+            results = await crawler.crawl(domain_url)
+        finally:
+            if owns_crawler:
+                await crawler.aclose()
+        
+        # Quality totals and sample URLs over the latest pages, summed in
+        # the database so page bodies are not transferred
+        row = await db_conn.fetchrow(_QUALITY_SAMPLE_SQL, domain, QUALITY_TEST_SIZE)
+        
+        if not row['record_count']:
             return {
                 "quality_ratio": 0.0,
                 "sample_urls": [],
@@ -226,48 +353,22 @@ async def quality_test_task(
                 "reason": "No records extracted"
             }
         
-        # Calculate quality metrics
-        total_html_length = 0
-        total_content_length = 0
-        sample_urls = []
-        
-        for record in records:
-            metadata = record['metadata'] or {}
-            if isinstance(metadata, str):
-                import json
-                metadata = json.loads(metadata)
-            
-            html_len = metadata.get('html_length', 0)
-            content_len = len(record['markdown_content'] or '')
-            
-            total_html_length += html_len
-            total_content_length += content_len
-        
         # Calculate ratio
-        quality_ratio = total_content_length / total_html_length if total_html_length > 0 else 0.0
-        
-        # Get sample URLs
-        url_records = await db_conn.fetch("""
-            SELECT url
-            FROM scraped_sites
-            WHERE domain = $1
-              AND success = true
-            ORDER BY scraped_at DESC
-            LIMIT $2
-        """, domain, QUALITY_TEST_SIZE)
+        total_html_length = row['html_length']
+        quality_ratio = row['content_length'] / total_html_length if total_html_length > 0 else 0.0
         
-        sample_urls = [r['url'] for r in url_records]
+        sample_urls = list(row['sample_urls'])
         
         # Decision criteria
         passed = quality_ratio >= 0.15  # At least 15% text ratio
         
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         
         return {
             "quality_ratio": quality_ratio,
             "sample_urls": sample_urls,
             "passed": passed,
-            "records_extracted": len(records),
+            "records_extracted": row['record_count'],
             "duration": duration,
             "reason": None if passed else "High HTML/Low Text Ratio"
         }
@@ -290,47 +391,60 @@ async def quality_test_task(
 async def full_domain_scrape_task(
     domain_url: str,
     config: Dict[str, Any],
-    db_conn: asyncpg.Connection,
+    db_conn: asyncpg.Pool,
     strategy: Dict[str, Any],
-    checkpoint_manager: CheckpointManager
+    checkpoint_manager: CheckpointManager,
+    crawler: Optional[DomainCrawler] = None
 ) -> Dict[str, Any]:
     """
     Extract up to 2000 records with checkpointing.
     
+    The record count filters on domain and success only, so it can be
+    answered from idx_scraped_sites_domain_success_scraped_at.
+    
+    Args:
+        crawler: Crawler from quality_test_task; its page and time limits
+            are raised and the crawl continues from its frontier instead
+            of restarting. A passed crawler is left open for the caller to
+            aclose()
+    
     Returns:
         Dictionary with records_extracted, duration, and status
     """
     try:
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Extract base domain
-        parsed = urlparse(domain_url)
-        domain = parsed.netloc.lower().replace('www.', '')
+        domain = _extract_domain(domain_url)
         
         # Set in progress
         checkpoint_manager.set_in_progress(domain, 0)
         
         # Create crawler with max pages
-        crawler = DomainCrawler(
-            config=config,
-            db_connection=db_conn,
-            max_depth=5,
-            max_pages=MAX_RECORDS_PER_DOMAIN,
-            max_duration_seconds=7200  # 2 hours max per domain
-        )
+        owns_crawler = crawler is None
+        if owns_crawler:
+            crawler = DomainCrawler(
+                config=config,
+                db_connection=db_conn,
+                max_depth=MAX_CRAWL_DEPTH,
+                max_pages=MAX_RECORDS_PER_DOMAIN,
+                max_duration_seconds=7200  # 2 hours max per domain
+            )
+        else:
+            crawler.max_pages = MAX_RECORDS_PER_DOMAIN
+            crawler.max_duration_seconds = 7200
         
         # Run full crawl
-        results = await crawler.crawl(domain_url)
+        try:
+            results = await crawler.crawl(domain_url)
+        finally:
+            if owns_crawler:
+                await crawler.aclose()
         
         # Get actual record count from database
-        record_count = await db_conn.fetchval("""
-            SELECT COUNT(*)
-            FROM scraped_sites
-            WHERE domain = $1
-              AND success = true
-        """, domain)
+        record_count = await db_conn.fetchval(_SUCCESS_COUNT_SQL, domain)
         
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         
         # Mark as completed
         checkpoint_manager.mark_domain_completed(domain, record_count, "success")
@@ -340,12 +454,13 @@ async def full_domain_scrape_task(
             "duration": duration,
             "status": "success",
             "pages_crawled": results.get('pages_crawled', 0),
-            "pages_failed": results.get('pages_failed', 0)
+            "pages_failed": results.get('pages_failed', 0),
+            "crawl_results": results
         }
         
     except Exception as e:
         logger.error(f"Full domain scrape failed for {domain_url}: {e}")
-        duration = (datetime.now() - start_time).total_seconds() if 'start_time' in locals() else 0
+        duration = time.perf_counter() - start_time if 'start_time' in locals() else 0
         
         return {
             "records_extracted": 0,
@@ -372,8 +487,17 @@ async def scrape_domains_flow(
     """
     # Initialize components
     config = load_config()
-    checkpoint_manager = CheckpointManager()
-    db_conn = await get_db_connection(config)
+    checkpoint_manager = CheckpointManager(max_pending=CHECKPOINT_INTERVAL)
+    db_conn = await get_db_pool(config, max_workers)
+    md_logger = None
+    md_verbosity = config.get('markdown_log_verbosity', 'full')
+    
+    # Completions are reported in batches by the flow, so the crawlers
+    # must not also notify after each of their crawls
+    notifier = _completion_notifier(config, db_conn)
+    crawl_config = config
+    if notifier is not None:
+        crawl_config = {**config, 'notifications': {**config['notifications'], 'enabled': False}}
     
     try:
         # Load or create checkpoint
@@ -383,14 +507,21 @@ async def scrape_domains_flow(
                 logger.info(f"Resuming from checkpoint: {checkpoint['run_id']}")
                 md_logger = MarkdownLogger(
                     f"logs/scrape_run_{checkpoint['run_id']}.md",
-                    checkpoint['run_id']
+                    checkpoint['run_id'],
+                    verbosity=md_verbosity
                 )
             else:
                 checkpoint = checkpoint_manager.create_new_checkpoint()
-                md_logger = MarkdownLogger(f"logs/scrape_run_{checkpoint['run_id']}.md")
+                md_logger = MarkdownLogger(
+                    f"logs/scrape_run_{checkpoint['run_id']}.md",
+                    verbosity=md_verbosity
+                )
         else:
             checkpoint = checkpoint_manager.create_new_checkpoint()
-            md_logger = MarkdownLogger(f"logs/scrape_run_{checkpoint['run_id']}.md")
+            md_logger = MarkdownLogger(
+                f"logs/scrape_run_{checkpoint['run_id']}.md",
+                verbosity=md_verbosity
+            )
         
         # Load domain list
         domains = load_domain_list(str(DOMAIN_LIST_PATH))
@@ -398,54 +529,57 @@ async def scrape_domains_flow(
         
         # Filter out completed domains
         completed = checkpoint.get('completed_domains', [])
-        # Extract domain from URL for comparison
-        completed_domains_set = {urlparse(d).netloc.lower().replace('www.', '') if isinstance(d, str) else d for d in completed}
-        remaining = []
-        for domain_url in domains:
-            parsed = urlparse(domain_url)
-            domain = parsed.netloc.lower().replace('www.', '')
-            if domain not in completed_domains_set:
-                remaining.append(domain_url)
+        # The checkpoint stores bare domain names (see mark_domain_completed)
+        completed_domains_set = set(completed)
+        remaining = [
+            domain_url for domain_url in domains
+            if _extract_domain(domain_url) not in completed_domains_set
+        ]
         
         logger.info(f"Processing {len(remaining)} domains ({len(completed)} already completed)")
         md_logger.log_config(len(domains), max_workers, MAX_RECORDS_PER_DOMAIN)
         md_logger.start_pass(checkpoint['current_pass'])
         
-        # Process domains in batches
-        results = []
-        for i in range(0, len(remaining), max_workers):
-            batch = remaining[i:i + max_workers]
-            
-            logger.info(f"Processing batch {i//max_workers + 1}: {len(batch)} domains")
-            
-            # Process batch sequentially (Prefect ConcurrentTaskRunner handles parallelism)
-            batch_results = []
-            for domain_url in batch:
+        # Run up to max_workers domains at a time; the next domain starts as
+        # soon as any running one finishes
+        semaphore = asyncio.Semaphore(max_workers)
+        
+        async def process_bounded(domain_url: str) -> Dict[str, Any]:
+            async with semaphore:
                 try:
-                    result = await process_domain_task(
+                    return await process_domain_task(
                         domain_url,
-                        config,
+                        crawl_config,
                         db_conn,
                         checkpoint_manager,
                         md_logger
                     )
-                    batch_results.append(result)
                 except Exception as e:
                     logger.error(f"Error processing domain {domain_url}: {e}")
-                    parsed = urlparse(domain_url)
-                    domain = parsed.netloc.lower().replace('www.', '')
-                    batch_results.append({
-                        "domain": domain,
+                    return {
+                        "domain": _extract_domain(domain_url),
                         "status": "marked_for_review",
                         "reason": f"Error: {str(e)}",
                         "duration": 0
-                    })
-            
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    logger.error(f"Domain processing error: {result}")
-                else:
-                    results.append(result)
+                    }
+        
+        results = []
+        # Successful domains waiting for their completion notification
+        completed_crawls: Dict[str, Dict[str, Any]] = {}
+        domain_tasks = [asyncio.create_task(process_bounded(domain_url)) for domain_url in remaining]
+        for completed_task in asyncio.as_completed(domain_tasks):
+            result = await completed_task
+            results.append(result)
+            if result.get('status') == 'success':
+                completed_crawls[result['domain']] = result.get('crawl_results', {})
+            if len(results) % max_workers == 0:
+                logger.info(f"Processed {len(results)}/{len(remaining)} domains")
+                # Write recent log entries off the event loop
+                await md_logger.aflush()
+                # Domains that finished since the last batch share one
+                # quality query and one file-count query
+                await _notify_completions(notifier, completed_crawls)
+        await _notify_completions(notifier, completed_crawls)
         
         # Generate summary
         successful = len([r for r in results if r.get('status') == 'success'])
@@ -474,6 +608,11 @@ async def scrape_domains_flow(
         }
         
     finally:
+        if md_logger is not None:
+            md_logger.close()
+        checkpoint_manager.close()
+        if notifier is not None:
+            await notifier.aclose()
         await db_conn.close()
 
 
@@ -481,22 +620,22 @@ async def scrape_domains_flow(
 async def process_domain_task(
     domain_url: str,
     config: Dict[str, Any],
-    db_conn: asyncpg.Connection,
+    db_conn: asyncpg.Pool,
     checkpoint_manager: CheckpointManager,
     md_logger: MarkdownLogger
 ) -> Dict[str, Any]:
     """Process a single domain through the full workflow."""
-    start_time = datetime.now()
+    start_time = time.perf_counter()
+    crawler = None
     
     try:
-        parsed = urlparse(domain_url)
-        domain = parsed.netloc.lower().replace('www.', '')
+        domain = _extract_domain(domain_url)
         
         # 1. Security Assessment
         security_result = await security_assessment_task(domain_url, config)
         
         if not security_result.get('has_strategy'):
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             reason = f"Security: {security_result.get('security_type', 'Unknown')}"
             checkpoint_manager.mark_domain_manual_review(
                 domain,
@@ -517,11 +656,19 @@ async def process_domain_task(
                 "duration": duration
             }
         
-        # 2. Quality Test
-        quality_result = await quality_test_task(domain_url, config, db_conn, security_result['strategy'])
+        # 2. Quality Test (its crawler is reused by the full scrape, so the
+        # sampled pages are not fetched twice)
+        crawler = _quality_test_crawler(config, db_conn)
+        quality_result = await quality_test_task(
+            domain_url,
+            config,
+            db_conn,
+            security_result['strategy'],
+            crawler
+        )
         
         if not quality_result.get('passed'):
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             reason = quality_result.get('reason', 'Quality test failed')
             checkpoint_manager.mark_domain_for_review(domain, reason)
             md_logger.log_domain_marked_for_review(
@@ -545,10 +692,11 @@ async def process_domain_task(
             config,
             db_conn,
             security_result['strategy'],
-            checkpoint_manager
+            checkpoint_manager,
+            crawler
         )
         
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         
         if scrape_result.get('status') == 'success':
             md_logger.log_domain_success(
@@ -562,7 +710,8 @@ async def process_domain_task(
                 "domain": domain,
                 "status": "success",
                 "records_extracted": scrape_result.get('records_extracted', 0),
-                "duration": duration
+                "duration": duration,
+                "crawl_results": scrape_result.get('crawl_results', {})
             }
         else:
             reason = scrape_result.get('error', 'Scraping failed')
@@ -581,7 +730,7 @@ async def process_domain_task(
             }
             
     except Exception as e:
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         logger.error(f"Error processing domain {domain_url}: {e}")
         
         checkpoint_manager.mark_domain_for_review(domain_url, f"Error: {str(e)}")
@@ -592,6 +741,10 @@ async def process_domain_task(
             "reason": f"Error: {str(e)}",
             "duration": duration
         }
+    
+    finally:
+        if crawler is not None:
+            await crawler.aclose()
 
 
 if __name__ == '__main__':
@@ -3,10 +3,9 @@ Domain Crawler - Crawl a website following links within the same domain
 """
 
 import asyncio
-import json
 from typing import Dict, Set, List, Optional, Any
 from urllib.parse import urlparse, urljoin
-from datetime import datetime
+from datetime import datetime, timezone
 from collections import deque
 
 import asyncpg
@@ -19,8 +18,14 @@ from .base import BaseScraper
 from .file_scraper import FileScraper
 from ..parsers.link_extractor import LinkExtractor
 from ..parsers.boilerplate_detector import BoilerplateDetector
+from ..models.organization import OrganizationDB
 from ..notifications.domain_notifier import DomainNotifier
 from ..utils.auto_create_organization import auto_create_organization_from_domain
+from ..utils.jsonb import dumps_jsonb
+
+
+# Boilerplate detection holds only compiled patterns, so crawlers share one
+_BOILERPLATE_DETECTOR = BoilerplateDetector()
 
 
 class DomainCrawler(BaseScraper):
@@ -60,7 +65,12 @@ class DomainCrawler(BaseScraper):
         self.crawled_count = 0
         
         # Components
-        self.boilerplate_detector = BoilerplateDetector()
+        self.boilerplate_detector = _BOILERPLATE_DETECTOR
+        
+        # Organization facts are stored page by page; evidence is buffered and
+        # COPYed once per page, and rows from a failed COPY stay buffered
+        # until the next page's flush
+        self.org_db = OrganizationDB(db_connection, buffer_evidence=True)
         
         # File scraper if enabled
         file_config = config.get('file_download', {})
@@ -77,7 +87,8 @@ class DomainCrawler(BaseScraper):
             self.notifier = DomainNotifier(
                 db_connection=db_connection,
                 webhook_url=webhook_url if webhook_url else None,
-                webhook_enabled=bool(webhook_url)
+                webhook_enabled=bool(webhook_url),
+                verbose_webhook=notification_config.get('verbose_webhook', False)
             )
         else:
             self.notifier = None
@@ -151,6 +162,10 @@ class DomainCrawler(BaseScraper):
         """
         Crawl a domain starting from a URL.
         
+        Calling crawl() again on the same crawler (e.g. after raising
+        max_pages) continues from the remaining frontier; pages already
+        crawled are not fetched again.
+        
         Args:
             start_url: Starting URL
             
@@ -161,8 +176,9 @@ class DomainCrawler(BaseScraper):
         logger.info(f"Starting crawl of {base_domain} from {start_url}")
         
         # Initialize queue
-        self.to_visit.append((start_url, 0))  # (url, depth)
-        self.visited_urls.add(start_url)
+        if start_url not in self.visited_urls:
+            self.to_visit.append((start_url, 0))  # (url, depth)
+            self.visited_urls.add(start_url)
         
         session = requests.Session()
         results = {
@@ -171,14 +187,14 @@ class DomainCrawler(BaseScraper):
             'pages_crawled': 0,
             'pages_failed': 0,
             'files_found': 0,
-            'start_time': datetime.now(),
+            'start_time': datetime.now(timezone.utc),
             'end_time': None
         }
         
         while self.to_visit and self.crawled_count < self.max_pages:
             # Check time limit
             if self.max_duration_seconds:
-                elapsed = (datetime.now() - results['start_time']).total_seconds()
+                elapsed = (datetime.now(timezone.utc) - results['start_time']).total_seconds()
                 if elapsed >= self.max_duration_seconds:
                     logger.info(f"Time limit reached ({self.max_duration_seconds}s), stopping crawl")
                     break
@@ -271,8 +287,7 @@ class DomainCrawler(BaseScraper):
             if self.file_scraper:
                 file_results = await self.file_scraper.process_page_for_files(
                     page_url=url,
-                    html_content=html_content,
-                    session=session
+                    html_content=html_content
                 )
                 results['files_found'] += len([r for r in file_results if r.get('status') == 'downloaded'])
             
@@ -287,7 +302,7 @@ class DomainCrawler(BaseScraper):
             self.crawled_count += 1
             results['pages_crawled'] += 1
         
-        results['end_time'] = datetime.now()
+        results['end_time'] = datetime.now(timezone.utc)
         duration = (results['end_time'] - results['start_time']).total_seconds()
         results['duration_seconds'] = duration
         
@@ -417,7 +432,7 @@ class DomainCrawler(BaseScraper):
                 fetch_result.get('error'),
                 fetch_result.get('proxy_used', False),  # proxy_used
                 0.0,  # cost
-                json.dumps(metadata_dict),  # Convert dict to JSON string for JSONB
+                dumps_jsonb(metadata_dict),  # Convert dict to JSON string for JSONB
                 markdown_content,  # markdown_content
                 organization_uuid  # organization_uuid
             )
@@ -438,7 +453,8 @@ class DomainCrawler(BaseScraper):
                         domain,
                         url,
                         html_content,
-                        scraped_site_id
+                        scraped_site_id,
+                        org_db=self.org_db
                     )
                 except Exception as extract_error:
                     logger.warning(f"Error extracting organization facts from {url}: {extract_error}")
@@ -462,4 +478,19 @@ class DomainCrawler(BaseScraper):
             'success': False,
             'error': 'Use crawl() method for domain crawling'
         }
+    
+    async def aclose(self):
+        """
+        Write evidence still buffered from a failed flush, then close the
+        file downloader's and notifier's shared clients.
+        """
+        try:
+            await self.org_db.flush_evidence()
+        except Exception as e:
+            logger.error(f"Error flushing organization evidence: {e}")
+        
+        if self.file_scraper:
+            await self.file_scraper.aclose()
+        if self.notifier:
+            await self.notifier.aclose()
 
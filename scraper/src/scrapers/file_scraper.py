@@ -9,7 +9,6 @@ from uuid import uuid4
 from datetime import datetime
 
 import asyncpg
-from curl_cffi import requests
 from loguru import logger
 
 from ..parsers.link_extractor import LinkExtractor
@@ -44,6 +43,11 @@ class FileScraper:
         self.enable_deduplication = file_config.get('enable_deduplication', True)
         self.download_direct_urls_only = file_config.get('download_direct_urls_only', True)
         
+        # Bounds the concurrent downloads of one page (pooled connections only)
+        self._download_semaphore = asyncio.Semaphore(
+            file_config.get('max_concurrent_downloads', 8)
+        )
+        
         self.downloader = FileDownloader(
             storage_path=storage_path,
             max_file_size=self.max_file_size,
@@ -51,19 +55,25 @@ class FileScraper:
             retry_delays=config.get('retry_delays', [5, 15, 45])
         )
     
+    async def aclose(self):
+        """Close the downloader's shared clients."""
+        await self.downloader.aclose()
+    
     async def process_page_for_files(
         self,
         page_url: str,
-        html_content: str,
-        session: Optional[requests.Session] = None
+        html_content: str
     ) -> List[Dict[str, Any]]:
         """
         Extract and download files from a scraped page.
         
+        With a connection pool the page's files are downloaded concurrently
+        (up to max_concurrent_downloads) over the downloader's shared async
+        client; a single connection processes them one at a time.
+        
         Args:
             page_url: URL of the page being scraped
             html_content: HTML content of the page
-            session: Optional requests session
             
         Returns:
             List of download results
@@ -81,29 +91,48 @@ class FileScraper:
             logger.info(f"Found {len(file_urls)} file links on {page_url}")
             
             # Process each file URL
-            for file_url in file_urls:
-                try:
-                    result = await self._process_file_url(
-                        file_url=file_url,
-                        source_url=page_url,
-                        session=session
-                    )
-                    if result:
-                        results.append(result)
-                except Exception as e:
-                    logger.error(f"Error processing file {file_url}: {e}")
-                    continue
+            if isinstance(self.db.conn, asyncpg.Pool):
+                page_results = await asyncio.gather(*(
+                    self._process_file_url_bounded(file_url, page_url)
+                    for file_url in file_urls
+                ))
+            else:
+                page_results = [
+                    await self._process_file_url_safe(file_url, page_url)
+                    for file_url in file_urls
+                ]
+            results = [result for result in page_results if result]
             
         except Exception as e:
             logger.error(f"Error extracting files from {page_url}: {e}")
         
         return results
     
+    async def _process_file_url_bounded(
+        self,
+        file_url: str,
+        source_url: str
+    ) -> Optional[Dict[str, Any]]:
+        """Process a file URL once a download slot is free."""
+        async with self._download_semaphore:
+            return await self._process_file_url_safe(file_url, source_url)
+    
+    async def _process_file_url_safe(
+        self,
+        file_url: str,
+        source_url: str
+    ) -> Optional[Dict[str, Any]]:
+        """Process a file URL, logging errors instead of raising them."""
+        try:
+            return await self._process_file_url(file_url=file_url, source_url=source_url)
+        except Exception as e:
+            logger.error(f"Error processing file {file_url}: {e}")
+            return None
+    
     async def _process_file_url(
         self,
         file_url: str,
-        source_url: str,
-        session: Optional[requests.Session] = None
+        source_url: str
     ) -> Optional[Dict[str, Any]]:
         """
         Process a single file URL: check if exists, download if needed.
@@ -111,7 +140,6 @@ class FileScraper:
         Args:
             file_url: URL of file to download
             source_url: URL where file was found
-            session: Optional requests session
             
         Returns:
             Dictionary with processing result or None
@@ -138,9 +166,8 @@ class FileScraper:
         original_filename = self._extract_filename(file_url)
         
         # Download file first (downloader will generate UUID filename)
-        download_result = await asyncio.to_thread(
-            self.downloader.download_file,
-            file_url, file_type, domain, session
+        download_result = await self.downloader.download_file_async(
+            file_url, file_type, domain
         )
         
         if not download_result['success']:
@@ -166,17 +193,6 @@ class FileScraper:
                 'error': download_result.get('error')
             }
         
-        # Check for duplicate hash if deduplication enabled
-        if self.enable_deduplication and download_result['file_hash']:
-            duplicate_id = await self.db.check_hash_exists(download_result['file_hash'])
-            if duplicate_id:
-                logger.info(f"Duplicate file detected (hash: {download_result['file_hash'][:16]}...), existing ID: {duplicate_id}")
-                return {
-                    'file_url': file_url,
-                    'status': 'duplicate',
-                    'file_id': duplicate_id
-                }
-        
         # Create record for successful download
         file_data = DownloadedFile(
             source_url=source_url,
@@ -187,15 +203,26 @@ class FileScraper:
             stored_filename=download_result['stored_filename'],
             file_path=download_result['file_path'],
             file_size=download_result['file_size'],
-            file_hash=download_result['file_hash'],
+            file_hash=bytes.fromhex(download_result['file_hash']) if download_result['file_hash'] else None,
             content_type=download_result['content_type'],
             download_status='downloaded',
             downloaded_at=datetime.now(),
             parent_page_url=source_url
         )
         
-        # Insert record
-        file_id = await self.db.create_file_record(file_data)
+        # Insert record, unless deduplication finds the same hash already stored
+        if self.enable_deduplication and download_result['file_hash']:
+            file_id, duplicate_id = await self.db.create_file_record_if_new(file_data)
+            if duplicate_id:
+                logger.info(f"Duplicate file detected (hash: {download_result['file_hash'][:16]}...), existing ID: {duplicate_id}")
+                return {
+                    'file_url': file_url,
+                    'status': 'duplicate',
+                    'file_id': duplicate_id
+                }
+        else:
+            file_id = await self.db.create_file_record(file_data)
+        
         logger.info(f"Successfully downloaded {file_url} (ID: {file_id})")
         
         return {
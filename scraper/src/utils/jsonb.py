@@ -0,0 +1,46 @@
+"""
+JSON serialization for JSONB query parameters and decoding of JSONB results.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps_jsonb(value: Any) -> str:
+    """
+    Serialize a value for a JSONB parameter.
+
+    Uses orjson (C, several times faster than the stdlib encoder) when
+    installed. asyncpg's default jsonb codec takes text, so the result is
+    always a str.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        JSON text
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value)
+
+
+def loads_jsonb(text: str) -> Any:
+    """
+    Decode JSONB column text as returned by asyncpg's default codec.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        Decoded value
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
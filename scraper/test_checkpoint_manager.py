@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test Checkpoint Write-Behind
+
+Checks when CheckpointManager writes to disk and that writes replace the
+file atomically, using a temporary checkpoint directory.
+"""
+
+import sys
+import json
+import atexit
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+import orchestration.checkpoint_manager as checkpoint_module
+from orchestration.checkpoint_manager import CheckpointManager
+
+
+def _on_disk(manager):
+    """Checkpoint as currently stored in the file."""
+    return json.loads(manager.checkpoint_file.read_bytes())
+
+
+def _manager(checkpoint_dir, **kwargs):
+    manager = CheckpointManager(checkpoint_dir=checkpoint_dir, **kwargs)
+    # The temporary directory is gone by interpreter exit
+    atexit.unregister(manager.close)
+    return manager
+
+
+def test_writes_behind_until_max_pending():
+    """Changes stay in memory until max_pending of them are unsaved."""
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        manager = _manager(checkpoint_dir, flush_interval=3600, max_pending=3)
+        manager.create_new_checkpoint("write_behind")
+
+        manager.mark_domain_completed("a.com", 10)
+        manager.mark_domain_completed("b.com", 20)
+        assert _on_disk(manager)['completed_domains'] == []
+        # Readers of this manager see the unsaved changes
+        assert manager.load_checkpoint()['completed_domains'] == ['a.com', 'b.com']
+
+        manager.mark_domain_completed("c.com", 30)
+        stored = _on_disk(manager)
+        assert stored['completed_domains'] == ['a.com', 'b.com', 'c.com']
+        assert stored['stats']['total_records'] == 60
+
+
+def test_flush_and_close_write_pending_changes():
+    """flush() writes pending changes; close() also writes the readable copy."""
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        manager = _manager(checkpoint_dir, flush_interval=3600)
+        manager.create_new_checkpoint("flush")
+
+        manager.mark_domain_for_review("review.com", "Low quality")
+        assert _on_disk(manager)['marked_for_review'] == []
+
+        manager.flush()
+        assert _on_disk(manager)['marked_for_review'][0]['domain'] == "review.com"
+
+        manager.set_in_progress("next.com")
+        manager.close()
+        assert _on_disk(manager)['in_progress']['domain'] == "next.com"
+        pretty = manager.pretty_checkpoint_file.read_text(encoding='utf-8')
+        assert json.loads(pretty) == _on_disk(manager)
+        assert '\n  ' in pretty
+
+
+def test_flush_interval_writes_immediately():
+    """With no interval every change is written straight away."""
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        manager = _manager(checkpoint_dir, flush_interval=0)
+        manager.create_new_checkpoint("immediate")
+
+        manager.mark_domain_completed("a.com", 1)
+        assert _on_disk(manager)['completed_domains'] == ['a.com']
+
+
+def test_failed_write_keeps_previous_file():
+    """A write that fails before the rename leaves the old checkpoint intact."""
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        manager = _manager(checkpoint_dir, flush_interval=0)
+        manager.create_new_checkpoint("atomic")
+        manager.mark_domain_completed("a.com", 1)
+        before = manager.checkpoint_file.read_bytes()
+
+        def failing_replace(src, dst):
+            raise OSError("disk full")
+
+        original_replace = checkpoint_module.os.replace
+        checkpoint_module.os.replace = failing_replace
+        try:
+            # save_checkpoint logs the error instead of raising
+            manager.mark_domain_completed("b.com", 1)
+        finally:
+            checkpoint_module.os.replace = original_replace
+
+        assert manager.checkpoint_file.read_bytes() == before
+        assert _on_disk(manager)['completed_domains'] == ['a.com']
+
+        # The next successful write replaces the file and its temporary copy
+        manager.flush()
+        assert _on_disk(manager)['completed_domains'] == ['a.com', 'b.com']
+        assert sorted(p.name for p in Path(checkpoint_dir).iterdir()) == ['scrape_checkpoint.json']
+
+
+def test_resume_from_written_checkpoint():
+    """A new manager loads what an earlier one flushed."""
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        manager = _manager(checkpoint_dir, flush_interval=3600, max_pending=100)
+        manager.create_new_checkpoint("resume")
+        manager.mark_domain_completed("https://www.a.com/", 5)
+        manager.close()
+
+        resumed = _manager(checkpoint_dir)
+        checkpoint = resumed.load_checkpoint()
+        assert checkpoint['run_id'] == "resume"
+        assert checkpoint['completed_domains'] == ['a.com']
+
+        # Duplicate completions are ignored after a resume as well
+        resumed.mark_domain_completed("a.com", 5)
+        assert resumed.load_checkpoint()['stats']['processed'] == 1
+
+
+TESTS = [
+    ("Write-behind until max_pending", test_writes_behind_until_max_pending),
+    ("Flush and close", test_flush_and_close_write_pending_changes),
+    ("Zero flush interval", test_flush_interval_writes_immediately),
+    ("Atomic replace", test_failed_write_keeps_previous_file),
+    ("Resume from written checkpoint", test_resume_from_written_checkpoint),
+]
+
+
+def main():
+    """Run all tests."""
+    print("=" * 80)
+    print("Checkpoint Write-Behind Test")
+    print("=" * 80)
+
+    results = []
+    for name, test in TESTS:
+        print(f"\n[TEST] {name}")
+        print("-" * 60)
+        try:
+            test()
+            print("[OK] Passed")
+            results.append(True)
+        except Exception as e:
+            print(f"[FAIL] {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+
+    passed = sum(results)
+    total = len(results)
+
+    print("\n" + "=" * 80)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 80)
+    return passed == total
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test Corporate Entity Hierarchy
+
+Runs the recursive hierarchy query of CorporateEntityDB on an in-memory
+SQLite database. The query uses only portable SQL (WITH RECURSIVE, UNION
+ALL), and SQLite accepts asyncpg's $N placeholders as named parameters.
+"""
+
+import sys
+import asyncio
+import sqlite3
+from pathlib import Path
+
+# Add scraper root to path (the models use package-relative imports)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models.corporate_entity import CorporateEntityDB
+
+
+# Reduced init-db.sql tables:
+#   Group -> Holding -> Target -> Sub -> SubSub
+#   Investor -> Target (ended), Target -> Venture (second child)
+SCHEMA = """
+    CREATE TABLE corporate_entities (
+        id INTEGER PRIMARY KEY,
+        entity_name TEXT NOT NULL
+    );
+    CREATE TABLE entity_relationships (
+        id INTEGER PRIMARY KEY,
+        parent_entity_id INTEGER NOT NULL,
+        child_entity_id INTEGER NOT NULL,
+        relationship_type TEXT NOT NULL,
+        is_active BOOLEAN DEFAULT true
+    );
+    INSERT INTO corporate_entities (id, entity_name) VALUES
+        (1, 'Group'), (2, 'Holding'), (3, 'Target'), (4, 'Sub'),
+        (5, 'SubSub'), (6, 'Investor'), (7, 'Venture');
+    INSERT INTO entity_relationships (parent_entity_id, child_entity_id, relationship_type, is_active) VALUES
+        (1, 2, 'subsidiary', true),
+        (2, 3, 'subsidiary', true),
+        (3, 4, 'subsidiary', true),
+        (4, 5, 'subsidiary', true),
+        (6, 3, 'investment', false),
+        (3, 7, 'joint_venture', true);
+"""
+
+
+class SQLiteConnection:
+    """Minimal asyncpg-style fetch() over an in-memory SQLite database."""
+
+    def __init__(self):
+        self.db = sqlite3.connect(':memory:')
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    async def fetch(self, query, *args):
+        params = {str(index): value for index, value in enumerate(args, start=1)}
+        return self.db.execute(query, params).fetchall()
+
+
+def _names(rows, key):
+    return [(row[key], row['depth']) for row in rows]
+
+
+def test_hierarchy_walks_both_directions():
+    """Ancestors and descendants come back with their depth."""
+    db = CorporateEntityDB(SQLiteConnection())
+
+    hierarchy = asyncio.run(db.get_entity_hierarchy(3))
+
+    assert _names(hierarchy['parents'], 'parent_name') == [('Holding', 1), ('Group', 2)]
+    assert sorted(_names(hierarchy['children'], 'child_name')) == [
+        ('Sub', 1), ('SubSub', 2), ('Venture', 1)
+    ]
+    # Rows keep the relationship columns
+    assert hierarchy['parents'][0]['child_entity_id'] == 3
+    assert hierarchy['parents'][0]['relationship_type'] == 'subsidiary'
+
+
+def test_hierarchy_depth_limit():
+    """max_depth bounds the walk in each direction."""
+    db = CorporateEntityDB(SQLiteConnection())
+
+    hierarchy = asyncio.run(db.get_entity_hierarchy(3, max_depth=1))
+
+    assert _names(hierarchy['parents'], 'parent_name') == [('Holding', 1)]
+    assert sorted(_names(hierarchy['children'], 'child_name')) == [('Sub', 1), ('Venture', 1)]
+
+
+def test_hierarchy_skips_inactive_relationships():
+    """Ended relationships are not followed."""
+    db = CorporateEntityDB(SQLiteConnection())
+
+    hierarchy = asyncio.run(db.get_entity_hierarchy(6))
+
+    assert hierarchy == {'parents': [], 'children': []}
+
+
+def test_hierarchy_ordered_by_depth():
+    """Rows come back nearest first."""
+    db = CorporateEntityDB(SQLiteConnection())
+
+    hierarchy = asyncio.run(db.get_entity_hierarchy(5, max_depth=5))
+
+    assert _names(hierarchy['parents'], 'parent_name') == [
+        ('Sub', 1), ('Target', 2), ('Holding', 3), ('Group', 4)
+    ]
+    assert hierarchy['children'] == []
+
+
+TESTS = [
+    ("Hierarchy walks both directions", test_hierarchy_walks_both_directions),
+    ("Hierarchy depth limit", test_hierarchy_depth_limit),
+    ("Hierarchy skips inactive relationships", test_hierarchy_skips_inactive_relationships),
+    ("Hierarchy ordered by depth", test_hierarchy_ordered_by_depth),
+]
+
+
+def main():
+    """Run all tests."""
+    print("=" * 80)
+    print("Corporate Entity Hierarchy Test")
+    print("=" * 80)
+
+    results = []
+    for name, test in TESTS:
+        print(f"\n[TEST] {name}")
+        print("-" * 60)
+        try:
+            test()
+            print("[OK] Passed")
+            results.append(True)
+        except Exception as e:
+            print(f"[FAIL] {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+
+    passed = sum(results)
+    total = len(results)
+
+    print("\n" + "=" * 80)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 80)
+    return passed == total
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test Batched Domain Notifications
+
+Runs DomainNotifier.notify_domain_completions() against an in-memory
+connection, so no database or webhook is needed.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add scraper root to path (the notifier uses package-relative imports)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.notifications.domain_notifier import (
+    DomainNotifier,
+    _QUALITY_QUERY,
+    _FILE_COUNTS_QUERY,
+)
+
+
+QUALITY_ROWS = [
+    {
+        'domain': 'a.com', 'total_pages': 10, 'successful_pages': 8,
+        'avg_response_time': 120.0, 'avg_content_length': 2400.0,
+        'unique_content_count': 8, 'proxy_used_count': 0,
+        'low_content_count': 2, 'duplicate_count': 1
+    },
+    {
+        'domain': 'b.com', 'total_pages': 4, 'successful_pages': 4,
+        'avg_response_time': 80.0, 'avg_content_length': 900.0,
+        'unique_content_count': 4, 'proxy_used_count': 4,
+        'low_content_count': 0, 'duplicate_count': 0
+    },
+]
+
+FILE_ROWS = [
+    {'domain': 'a.com', 'file_type': 'pdf', 'download_status': 'downloaded', 'count': 3, 'total_size': 3 * 1024 * 1024},
+    {'domain': 'a.com', 'file_type': 'pdf', 'download_status': 'failed', 'count': 1, 'total_size': None},
+    {'domain': 'b.com', 'file_type': 'docx', 'download_status': 'downloaded', 'count': 2, 'total_size': 2048},
+]
+
+
+class FakeConnection:
+    """Answers the batched queries, keeping only rows for the requested domains."""
+
+    def __init__(self):
+        self.queries = []
+
+    async def fetch(self, query, domains):
+        self.queries.append((query, list(domains)))
+        rows = QUALITY_ROWS if query == _QUALITY_QUERY else FILE_ROWS
+        return [row for row in rows if row['domain'] in domains]
+
+
+def _crawl_results(pages):
+    return {'pages_crawled': pages, 'pages_failed': 0, 'files_found': 0, 'duration_seconds': 1.0}
+
+
+def test_batch_uses_one_query_each():
+    """Several domains cost one quality query and one file-count query."""
+    conn = FakeConnection()
+    notifier = DomainNotifier(db_connection=conn, webhook_enabled=False)
+
+    results = asyncio.run(notifier.notify_domain_completions({
+        'a.com': _crawl_results(10),
+        'b.com': _crawl_results(4),
+        'c.com': _crawl_results(0),
+    }))
+
+    assert [query for query, _ in conn.queries] == [_QUALITY_QUERY, _FILE_COUNTS_QUERY]
+    assert all(domains == ['a.com', 'b.com', 'c.com'] for _, domains in conn.queries)
+    assert list(results) == ['a.com', 'b.com', 'c.com']
+    assert all(result['success'] and not result['webhook_sent'] for result in results.values())
+
+
+def test_batch_splits_rows_by_domain():
+    """Each domain gets the metrics and file stats of its own rows."""
+    notifier = DomainNotifier(db_connection=FakeConnection(), webhook_enabled=False)
+
+    results = asyncio.run(notifier.notify_domain_completions({
+        'a.com': _crawl_results(10),
+        'b.com': _crawl_results(4),
+        'c.com': _crawl_results(0),
+    }))
+
+    a_quality = results['a.com']['quality_metrics']
+    assert a_quality['total_pages'] == 10
+    assert a_quality['success_rate'] == 80.0
+    assert a_quality['duplicate_content_count'] == 1
+    a_files = results['a.com']['file_statistics']
+    assert a_files['total_files'] == 4
+    assert a_files['by_type']['pdf']['failed'] == 1
+    assert a_files['total_size_mb'] == 3.0
+
+    assert results['b.com']['quality_metrics']['proxy_used_count'] == 4
+    assert results['b.com']['file_statistics']['by_type']['docx']['downloaded'] == 2
+
+    # No recent pages or files: zeroed metrics rather than a missing key
+    assert results['c.com']['quality_metrics']['total_pages'] == 0
+    assert results['c.com']['file_statistics']['total_files'] == 0
+
+
+def test_batch_matches_single_domain():
+    """A batched result equals the one notify_domain_completion() returns."""
+    notifier = DomainNotifier(db_connection=FakeConnection(), webhook_enabled=False)
+
+    async def run():
+        batched = await notifier.notify_domain_completions({
+            'a.com': _crawl_results(10),
+            'b.com': _crawl_results(4),
+        })
+        single = await notifier.notify_domain_completion('a.com', _crawl_results(10))
+        return batched['a.com'], single
+
+    batched, single = asyncio.run(run())
+    assert batched == single
+
+
+def test_batch_empty():
+    """No domains, no queries."""
+    conn = FakeConnection()
+    notifier = DomainNotifier(db_connection=conn, webhook_enabled=False)
+
+    assert asyncio.run(notifier.notify_domain_completions({})) == {}
+    assert conn.queries == []
+
+
+TESTS = [
+    ("Batch uses one query each", test_batch_uses_one_query_each),
+    ("Batch splits rows by domain", test_batch_splits_rows_by_domain),
+    ("Batch matches single domain", test_batch_matches_single_domain),
+    ("Empty batch", test_batch_empty),
+]
+
+
+def main():
+    """Run all tests."""
+    print("=" * 80)
+    print("Batched Domain Notifications Test")
+    print("=" * 80)
+
+    results = []
+    for name, test in TESTS:
+        print(f"\n[TEST] {name}")
+        print("-" * 60)
+        try:
+            test()
+            print("[OK] Passed")
+            results.append(True)
+        except Exception as e:
+            print(f"[FAIL] {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+
+    passed = sum(results)
+    total = len(results)
+
+    print("\n" + "=" * 80)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 80)
+    return passed == total
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test Entity Extractor
+
+Checks that the unioned pattern groups and the single-pass fact scan find
+what the individual patterns find, and that the keyword prefilter skips pages without a rare fact
+keyword but never one a certification, award or country extractor matches.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Add scraper root to path (the extractors use package-relative imports)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.extractors.entity_extractor import EntityExtractor
+
+
+SAMPLE_TEXTS = [
+    "We are ISO 27001 and SOC 2 certified, PCI DSS compliant and HIPAA ready.",
+    "Offices in the United States, the U.K., India and the Philippines.",
+    "Enterprise clients and consumer end-users alike trust our B2B platform.",
+    "ISO9001 since 2010; GDPR and COPC aligned; CMMI level 3; PCI SSC member.",
+    "Our customers in Canada, Australia, Mexico and Brazil.",
+    "Business-to-business and business to consumer services for UK partners.",
+    "We won the Stevie award and were named a Gartner Magic Quadrant leader.",
+    "Nothing relevant here at all.",
+    "PRISON reform, unisoc chips and ukulele lessons for superusers.",
+    "",
+]
+
+
+def _sorted(values):
+    return sorted(values, key=str.lower)
+
+
+def _per_pattern_facts(extractor, text):
+    """Certifications, countries and segment found one pattern at a time."""
+    certifications = set()
+    for pattern in extractor.certification_patterns:
+        for match in re.findall(pattern, text.upper(), re.IGNORECASE):
+            certifications.add(match.strip())
+
+    countries = set()
+    for pattern in [
+        r'\b(United States|USA|U\.S\.|U\.S\.A\.)\b',
+        r'\b(United Kingdom|UK|U\.K\.)\b',
+        r'\b(India|Philippines|Mexico|Brazil|Canada|Australia)\b',
+    ]:
+        countries.update(re.findall(pattern, text, re.IGNORECASE))
+
+    is_b2b = any(re.search(pattern, text.lower()) for pattern in extractor.b2b_indicators)
+    is_b2c = any(re.search(pattern, text.lower()) for pattern in extractor.b2c_indicators)
+    return list(certifications), list(countries), extractor._segment(is_b2b, is_b2c)
+
+
+def test_unioned_patterns_match_per_pattern_scans():
+    """Each unioned group finds what its patterns find one at a time."""
+    extractor = EntityExtractor()
+
+    for text in SAMPLE_TEXTS:
+        certifications, countries, segment = _per_pattern_facts(extractor, text)
+        assert _sorted(extractor.extract_certifications(text)) == _sorted(certifications), text
+        assert _sorted(extractor.extract_countries(text)) == _sorted(countries), text
+        assert extractor.determine_customer_segment(text) == segment, text
+
+
+def test_scan_facts_matches_individual_extractors():
+    """One pass over the text finds what the three extractors find."""
+    extractor = EntityExtractor()
+
+    for text in SAMPLE_TEXTS:
+        scanned = extractor.scan_facts(text)
+        assert _sorted(scanned['certifications']) == _sorted(extractor.extract_certifications(text)), text
+        assert _sorted(scanned['countries']) == _sorted(extractor.extract_countries(text)), text
+        assert scanned['customer_segment'] == extractor.determine_customer_segment(text), text
+
+
+def test_scan_facts_values():
+    """The single-pass union keeps each group's own normalization."""
+    extractor = EntityExtractor()
+
+    scanned = extractor.scan_facts(SAMPLE_TEXTS[0])
+    assert _sorted(scanned['certifications']) == ['HIPAA', 'ISO 27001', 'PCI DSS', 'SOC 2']
+    assert scanned['countries'] == []
+    assert scanned['customer_segment'] is None
+
+    scanned = extractor.scan_facts(SAMPLE_TEXTS[2])
+    assert scanned['customer_segment'] == 'Both'
+
+    # Word boundaries still apply inside the union
+    scanned = extractor.scan_facts(SAMPLE_TEXTS[8])
+    assert scanned == {'certifications': [], 'countries': [], 'customer_segment': None}
+
+
+def _counting_extractor():
+    """Extractor that records every page it parses."""
+    extractor = EntityExtractor()
+    calls = []
+    original_extract_text = extractor.extract_text
+
+    def counting_extract_text(html_content):
+        calls.append(html_content)
+        return original_extract_text(html_content)
+
+    extractor.extract_text = counting_extract_text
+    return extractor, calls
+
+
+def test_keyword_prefilter_skips_irrelevant_pages():
+    """Pages without a rare fact keyword are skipped before parsing."""
+    extractor, calls = _counting_extractor()
+
+    for body in [
+        "Nothing relevant here at all.",
+        # Generic segment words alone do not get a page parsed
+        "Trusted by our customers, clients and partners. Social good, isolated users.",
+    ]:
+        facts = extractor.extract_facts_from_html(
+            f"<html><body><p>{body}</p></body></html>", "https://example.com/"
+        )
+        assert facts['certifications'] == [] and facts['customer_segment'] is None
+
+    assert calls == []
+
+    facts = extractor.extract_facts_from_html(
+        "<html><body><p>ISO 27001 certified for enterprise clients in India.</p></body></html>",
+        "https://example.com/"
+    )
+    assert len(calls) == 1
+    assert facts['certifications'] == ['ISO 27001']
+    assert facts['countries'] == ['India']
+    assert facts['customer_segment'] == 'B2B'
+
+
+def test_keyword_prefilter_never_hides_a_fact():
+    """Whenever a certification, award or country matches, the page is parsed."""
+    extractor = EntityExtractor()
+
+    for text in SAMPLE_TEXTS:
+        scanned = extractor.scan_facts(text)
+        awards = extractor.extract_awards(text)
+        if scanned['certifications'] or scanned['countries'] or awards:
+            assert extractor._keyword_re.search(text), text
+
+    # Explicit segment terms get a page parsed on their own
+    for text in ["A B2B platform", "b2c apps", "business-to-business services"]:
+        assert extractor._keyword_re.search(text), text
+
+
+TESTS = [
+    ("Unioned patterns match per-pattern scans", test_unioned_patterns_match_per_pattern_scans),
+    ("Scan facts matches individual extractors", test_scan_facts_matches_individual_extractors),
+    ("Scan facts values", test_scan_facts_values),
+    ("Keyword prefilter skips irrelevant pages", test_keyword_prefilter_skips_irrelevant_pages),
+    ("Keyword prefilter never hides a fact", test_keyword_prefilter_never_hides_a_fact),
+]
+
+
+def main():
+    """Run all tests."""
+    print("=" * 80)
+    print("Entity Extractor Test")
+    print("=" * 80)
+
+    results = []
+    for name, test in TESTS:
+        print(f"\n[TEST] {name}")
+        print("-" * 60)
+        try:
+            test()
+            print("[OK] Passed")
+            results.append(True)
+        except Exception as e:
+            print(f"[FAIL] {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+
+    passed = sum(results)
+    total = len(results)
+
+    print("\n" + "=" * 80)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 80)
+    return passed == total
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
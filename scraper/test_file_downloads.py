@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Test File Downloads
+
+Runs FileDownloader against an in-memory HTTP transport and a temporary
+storage directory, so no network access is needed. Covers the download
+loop, the content-addressed store, the ETag index and the hash-deduplicated
+insert of DownloadedFileDB (against an in-memory connection).
+"""
+
+import os
+import re
+import sys
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+
+import httpx
+
+# Add scraper root to path (the modules use package-relative imports)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.downloaders.file_downloader import FileDownloader
+from src.models.downloaded_file import (
+    DownloadedFile,
+    DownloadedFileDB,
+    _INSERT_SQL,
+    _INSERT_IF_NEW_SQL,
+)
+
+
+class FakeConnection:
+    """Records queries and answers fetchrow/fetchval with fixed values."""
+
+    def __init__(self, row=None, value=None):
+        self.row = row
+        self.value = value
+        self.queries = []
+
+    async def fetchrow(self, query, *args):
+        self.queries.append((query, args))
+        return self.row
+
+    async def fetchval(self, query, *args):
+        self.queries.append((query, args))
+        return self.value
+
+
+def _serve(responses):
+    """Transport answering GETs from a list of (status, body) in order."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, body = responses[min(len(requests) - 1, len(responses) - 1)]
+        return httpx.Response(status, content=body, headers={'Content-Type': 'application/pdf'})
+
+    return httpx.MockTransport(handler), requests
+
+
+def _run_async(downloader, transport, file_url):
+    """Download one file over the shared client, then close it."""
+    async def run():
+        downloader._async_client = httpx.AsyncClient(transport=transport)
+        try:
+            return await downloader.download_file_async(file_url, 'pdf', 'example.com')
+        finally:
+            await downloader.aclose()
+
+    return asyncio.run(run())
+
+
+def test_download_file_async():
+    """A streamed body lands in the content-addressed store."""
+    body = b'%PDF-1.4 ' + b'x' * 5000
+    transport, requests = _serve([(200, body)])
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path)
+        result = _run_async(downloader, transport, 'https://example.com/a.pdf')
+
+        assert result['success'] is True, result
+        assert result['file_size'] == len(body)
+        assert result['file_hash'] == hashlib.sha256(body).hexdigest()
+        assert (Path(storage_path) / result['file_path']).read_bytes() == body
+        assert len(requests) == 1
+
+
+def test_download_file_async_retries():
+    """A failed attempt is retried on the same client."""
+    transport, requests = _serve([(500, b'error'), (200, b'%PDF-1.4 ok')])
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path, retry_delays=[0])
+        result = _run_async(downloader, transport, 'https://example.com/a.pdf')
+
+        assert result['success'] is True, result
+        assert len(requests) == 2
+        assert list(downloader.staging_path.iterdir()) == []
+
+
+def test_download_file_async_too_large():
+    """A body over max_file_size fails and leaves no partial file."""
+    transport, _ = _serve([(200, b'x' * 2048)])
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path, max_file_size=1024)
+        result = _run_async(downloader, transport, 'https://example.com/a.pdf')
+
+        assert result['success'] is False
+        assert 'too large' in result['error']
+        assert list(downloader.staging_path.iterdir()) == []
+
+
+def test_download_file_sync():
+    """download_file() runs the same download loop on a private client."""
+    body = b'%PDF-1.4 sync'
+    transport, requests = _serve([(200, body)])
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path)
+        downloader._new_async_client = lambda: httpx.AsyncClient(transport=transport)
+        result = downloader.download_file('https://example.com/a.pdf', 'pdf', 'example.com')
+
+        assert result['success'] is True, result
+        assert result['file_hash'] == hashlib.sha256(body).hexdigest()
+        assert len(requests) == 1
+        # The shared client is only for download_file_async()
+        assert downloader._async_client is None
+
+
+def test_downloads_hash_on_shared_pool():
+    """Concurrent downloads are hashed on the downloader's BatchHasher."""
+    bodies = {f'https://example.com/{i}.pdf': f'%PDF-1.4 body {i}'.encode() for i in range(4)}
+
+    def handler(request):
+        return httpx.Response(200, content=bodies[str(request.url)])
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path)
+        hasher = downloader._get_batch_hasher()
+        submitted = []
+        original_submit = hasher.submit
+
+        def submit(path):
+            submitted.append(path)
+            return original_submit(path)
+
+        hasher.submit = submit
+
+        async def run():
+            downloader._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await asyncio.gather(*(
+                    downloader.download_file_async(url, 'pdf', 'example.com') for url in bodies
+                ))
+            finally:
+                await downloader.aclose()
+
+        results = asyncio.run(run())
+
+        assert len(submitted) == len(bodies)
+        assert [result['file_hash'] for result in results] == [
+            hashlib.sha256(body).hexdigest() for body in bodies.values()
+        ]
+        # aclose() shuts the pool down with the client
+        assert downloader._batch_hasher is None
+
+
+def _stage(downloader, name, body):
+    """Write a body into the staging directory as if it had been downloaded."""
+    path = downloader.staging_path / name
+    path.write_bytes(body)
+    return path
+
+
+def _finish(downloader, file_url, name, body, etag=None):
+    """Store a staged body the way _download() does once it is hashed."""
+    path = _stage(downloader, name, body)
+    return downloader._finish_download(
+        file_url, path, hashlib.sha256(body).hexdigest(), len(body), 'application/pdf', etag
+    )
+
+
+def test_cas_stores_one_copy_per_body():
+    """Identical bodies share one content-addressed file."""
+    body = b'%PDF-1.4 same body'
+    digest = hashlib.sha256(body).hexdigest()
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path)
+        first = _finish(downloader, 'https://example.com/a.pdf', 'first.pdf', body)
+        second = _finish(downloader, 'https://mirror.example.com/b.pdf', 'second.pdf', body)
+
+        assert first['file_hash'] == digest
+        assert first['file_path'] == f'cas/{digest[:2]}/{digest[2:4]}/{digest}.pdf'
+        assert first['deduplicated'] is False
+        assert second['file_path'] == first['file_path']
+        assert second['deduplicated'] is True
+        assert (Path(storage_path) / first['file_path']).read_bytes() == body
+        # Staged copies are moved or discarded, never left behind
+        assert list(downloader.staging_path.iterdir()) == []
+        assert len(list(downloader.cas_root.rglob('*.pdf'))) == 1
+
+
+def test_cas_keeps_different_bodies_apart():
+    """Different bodies get different content-addressed files."""
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path)
+        first = _finish(downloader, 'https://example.com/a.pdf', 'a.pdf', b'one')
+        second = _finish(downloader, 'https://example.com/b.pdf', 'b.pdf', b'two')
+
+        assert first['file_path'] != second['file_path']
+        assert second['deduplicated'] is False
+        assert len(list(downloader.cas_root.rglob('*.pdf'))) == 2
+
+
+def test_etag_lookup_is_per_url():
+    """A stored ETag is only reused for the URL it was served with."""
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path)
+        stored = _finish(downloader, 'https://example.com/a.pdf', 'a.pdf', b'body', etag='"v1"')
+
+        known = downloader._lookup_etag('https://example.com/a.pdf', '"v1"')
+        assert known['file_path'] == stored['file_path']
+        assert known['deduplicated'] is True
+        # Servers derive ETags from mtime/size, so another file on the same
+        # host can carry the same one
+        assert downloader._lookup_etag('https://example.com/other.pdf', '"v1"') is None
+        assert downloader._lookup_etag('https://example.com/a.pdf', '"v2"') is None
+        assert downloader._lookup_etag('https://example.com/a.pdf', None) is None
+
+
+def test_etag_head_only_for_known_urls():
+    """Only URLs already downloaded are probed with a HEAD."""
+    body = b'%PDF-1.4 tagged'
+    methods = []
+
+    def handler(request):
+        methods.append((request.method, str(request.url)))
+        return httpx.Response(200, content=body, headers={'ETag': '"v1"'})
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader = FileDownloader(storage_path=storage_path)
+
+        async def run():
+            downloader._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                first = await downloader.download_file_async('https://example.com/a.pdf', 'pdf', 'example.com')
+                other = await downloader.download_file_async('https://example.com/b.pdf', 'pdf', 'example.com')
+                again = await downloader.download_file_async('https://example.com/a.pdf', 'pdf', 'example.com')
+                return first, other, again
+            finally:
+                await downloader.aclose()
+
+        first, other, again = asyncio.run(run())
+
+        assert methods == [
+            ('GET', 'https://example.com/a.pdf'),
+            ('GET', 'https://example.com/b.pdf'),
+            ('HEAD', 'https://example.com/a.pdf'),
+        ]
+        # Same ETag on another URL was downloaded, not taken from the index
+        assert other['success'] is True
+        assert again['deduplicated'] is True
+        assert again['file_path'] == first['file_path']
+
+
+def test_drop_page_cache_flushes_first():
+    """A newly stored file is flushed before its pages are dropped."""
+    calls = []
+    originals = (os.fdatasync, getattr(os, 'posix_fadvise', None))
+    os.fdatasync = lambda fd: calls.append('fdatasync')
+    os.posix_fadvise = lambda fd, offset, length, advice: calls.append('fadvise')
+    try:
+        with tempfile.TemporaryDirectory() as storage_path:
+            downloader = FileDownloader(storage_path=storage_path)
+            _finish(downloader, 'https://example.com/a.pdf', 'a.pdf', b'body')
+    finally:
+        os.fdatasync = originals[0]
+        if originals[1] is None:
+            del os.posix_fadvise
+        else:
+            os.posix_fadvise = originals[1]
+
+    assert calls == ['fdatasync', 'fadvise']
+
+
+def _file_record(file_hash=b'\x01' * 32):
+    return DownloadedFile(
+        source_url='https://example.com/page',
+        file_url='https://example.com/report.pdf',
+        domain='example.com',
+        file_type='pdf',
+        stored_filename='abcd.pdf',
+        file_path='cas/ab/cd/abcd.pdf',
+        file_hash=file_hash,
+        download_status='downloaded'
+    )
+
+
+def test_insert_placeholders_match_record_tuple():
+    """Both INSERTs take exactly the parameters to_db_tuple() produces."""
+    params = _file_record().to_db_tuple()
+
+    for query in (_INSERT_SQL, _INSERT_IF_NEW_SQL):
+        placeholders = {int(n) for n in re.findall(r'\$(\d+)', query)}
+        assert placeholders == set(range(1, len(params) + 1)), query
+    # The duplicate probe uses the hash parameter
+    assert params[9] == b'\x01' * 32
+    assert re.search(r'WHERE file_hash = \$10::bytea', _INSERT_IF_NEW_SQL)
+
+
+def test_create_file_record_if_new_inserts():
+    """A new hash returns the inserted id in a single round trip."""
+    conn = FakeConnection(row={'file_id': 42, 'duplicate_id': None})
+    db = DownloadedFileDB(conn)
+    record = _file_record()
+
+    result = asyncio.run(db.create_file_record_if_new(record))
+
+    assert result == (42, None)
+    assert len(conn.queries) == 1
+    query, args = conn.queries[0]
+    assert query == _INSERT_IF_NEW_SQL
+    assert args == record.to_db_tuple()
+
+
+def test_create_file_record_if_new_duplicate():
+    """A stored hash returns the existing id and inserts nothing."""
+    conn = FakeConnection(row={'file_id': None, 'duplicate_id': 7})
+    db = DownloadedFileDB(conn)
+
+    assert asyncio.run(db.create_file_record_if_new(_file_record())) == (None, 7)
+    assert len(conn.queries) == 1
+
+
+TESTS = [
+    ("Async download", test_download_file_async),
+    ("Async download (retry)", test_download_file_async_retries),
+    ("Async download (too large)", test_download_file_async_too_large),
+    ("Sync download", test_download_file_sync),
+    ("Hashing on the shared pool", test_downloads_hash_on_shared_pool),
+    ("CAS stores one copy per body", test_cas_stores_one_copy_per_body),
+    ("CAS keeps different bodies apart", test_cas_keeps_different_bodies_apart),
+    ("ETag lookup is per URL", test_etag_lookup_is_per_url),
+    ("ETag HEAD only for known URLs", test_etag_head_only_for_known_urls),
+    ("Drop page cache after flush", test_drop_page_cache_flushes_first),
+    ("Insert placeholders", test_insert_placeholders_match_record_tuple),
+    ("Create file record if new (insert)", test_create_file_record_if_new_inserts),
+    ("Create file record if new (duplicate)", test_create_file_record_if_new_duplicate),
+]
+
+
+def main():
+    """Run all tests."""
+    print("=" * 80)
+    print("File Downloads Test")
+    print("=" * 80)
+
+    results = []
+    for name, test in TESTS:
+        print(f"\n[TEST] {name}")
+        print("-" * 60)
+        try:
+            test()
+            print("[OK] Passed")
+            results.append(True)
+        except Exception as e:
+            print(f"[FAIL] {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+
+    passed = sum(results)
+    total = len(results)
+
+    print("\n" + "=" * 80)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 80)
+    return passed == total
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
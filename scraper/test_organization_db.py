@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Test Organization Database Operations
+
+Runs OrganizationDB and the page fact store against an in-memory connection
+that records the SQL it is sent, so no database is needed.
+"""
+
+import re
+import sys
+import asyncio
+from pathlib import Path
+
+# Add scraper root to path (the models use package-relative imports)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models.organization import OrganizationDB, _dedupe_rows
+from src.extractors.entity_extractor import extract_and_store_organization_facts
+
+
+class FakeTransaction:
+    """Async context manager standing in for conn.transaction()."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.transaction_depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.conn.transaction_depth -= 1
+        return False
+
+
+class FakeConnection:
+    """Records statements and COPYs; fails COPY while fail_copy is set."""
+
+    def __init__(self, in_transaction=False):
+        self.transaction_depth = 1 if in_transaction else 0
+        self.executed = []
+        self.fetched = []
+        self.copied = []
+        self.fail_copy = False
+        self.next_id = 100
+
+    def is_in_transaction(self):
+        return self.transaction_depth > 0
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def execute(self, query, *args):
+        self.executed.append((query, args))
+        return "OK"
+
+    async def fetchrow(self, query, *args):
+        """Every organization lookup finds organization 7."""
+        self.fetched.append((query, args))
+        return {'id': 7, 'domain': args[0]}
+
+    async def fetch(self, query, *args):
+        """Return one id per unnest row (or one for a single-row upsert)."""
+        self.fetched.append((query, args))
+        row_count = len(args[1]) if isinstance(args[1], list) else 1
+        ids = range(self.next_id, self.next_id + row_count)
+        self.next_id += row_count
+        return [{'id': fact_id} for fact_id in ids]
+
+    async def copy_records_to_table(self, table, records, columns):
+        if self.fail_copy:
+            raise ConnectionError("connection lost during COPY")
+        self.copied.append((table, list(records), columns))
+
+
+def test_flush_evidence_copies_buffer():
+    """Buffered evidence is written with one asynchronously committed COPY."""
+    conn = FakeConnection()
+    db = OrganizationDB(conn, buffer_evidence=True)
+
+    async def run():
+        await db.add_evidence_many(1, 'product', [10, 11], 'https://example.com/a', 5)
+        return await db.flush_evidence()
+
+    written = asyncio.run(run())
+
+    assert written == 2
+    assert db._evidence_buffer == []
+    assert conn.copied[0][0] == 'organization_evidence'
+    assert conn.copied[0][1] == [
+        (1, 'product', 10, 'https://example.com/a', 5),
+        (1, 'product', 11, 'https://example.com/a', 5),
+    ]
+    assert conn.executed == [("SET LOCAL synchronous_commit = off", ())]
+
+
+def test_flush_evidence_restores_buffer_on_failure():
+    """A failed COPY puts its rows back so the next flush retries them."""
+    conn = FakeConnection()
+    db = OrganizationDB(conn, buffer_evidence=True)
+    conn.fail_copy = True
+
+    async def run():
+        await db.add_evidence_many(1, 'product', [10, 11], 'https://example.com/a')
+        try:
+            await db.flush_evidence()
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("flush_evidence() swallowed the COPY error")
+        await db.add_evidence_many(1, 'service', [20], 'https://example.com/b')
+        conn.fail_copy = False
+        return await db.flush_evidence()
+
+    written = asyncio.run(run())
+
+    assert written == 3
+    assert [row[2] for row in conn.copied[0][1]] == [10, 11, 20]
+    assert db._evidence_buffer == []
+
+
+def test_flush_evidence_inside_outer_transaction():
+    """Inside a caller's transaction the COPY leaves synchronous_commit alone."""
+    conn = FakeConnection(in_transaction=True)
+    db = OrganizationDB(conn, buffer_evidence=True)
+
+    async def run():
+        await db.add_evidence_many(1, 'product', [10], 'https://example.com/a')
+        return await db.flush_evidence()
+
+    written = asyncio.run(run())
+
+    assert written == 1
+    assert conn.executed == []
+    assert len(conn.copied) == 1
+
+
+def test_dedupe_rows():
+    """Rows with a repeated key are dropped, first occurrence kept in order."""
+    rows = [('a', 1), ('b', 2), ('a', 3), ('c', 4), ('b', 5)]
+
+    assert _dedupe_rows(rows, key=lambda row: row[0]) == [('a', 1), ('b', 2), ('c', 4)]
+    assert _dedupe_rows(iter(rows), key=lambda row: row) == rows
+    assert _dedupe_rows([], key=lambda row: row) == []
+
+
+def test_upsert_products_single_statement():
+    """Products go out as one unnest upsert with deduplicated arrays."""
+    conn = FakeConnection()
+    db = OrganizationDB(conn)
+
+    product_ids = asyncio.run(db.upsert_products(
+        7,
+        ['Voice', 'Chat', 'Voice'],
+        ['CX', None, 'Other'],
+        ['Calls', 'Messaging', 'Duplicate'],
+        source_url='https://example.com/products',
+        scraped_site_id=9
+    ))
+
+    # One statement; a repeated conflict key would make ON CONFLICT DO UPDATE
+    # touch the same row twice, so the duplicate is dropped before sending
+    assert len(conn.fetched) == 1
+    query, args = conn.fetched[0]
+    assert product_ids == [100, 101]
+    assert args[:4] == (7, ['Voice', 'Chat'], ['CX', None], ['Calls', 'Messaging'])
+    assert 'unnest($2::text[], $3::text[], $4::text[])' in query
+    # Evidence rides along in the same statement, numbered after the upsert
+    assert args[4:] == ('product', 'https://example.com/products', 9)
+    assert 'WITH upserted AS (' in query
+    assert re.search(r'SELECT \$1, \$5::text, id, \$6::text, \$7::int', query)
+
+
+def test_upsert_relationships_dedupe_on_pair():
+    """Relationships are deduplicated on (related organization, type)."""
+    conn = FakeConnection()
+    db = OrganizationDB(conn)
+
+    asyncio.run(db.upsert_relationships(
+        7,
+        [1, 1, 2, 1],
+        ['partner', 'client', 'partner', 'partner'],
+        ['first', 'second', 'third', 'repeat']
+    ))
+
+    _, args = conn.fetched[0]
+    assert args[1:4] == ([1, 1, 2], ['partner', 'client', 'partner'], ['first', 'second', 'third'])
+    # No source URL: the evidence INSERT is filtered out in SQL
+    assert args[5] is None
+
+
+def test_upsert_products_buffers_evidence():
+    """With buffered evidence the upsert skips its evidence INSERT."""
+    conn = FakeConnection()
+    db = OrganizationDB(conn, buffer_evidence=True)
+
+    product_ids = asyncio.run(db.upsert_products(
+        7, ['Voice', 'Chat'], [None, None], [None, None],
+        source_url='https://example.com/products'
+    ))
+
+    _, args = conn.fetched[0]
+    assert args[5] is None
+    assert db._evidence_buffer == [
+        (7, 'product', product_ids[0], 'https://example.com/products', None),
+        (7, 'product', product_ids[1], 'https://example.com/products', None),
+    ]
+
+
+def test_upsert_products_empty():
+    """An empty batch sends nothing."""
+    conn = FakeConnection()
+    db = OrganizationDB(conn)
+
+    assert asyncio.run(db.upsert_products(7, [], [], [])) == []
+    assert conn.fetched == []
+
+
+def test_store_page_facts_copies_evidence_once():
+    """A page's facts are upserted without evidence, then COPYed together."""
+    conn = FakeConnection()
+    html = (
+        "<html><body><p>ISO 27001 and SOC 2 certified, with offices in India "
+        "and Canada.</p></body></html>"
+    )
+
+    asyncio.run(extract_and_store_organization_facts(
+        conn, 'example.com', 'https://example.com/about', html, scraped_site_id=3
+    ))
+
+    upserts = [args for query, args in conn.fetched if 'unnest' in query]
+    assert len(upserts) == 2
+    # The upserts leave their evidence INSERT out
+    assert all(args[-2] is None for args in upserts)
+    assert len(conn.copied) == 1
+    rows = conn.copied[0][1]
+    assert sorted(row[1] for row in rows) == [
+        'certification', 'certification', 'operating_market', 'operating_market'
+    ]
+    assert all(row[0] == 7 and row[3:] == ('https://example.com/about', 3) for row in rows)
+
+
+def test_store_page_facts_retries_failed_evidence():
+    """Evidence from a page whose COPY failed is written with the next page."""
+    conn = FakeConnection()
+    org_db = OrganizationDB(conn, buffer_evidence=True)
+
+    async def run():
+        conn.fail_copy = True
+        await extract_and_store_organization_facts(
+            conn, 'example.com', 'https://example.com/a',
+            "<html><body><p>HIPAA compliant.</p></body></html>", org_db=org_db
+        )
+        conn.fail_copy = False
+        await extract_and_store_organization_facts(
+            conn, 'example.com', 'https://example.com/b',
+            "<html><body><p>Offices in Mexico.</p></body></html>", org_db=org_db
+        )
+
+    asyncio.run(run())
+
+    assert len(conn.copied) == 1
+    assert [row[3] for row in conn.copied[0][1]] == ['https://example.com/a', 'https://example.com/b']
+    assert org_db._evidence_buffer == []
+
+
+TESTS = [
+    ("Dedupe rows", test_dedupe_rows),
+    ("Bulk product upsert", test_upsert_products_single_statement),
+    ("Bulk relationship upsert", test_upsert_relationships_dedupe_on_pair),
+    ("Bulk product upsert (buffered evidence)", test_upsert_products_buffers_evidence),
+    ("Bulk product upsert (empty)", test_upsert_products_empty),
+    ("Flush evidence", test_flush_evidence_copies_buffer),
+    ("Flush evidence (failed COPY)", test_flush_evidence_restores_buffer_on_failure),
+    ("Flush evidence (outer transaction)", test_flush_evidence_inside_outer_transaction),
+    ("Store page facts (one evidence COPY)", test_store_page_facts_copies_evidence_once),
+    ("Store page facts (failed COPY retried)", test_store_page_facts_retries_failed_evidence),
+]
+
+
+def main():
+    """Run all tests."""
+    print("=" * 80)
+    print("Organization Database Operations Test")
+    print("=" * 80)
+
+    results = []
+    for name, test in TESTS:
+        print(f"\n[TEST] {name}")
+        print("-" * 60)
+        try:
+            test()
+            print("[OK] Passed")
+            results.append(True)
+        except Exception as e:
+            print(f"[FAIL] {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+
+    passed = sum(results)
+    total = len(results)
+
+    print("\n" + "=" * 80)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 80)
+    return passed == total
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
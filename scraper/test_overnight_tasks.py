@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Test Overnight Scraper Tasks
+
+Runs the quality test and full scrape tasks against an in-memory pool and
+crawler, so no database or network access is needed.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add scraper root to path (the tasks use package-relative imports)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.orchestration import overnight_scraper
+
+
+class FakePool:
+    """Answers the task queries with fixed rows."""
+
+    def __init__(self, quality_row=None, success_count=0):
+        self.quality_row = quality_row
+        self.success_count = success_count
+        self.queries = []
+
+    async def fetchrow(self, query, *args):
+        self.queries.append((query, args))
+        return self.quality_row
+
+    async def fetchval(self, query, *args):
+        self.queries.append((query, args))
+        return self.success_count
+
+
+class FakeCrawler:
+    """Records the limits each crawl ran with."""
+
+    def __init__(self, max_depth=3, max_pages=10, max_duration_seconds=300):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_duration_seconds = max_duration_seconds
+        self.crawls = []
+        self.closed = False
+
+    async def crawl(self, start_url):
+        self.crawls.append((start_url, self.max_depth, self.max_pages, self.max_duration_seconds))
+        return {'pages_crawled': self.max_pages, 'pages_failed': 0}
+
+    async def aclose(self):
+        self.closed = True
+
+
+class NullRecorder:
+    """Accepts any checkpoint or log call and remembers its name."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append(name)
+        return record
+
+
+def test_quality_test_task():
+    """Quality test passes on the aggregated sample row."""
+    pool = FakePool(quality_row={
+        'record_count': 3,
+        'html_length': 1000,
+        'content_length': 400,
+        'sample_urls': ['https://example.com/a', 'https://example.com/b', 'https://example.com/c']
+    })
+    crawler = FakeCrawler()
+
+    result = asyncio.run(overnight_scraper.quality_test_task(
+        'https://www.example.com', {}, pool, {}, crawler
+    ))
+
+    assert result['passed'] is True, result
+    assert result['records_extracted'] == 3
+    assert result['quality_ratio'] == 0.4
+    assert result['sample_urls'] == ['https://example.com/a', 'https://example.com/b', 'https://example.com/c']
+    assert crawler.crawls[0][0] == 'https://www.example.com'
+    assert pool.queries[0][1] == ('example.com', overnight_scraper.QUALITY_TEST_SIZE)
+
+
+def test_quality_test_task_low_ratio():
+    """Quality test fails when text is under 15% of the HTML."""
+    pool = FakePool(quality_row={
+        'record_count': 2,
+        'html_length': 1000,
+        'content_length': 100,
+        'sample_urls': ['https://example.com/a', 'https://example.com/b']
+    })
+
+    result = asyncio.run(overnight_scraper.quality_test_task(
+        'https://example.com', {}, pool, {}, FakeCrawler()
+    ))
+
+    assert result['passed'] is False, result
+    assert result['records_extracted'] == 2
+    assert result['reason'] == "High HTML/Low Text Ratio"
+
+
+def test_quality_test_task_no_records():
+    """Quality test fails when the sample crawl stored nothing."""
+    pool = FakePool(quality_row={
+        'record_count': 0,
+        'html_length': 0,
+        'content_length': 0,
+        'sample_urls': []
+    })
+
+    result = asyncio.run(overnight_scraper.quality_test_task(
+        'https://example.com', {}, pool, {}, FakeCrawler()
+    ))
+
+    assert result['passed'] is False
+    assert result['reason'] == "No records extracted"
+
+
+def test_quality_test_task_closes_own_crawler():
+    """A crawler the task creates itself is closed after the crawl."""
+    pool = FakePool(quality_row={
+        'record_count': 0,
+        'html_length': 0,
+        'content_length': 0,
+        'sample_urls': []
+    })
+    crawler = FakeCrawler()
+    original = overnight_scraper._quality_test_crawler
+    overnight_scraper._quality_test_crawler = lambda config, db_conn: crawler
+    try:
+        asyncio.run(overnight_scraper.quality_test_task('https://example.com', {}, pool, {}))
+    finally:
+        overnight_scraper._quality_test_crawler = original
+
+    assert crawler.closed
+
+
+def test_process_domain_closes_crawler():
+    """process_domain_task closes the shared crawler once both steps ran."""
+    pool = FakePool(
+        quality_row={
+            'record_count': 3,
+            'html_length': 1000,
+            'content_length': 400,
+            'sample_urls': ['https://example.com/a']
+        },
+        success_count=42
+    )
+    crawler = FakeCrawler()
+
+    async def security_ok(domain_url, config):
+        return {'has_strategy': True, 'strategy': {}, 'security_type': 'None'}
+
+    originals = (overnight_scraper.security_assessment_task, overnight_scraper._quality_test_crawler)
+    overnight_scraper.security_assessment_task = security_ok
+    overnight_scraper._quality_test_crawler = lambda config, db_conn: crawler
+    try:
+        result = asyncio.run(overnight_scraper.process_domain_task(
+            'https://example.com', {}, pool, NullRecorder(), NullRecorder()
+        ))
+    finally:
+        overnight_scraper.security_assessment_task, overnight_scraper._quality_test_crawler = originals
+
+    assert result['status'] == 'success', result
+    assert result['records_extracted'] == 42
+    # The quality test leaves the shared crawler open for the full scrape
+    assert len(crawler.crawls) == 2
+    assert crawler.closed
+
+
+def test_domain_crawler_aclose():
+    """DomainCrawler.aclose() closes the notifier's webhook client."""
+    from src.scrapers.domain_crawler import DomainCrawler
+
+    async def run():
+        crawler = DomainCrawler(
+            config={'notifications': {'enabled': True, 'webhook_url': 'http://localhost/hook'}},
+            db_connection=None
+        )
+        client = crawler.notifier._get_http_client()
+        await crawler.aclose()
+        return client
+
+    client = asyncio.run(run())
+    assert client.is_closed
+
+
+def test_domain_crawler_aclose_downloader():
+    """DomainCrawler.aclose() closes the file downloader's shared client."""
+    import tempfile
+    from src.scrapers.domain_crawler import DomainCrawler
+
+    async def run(storage_path):
+        crawler = DomainCrawler(
+            config={'file_download': {'enabled': True, 'file_storage_path': storage_path}},
+            db_connection=None
+        )
+        downloader = crawler.file_scraper.downloader
+        client = downloader._get_async_client()
+        await crawler.aclose()
+        return downloader, client
+
+    with tempfile.TemporaryDirectory() as storage_path:
+        downloader, client = asyncio.run(run(storage_path))
+    assert client.is_closed
+    assert downloader._async_client is None
+
+
+original_quality_test_crawler = overnight_scraper._quality_test_crawler
+
+
+def _chain_site_crawler(config, db_conn):
+    """Quality test crawler over a site whose pages form one chain of links."""
+    crawler = original_quality_test_crawler(config, db_conn)
+    chain = ['https://example.com/'] + [
+        'https://example.com/' + ''.join(f'l{i}/' for i in range(1, level + 1))
+        for level in range(1, 7)
+    ]
+    crawler.saved_urls = []
+
+    def fetch_page(url, session=None):
+        index = chain.index(url)
+        child = chain[index + 1] if index + 1 < len(chain) else url
+        html = f'<html><body><p>Page {index}</p><a href="{child}">next</a></body></html>'
+        return {
+            'success': True,
+            'url': url,
+            'status_code': 200,
+            'content': html,
+            'headers': {'Content-Type': 'text/html'}
+        }
+
+    async def save_page(url, *args):
+        crawler.saved_urls.append(url)
+
+    crawler.fetch_page = fetch_page
+    crawler._save_page = save_page
+    return crawler
+
+
+def test_quality_to_full_scrape_handoff():
+    """The full scrape continues the quality crawl down to the full depth."""
+    pool = FakePool(
+        quality_row={
+            'record_count': 3,
+            'html_length': 1000,
+            'content_length': 400,
+            'sample_urls': ['https://example.com/']
+        },
+        success_count=6
+    )
+    crawler = _chain_site_crawler({}, pool)
+    # Sample fewer pages than the chain is deep, so the full scrape has to
+    # pick up the frontier the quality test left behind
+    crawler.max_pages = 2
+
+    async def run():
+        quality = await overnight_scraper.quality_test_task(
+            'https://example.com/', {}, pool, {}, crawler
+        )
+        sampled = list(crawler.saved_urls)
+        full = await overnight_scraper.full_domain_scrape_task(
+            'https://example.com/', {}, pool, {}, NullRecorder(), crawler
+        )
+        return quality, sampled, full
+
+    quality, sampled, full = asyncio.run(run())
+
+    assert quality['passed'] is True, quality
+    assert sampled == ['https://example.com/', 'https://example.com/l1/']
+    assert full['status'] == 'success', full
+    # Pages are saved once each, and the chain is followed to max depth
+    assert len(crawler.saved_urls) == len(set(crawler.saved_urls))
+    assert crawler.saved_urls[-1] == 'https://example.com/l1/l2/l3/l4/l5/'
+    assert len(crawler.saved_urls) == overnight_scraper.MAX_CRAWL_DEPTH + 1
+    assert full['pages_crawled'] == overnight_scraper.MAX_CRAWL_DEPTH + 1 - 2
+
+
+def test_quality_crawler_uses_full_depth():
+    """Links found on quality-test pages at depth 3 are followed later."""
+    pool = FakePool(
+        quality_row={
+            'record_count': 4,
+            'html_length': 1000,
+            'content_length': 400,
+            'sample_urls': ['https://example.com/']
+        },
+        success_count=6
+    )
+    crawler = _chain_site_crawler({}, pool)
+    # The quality sample reaches the depth-3 page before the hand-off
+    crawler.max_pages = 4
+
+    async def run():
+        await overnight_scraper.quality_test_task('https://example.com/', {}, pool, {}, crawler)
+        return await overnight_scraper.full_domain_scrape_task(
+            'https://example.com/', {}, pool, {}, NullRecorder(), crawler
+        )
+
+    full = asyncio.run(run())
+
+    assert crawler.max_depth == overnight_scraper.MAX_CRAWL_DEPTH
+    assert full['pages_crawled'] == 2, full
+    assert 'https://example.com/l1/l2/l3/l4/' in crawler.saved_urls
+
+
+class FakeNotifier:
+    """Records each batch of completions it is asked to report."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def notify_domain_completions(self, crawl_results_by_domain):
+        self.batches.append(dict(crawl_results_by_domain))
+        return {domain: {'success': True} for domain in crawl_results_by_domain}
+
+
+def test_completion_notifier_follows_config():
+    """The flow only creates a notifier when notifications are enabled."""
+    assert overnight_scraper._completion_notifier({}, FakePool()) is None
+
+    notifier = overnight_scraper._completion_notifier(
+        {'notifications': {'enabled': True, 'webhook_url': 'http://localhost/hook'}}, FakePool()
+    )
+    assert notifier.webhook_enabled
+
+
+def test_notify_completions_sends_one_batch():
+    """Domains that finished together are reported in one call."""
+    notifier = FakeNotifier()
+    completed = {'a.com': {'pages_crawled': 3}, 'b.com': {'pages_crawled': 5}}
+
+    async def run():
+        await overnight_scraper._notify_completions(notifier, completed)
+        # Nothing new finished: no empty batch is sent
+        await overnight_scraper._notify_completions(notifier, completed)
+
+    asyncio.run(run())
+
+    assert notifier.batches == [{'a.com': {'pages_crawled': 3}, 'b.com': {'pages_crawled': 5}}]
+    assert completed == {}
+
+
+def test_process_domain_returns_crawl_results():
+    """A successful domain carries its crawl results for the notification."""
+    pool = FakePool(
+        quality_row={
+            'record_count': 3,
+            'html_length': 1000,
+            'content_length': 400,
+            'sample_urls': ['https://example.com/a']
+        },
+        success_count=42
+    )
+    crawler = FakeCrawler()
+
+    async def security_ok(domain_url, config):
+        return {'has_strategy': True, 'strategy': {}, 'security_type': 'None'}
+
+    originals = (overnight_scraper.security_assessment_task, overnight_scraper._quality_test_crawler)
+    overnight_scraper.security_assessment_task = security_ok
+    overnight_scraper._quality_test_crawler = lambda config, db_conn: crawler
+    try:
+        result = asyncio.run(overnight_scraper.process_domain_task(
+            'https://example.com', {}, pool, NullRecorder(), NullRecorder()
+        ))
+    finally:
+        overnight_scraper.security_assessment_task, overnight_scraper._quality_test_crawler = originals
+
+    assert result['crawl_results'] == {'pages_crawled': overnight_scraper.MAX_RECORDS_PER_DOMAIN, 'pages_failed': 0}
+
+
+TESTS = [
+    ("Quality test task", test_quality_test_task),
+    ("Quality test task (low ratio)", test_quality_test_task_low_ratio),
+    ("Quality test task (no records)", test_quality_test_task_no_records),
+    ("Quality test task closes its own crawler", test_quality_test_task_closes_own_crawler),
+    ("Process domain closes the shared crawler", test_process_domain_closes_crawler),
+    ("Domain crawler aclose", test_domain_crawler_aclose),
+    ("Domain crawler aclose (file downloader)", test_domain_crawler_aclose_downloader),
+    ("Quality test to full scrape hand-off", test_quality_to_full_scrape_handoff),
+    ("Quality crawler uses the full crawl depth", test_quality_crawler_uses_full_depth),
+    ("Completion notifier follows config", test_completion_notifier_follows_config),
+    ("Notify completions in one batch", test_notify_completions_sends_one_batch),
+    ("Process domain returns crawl results", test_process_domain_returns_crawl_results),
+]
+
+
+def main():
+    """Run all tests."""
+    print("=" * 80)
+    print("Overnight Scraper Tasks Test")
+    print("=" * 80)
+
+    results = []
+    for name, test in TESTS:
+        print(f"\n[TEST] {name}")
+        print("-" * 60)
+        try:
+            test()
+            print("[OK] Passed")
+            results.append(True)
+        except Exception as e:
+            print(f"[FAIL] {e}")
+            import traceback
+            traceback.print_exc()
+            results.append(False)
+
+    passed = sum(results)
+    total = len(results)
+
+    print("\n" + "=" * 80)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 80)
+    return passed == total
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)